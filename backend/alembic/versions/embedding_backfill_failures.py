@@ -0,0 +1,27 @@
+"""Record rows the embedding backfill failed to embed
+
+Revision ID: embedding_backfill_failures
+Revises: workflow_step_input
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'embedding_backfill_failures'
+down_revision = 'workflow_step_input'
+branch_labels = None
+depends_on = None
+
+EMBEDDED_TABLES = ('memory', 'knowledgebase_main', 'document')
+
+
+def upgrade() -> None:
+    for table in EMBEDDED_TABLES:
+        op.add_column(table, sa.Column('embedding_failed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    for table in EMBEDDED_TABLES:
+        op.drop_column(table, 'embedding_failed_at')
@@ -0,0 +1,35 @@
+"""Add embedding cache table
+
+Revision ID: embedding_cache
+Revises: memory_embedding_vector
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'embedding_cache'
+down_revision = 'memory_embedding_vector'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'embedding_cache',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('embedding', postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_embedding_cache_content_hash'), 'embedding_cache', ['content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_embedding_cache_content_hash'), table_name='embedding_cache')
+    op.drop_table('embedding_cache')
@@ -0,0 +1,27 @@
+"""Index memories by agent and creation time
+
+Revision ID: memory_agent_created_at
+Revises: embedding_cache
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'memory_agent_created_at'
+down_revision = 'embedding_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_memory_agent_id_created_at',
+        'memory',
+        ['agent_id', sa.text('created_at DESC')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_memory_agent_id_created_at', table_name='memory')
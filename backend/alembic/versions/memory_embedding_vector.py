@@ -0,0 +1,60 @@
+"""Store memory embeddings as pgvector vectors
+
+Revision ID: memory_embedding_vector
+Revises: initial_migration
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.db.vector import vector_ops
+
+# revision identifiers, used by Alembic.
+revision = 'memory_embedding_vector'
+down_revision = 'initial_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not settings.PGVECTOR_ENABLED:
+        return
+
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+
+    # Embeddings with a different dimension can't be converted, they are
+    # dropped and regenerated later
+    op.execute(
+        f"""
+        ALTER TABLE memory
+        ALTER COLUMN embedding TYPE vector({dimensions})
+        USING CASE
+            WHEN array_length(embedding, 1) = {dimensions} THEN embedding::vector({dimensions})
+        END
+        """
+    )
+
+    op.create_index(
+        'ix_memory_embedding_hnsw',
+        'memory',
+        ['embedding'],
+        postgresql_using='hnsw',
+        postgresql_ops={'embedding': vector_ops()},
+    )
+
+
+def downgrade() -> None:
+    if not settings.PGVECTOR_ENABLED:
+        return
+
+    op.drop_index('ix_memory_embedding_hnsw', table_name='memory')
+    op.alter_column(
+        'memory',
+        'embedding',
+        type_=postgresql.ARRAY(sa.Float()),
+        postgresql_using='embedding::real[]::double precision[]',
+    )
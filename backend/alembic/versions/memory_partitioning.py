@@ -0,0 +1,100 @@
+"""Partition memory by type and day
+
+Revision ID: memory_partitioning
+Revises: memory_agent_created_at
+Create Date: 2026-10-17 00:00:00.000000
+
+With MEMORY_PARTITIONED enabled, memory is rebuilt as a table partitioned by
+type and day. A partitioned table's primary key must include the partition
+keys, so it becomes (id, memory_type, created_at) and the database no longer
+enforces that id is unique on its own. IDs are random UUIDs assigned by the
+application, and ix_memory_id keeps lookups by id fast, but no foreign key
+can reference memory.id.
+
+Downgrading checks whether the table is actually partitioned, rather than
+the current setting, which may have changed since the upgrade.
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.db.partitions import memory_partition_ddl
+from app.db.vector import vector_ops
+
+# revision identifiers, used by Alembic.
+revision = 'memory_partitioning'
+down_revision = 'memory_agent_created_at'
+branch_labels = None
+depends_on = None
+
+
+def _is_partitioned() -> bool:
+    """Check whether the memory table is partitioned in the database."""
+    result = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('memory')")
+    )
+    return result.first() is not None
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_memory_id', 'memory', ['id'])
+    op.create_index('ix_memory_agent_id_created_at', 'memory', ['agent_id', sa.text('created_at DESC')])
+    op.create_index('ix_memory_memory_type_created_at', 'memory', ['memory_type', 'created_at'])
+    if settings.PGVECTOR_ENABLED:
+        op.create_index(
+            'ix_memory_embedding_hnsw',
+            'memory',
+            ['embedding'],
+            postgresql_using='hnsw',
+            postgresql_ops={'embedding': vector_ops()},
+        )
+
+
+def upgrade() -> None:
+    if _is_partitioned():
+        # Already partitioned, with its indexes
+        return
+    if not settings.MEMORY_PARTITIONED:
+        op.create_index('ix_memory_memory_type_created_at', 'memory', ['memory_type', 'created_at'])
+        return
+
+    # Rebuild memory as a partitioned table and copy the rows over. Rows older
+    # than the created day partitions end up in the default partitions and
+    # are deleted in chunks by retention.
+    op.execute('ALTER TABLE memory RENAME TO memory_unpartitioned')
+    op.execute('ALTER TABLE memory_unpartitioned RENAME CONSTRAINT memory_pkey TO memory_unpartitioned_pkey')
+    op.execute(
+        """
+        CREATE TABLE memory (LIKE memory_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY LIST (memory_type)
+        """
+    )
+    op.execute('ALTER TABLE memory ADD PRIMARY KEY (id, memory_type, created_at)')
+    op.execute('ALTER TABLE memory ADD FOREIGN KEY (agent_id) REFERENCES agent (id)')
+
+    for statement in memory_partition_ddl(datetime.utcnow().date(), settings.MEMORY_PARTITION_DAYS_AHEAD):
+        op.execute(statement)
+
+    op.execute('INSERT INTO memory SELECT * FROM memory_unpartitioned')
+    op.execute('DROP TABLE memory_unpartitioned')
+
+    _create_indexes()
+
+
+def downgrade() -> None:
+    if not _is_partitioned():
+        op.drop_index('ix_memory_memory_type_created_at', table_name='memory')
+        return
+
+    op.execute('ALTER TABLE memory RENAME TO memory_partitioned')
+    op.execute('ALTER TABLE memory_partitioned RENAME CONSTRAINT memory_pkey TO memory_partitioned_pkey')
+    op.execute('CREATE TABLE memory (LIKE memory_partitioned INCLUDING DEFAULTS)')
+    op.execute('ALTER TABLE memory ADD PRIMARY KEY (id)')
+    op.execute('ALTER TABLE memory ADD FOREIGN KEY (agent_id) REFERENCES agent (id)')
+    op.execute('INSERT INTO memory SELECT * FROM memory_partitioned')
+    op.execute('DROP TABLE memory_partitioned CASCADE')
+
+    _create_indexes()
+    op.drop_index('ix_memory_memory_type_created_at', table_name='memory')
@@ -0,0 +1,70 @@
+"""Add workflow execution tables
+
+Revision ID: workflow_execution
+Revises: memory_partitioning
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'workflow_execution'
+down_revision = 'memory_partitioning'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'workflow_execution',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('workflow_id', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('definition', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('input_data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('output_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('execution_time', sa.Float(), nullable=False),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_workflow_execution_workflow_id'), 'workflow_execution', ['workflow_id'])
+    op.create_index(op.f('ix_workflow_execution_status'), 'workflow_execution', ['status'])
+
+    op.create_table(
+        'workflow_step_execution',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('execution_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('step_id', sa.String(), nullable=False),
+        sa.Column('step_name', sa.String(), nullable=True),
+        sa.Column('step_type', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('output_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('execution_time', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['execution_id'], ['workflow_execution.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('execution_id', 'step_id', name='uq_workflow_step_execution_step'),
+    )
+    op.create_index(
+        op.f('ix_workflow_step_execution_execution_id'), 'workflow_step_execution', ['execution_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_workflow_step_execution_execution_id'), table_name='workflow_step_execution')
+    op.drop_table('workflow_step_execution')
+    op.drop_index(op.f('ix_workflow_execution_status'), table_name='workflow_execution')
+    op.drop_index(op.f('ix_workflow_execution_workflow_id'), table_name='workflow_execution')
+    op.drop_table('workflow_execution')
@@ -0,0 +1,41 @@
+"""Add job queue columns to workflow executions
+
+Revision ID: workflow_job_queue
+Revises: workflow_execution
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'workflow_job_queue'
+down_revision = 'workflow_execution'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('workflow_execution', sa.Column('priority', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('workflow_execution', sa.Column('worker_id', sa.String(), nullable=True))
+    # Workers poll for the highest priority, oldest pending executions
+    op.create_index(
+        'ix_workflow_execution_queue',
+        'workflow_execution',
+        [sa.text('priority DESC'), 'created_at'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    # and for running executions whose heartbeat stopped
+    op.create_index(
+        'ix_workflow_execution_heartbeat_at',
+        'workflow_execution',
+        ['heartbeat_at'],
+        postgresql_where=sa.text("status = 'running'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workflow_execution_heartbeat_at', table_name='workflow_execution')
+    op.drop_index('ix_workflow_execution_queue', table_name='workflow_execution')
+    op.drop_column('workflow_execution', 'worker_id')
+    op.drop_column('workflow_execution', 'priority')
@@ -0,0 +1,46 @@
+"""Add workflow step result cache
+
+Revision ID: workflow_step_cache
+Revises: workflow_job_queue
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'workflow_step_cache'
+down_revision = 'workflow_job_queue'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'workflow_step_cache',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('cache_key', sa.String(length=64), nullable=False),
+        sa.Column('step_type', sa.String(), nullable=False),
+        sa.Column('output_data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_workflow_step_cache_cache_key'), 'workflow_step_cache', ['cache_key'], unique=True)
+    op.create_index(op.f('ix_workflow_step_cache_expires_at'), 'workflow_step_cache', ['expires_at'])
+
+    op.add_column('workflow_step_execution', sa.Column('cache_status', sa.String(), nullable=True))
+    op.add_column(
+        'workflow_execution',
+        sa.Column('bypass_cache', sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('workflow_execution', 'bypass_cache')
+    op.drop_column('workflow_step_execution', 'cache_status')
+    op.drop_index(op.f('ix_workflow_step_cache_expires_at'), table_name='workflow_step_cache')
+    op.drop_index(op.f('ix_workflow_step_cache_cache_key'), table_name='workflow_step_cache')
+    op.drop_table('workflow_step_cache')
@@ -0,0 +1,27 @@
+"""Add bound input of workflow steps
+
+Revision ID: workflow_step_input
+Revises: workflow_step_cache
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'workflow_step_input'
+down_revision = 'workflow_step_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'workflow_step_execution',
+        sa.Column('input_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('workflow_step_execution', 'input_data')
@@ -5,28 +5,45 @@ Agent management endpoints.
 import uuid
 from typing import List, Dict, Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import crud
+from app.core.config import settings
 from app.db.models import Agent
 from app.db.session import get_db
 from app.schemas.agent import Agent as AgentSchema
 from app.schemas.agent import AgentCreate, AgentUpdate
 from app.schemas.memory import MemoryCreate
 from app.services.llm import get_llm_service
+from app.utils.pagination import decode_cursor, page_response, parse_fields
+from app.utils.vector_scoring import embedding_cache
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[AgentSchema])
-async def list_agents(db: AsyncSession = Depends(get_db)):
+async def list_agents(
+    response: Response,
+    limit: int = Query(100, ge=1, le=settings.LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
     """
-    List all agents.
+    List agents, a page at a time.
+
+    Pages are ordered by creation time, pass the X-Next-Cursor header of a
+    page as cursor to get the next one. fields limits the returned fields.
     """
-    result = await db.execute(select(Agent))
-    agents = result.scalars().all()
-    return agents
+    agents = await crud.agent.get_multi(
+        db,
+        after=decode_cursor(cursor),
+        limit=limit,
+        columns=parse_fields(Agent, fields),
+    )
+    return page_response(response, agents, limit, fields)
 
 
 @router.post("", response_model=AgentSchema, status_code=status.HTTP_201_CREATED)
@@ -118,6 +135,7 @@ async def delete_agent(agent_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
     # Delete the agent directly from the database
     await db.execute(text(f"DELETE FROM agent WHERE id = '{agent_id}'"))
     await db.commit()
+    embedding_cache.invalidate(agent_id)
 
     return None
 
@@ -2,8 +2,9 @@
 API endpoints for event-driven agent interactions.
 """
 
+import logging
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,25 +13,24 @@ from app import crud
 from app.api.deps import get_db
 from app.schemas.event import EventTrigger, EventResponse
 from app.schemas.memory import MemoryCreate
-from app.utils.agent import generate_agent_response
+from app.services.embeddings import embedding_service
+from app.services.memory_writer import memory_writer
+from app.utils.agent import generate_agent_response, stream_agent_response
 from app.utils.memory_retrieval import build_agent_context
+from app.utils.streaming import sse_response, stream_response_events
 from app.utils.working_memory import WorkingMemory
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
-@router.post("/trigger", response_model=EventResponse)
-async def trigger_agent(
+async def _prepare_event(
+    db: AsyncSession,
     agent_id: uuid.UUID,
     event: EventTrigger,
-    db: AsyncSession = Depends(get_db),
-) -> Any:
-    """
-    Trigger an agent with an event.
-
-    This endpoint allows triggering an agent with various types of events,
-    such as notifications, emails, or scheduled tasks.
-    """
+) -> Tuple[Any, Dict[str, Any]]:
+    """Load the agent and build its context for an event."""
     # Get agent
     agent = await crud.agent.get(db, str(agent_id))
     if not agent:
@@ -39,23 +39,32 @@ async def trigger_agent(
             detail=f"Agent with ID {agent_id} not found",
         )
 
+    # Embed the event for semantic retrieval, falling back to recent memories
+    try:
+        embedding = await embedding_service.embed(event.content)
+    except Exception as e:
+        logger.error(f"Error embedding event for agent {agent_id}: {e}")
+        embedding = None
+
     # Build comprehensive context for the agent
     context = await build_agent_context(
         db,
         str(agent_id),
         event.content,
         task_type=event.type,
-        embedding=None,  # TODO: Generate embedding
+        embedding=embedding,
     )
 
-    # Generate response
-    response = await generate_agent_response(
-        agent=agent,
-        message=event.content,
-        context=context,
-        db=db,
-    )
+    return agent, context
+
 
+async def _store_event(
+    agent_id: uuid.UUID,
+    event: EventTrigger,
+    response: str,
+    context: Dict[str, Any],
+) -> EventResponse:
+    """Store the event and the agent's response, and build the event response."""
     # Determine memory type based on event type
     memory_type = "permanent"
     if event.type in ["scraping", "processing", "temporary"]:
@@ -63,37 +72,33 @@ async def trigger_agent(
     elif event.context and event.context.get("memory_type"):
         memory_type = event.context.get("memory_type")
 
-    # Create memory for this event
-    memory = await crud.memory.create(
-        db,
-        obj_in=MemoryCreate(
-            agent_id=str(agent_id),
-            role="user",
-            content=event.content,
-            memory_type=memory_type,
-            meta_data={
-                "event_type": event.type,
-                "event_source": event.source,
-                "context": event.context,
-            },
-        ),
-    )
-
-    # Create memory for agent's response
-    response_memory = await crud.memory.create(
-        db,
-        obj_in=MemoryCreate(
-            agent_id=str(agent_id),
-            role="assistant",
-            content=response,
-            memory_type=memory_type,
-            meta_data={
+    # Store the event, the response and any working memory results in one batched write
+    event_memory = {
+        "id": uuid.uuid4(),
+        "agent_id": agent_id,
+        "role": "user",
+        "content": event.content,
+        "memory_type": memory_type,
+        "meta_data": {
+            "event_type": event.type,
+            "event_source": event.source,
+            "context": event.context,
+        },
+    }
+    memories = [
+        event_memory,
+        {
+            "agent_id": agent_id,
+            "role": "assistant",
+            "content": response,
+            "memory_type": memory_type,
+            "meta_data": {
                 "event_type": event.type,
                 "event_source": "agent",
-                "in_response_to": str(memory.id),
+                "in_response_to": str(event_memory["id"]),
             },
-        ),
-    )
+        },
+    ]
 
     # If this is a task that generates working memory, create a summary
     if event.context and event.context.get("working_memory"):
@@ -113,7 +118,9 @@ async def trigger_agent(
             # Create permanent memories from working memory
             permanent_memories = wm.to_permanent_memories(str(agent_id))
             for mem_data in permanent_memories:
-                await crud.memory.create(db, obj_in=MemoryCreate(**mem_data))
+                memories.append(MemoryCreate(**mem_data).model_dump())
+
+    memory, response_memory = (await memory_writer.write(memories))[:2]
 
     # Return response
     return EventResponse(
@@ -122,3 +129,57 @@ async def trigger_agent(
         response_id=str(response_memory.id),
         context=context,
     )
+
+
+@router.post("/trigger", response_model=EventResponse)
+async def trigger_agent(
+    agent_id: uuid.UUID,
+    event: EventTrigger,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Trigger an agent with an event.
+
+    This endpoint allows triggering an agent with various types of events,
+    such as notifications, emails, or scheduled tasks.
+    """
+    agent, context = await _prepare_event(db, agent_id, event)
+
+    # Generate response
+    response = await generate_agent_response(
+        agent=agent,
+        message=event.content,
+        context=context,
+        db=db,
+    )
+
+    return await _store_event(agent_id, event, response, context)
+
+
+@router.post("/trigger/stream")
+async def trigger_agent_stream(
+    agent_id: uuid.UUID,
+    event: EventTrigger,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Trigger an agent with an event, streaming the response as Server-Sent Events.
+
+    Sends a "token" event with each chunk of the response as the provider
+    generates it. Once the response is complete, the memories are stored and
+    a "done" event is sent with the same body as the non-streaming endpoint.
+    """
+    agent, context = await _prepare_event(db, agent_id, event)
+
+    # Prepare everything that needs the database before streaming starts
+    chunks = await stream_agent_response(
+        agent=agent,
+        message=event.content,
+        context=context,
+        db=db,
+    )
+
+    async def on_complete(response: str) -> EventResponse:
+        return await _store_event(agent_id, event, response, context)
+
+    return sse_response(stream_response_events(chunks, on_complete))
@@ -4,6 +4,11 @@ Health check endpoints.
 
 from fastapi import APIRouter
 
+from app.db.session import pool_metrics
+from app.services import workflow_store
+from app.services.http_client import http_clients
+from app.services.workflow_worker import workflow_worker
+
 router = APIRouter()
 
 
@@ -13,3 +18,32 @@ async def health_check():
     Health check endpoint.
     """
     return {"status": "ok"}
+
+
+@router.get("/http-pools")
+async def http_pool_stats():
+    """
+    Connection pool statistics for outbound HTTP clients.
+    """
+    return http_clients.get_stats()
+
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    """
+    Connection pool statistics for the database.
+    """
+    return pool_metrics.get_stats()
+
+
+@router.get("/workflow-worker")
+async def workflow_worker_stats():
+    """
+    Statistics of the workflow worker of this process.
+    """
+    return {
+        "worker_id": workflow_store.WORKER_ID,
+        "concurrency": workflow_worker.concurrency,
+        "running": workflow_worker.running,
+        **workflow_worker.metrics,
+    }
@@ -3,7 +3,8 @@ Agent interaction endpoints.
 """
 
 import uuid
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
@@ -13,17 +14,25 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models import Agent, Memory
 from app.db.session import get_db
 from app.schemas.memory import Memory as MemorySchema
-from app.schemas.memory import MemoryCreate
-from app.utils.agent import generate_agent_response, create_memory_from_interaction
+from app.services.memory_writer import memory_writer
+from app.utils.agent import generate_agent_response, stream_agent_response
+from app.utils.conversation_summary import get_rolling_summary, schedule_summary_update
+from app.utils.memory_retrieval import get_conversation_history
+from app.utils.streaming import sse_response, stream_response_events
 
 router = APIRouter()
 
+# History length for agents without a memory window
+DEFAULT_HISTORY_LIMIT = 10
+
 
 class InteractionRequest(BaseModel):
     """Interaction request schema."""
     message: str
     include_history: bool = True
     history_limit: Optional[int] = None
+    # Wait for the memories to be committed, defaults to not MEMORY_WRITE_BEHIND
+    durable: Optional[bool] = None
 
 
 class InteractionResponse(BaseModel):
@@ -32,15 +41,12 @@ class InteractionResponse(BaseModel):
     memories: List[MemorySchema]
 
 
-@router.post("", response_model=InteractionResponse)
-async def interact_with_agent(
+async def _load_interaction(
+    db: AsyncSession,
     agent_id: uuid.UUID,
     interaction: InteractionRequest,
-    db: AsyncSession = Depends(get_db),
-):
-    """
-    Interact with an agent.
-    """
+) -> Tuple[Agent, Optional[List[Any]], Optional[str]]:
+    """Load the agent, conversation history and summary for an interaction."""
     # Check if agent exists
     result = await db.execute(select(Agent).filter(Agent.id == agent_id))
     agent = result.scalars().first()
@@ -50,31 +56,66 @@ async def interact_with_agent(
             detail=f"Agent with ID {agent_id} not found",
         )
 
-    # Get conversation history if requested
+    # Get the latest messages of the conversation if requested
     conversation_history = None
+    summary = None
     if interaction.include_history:
-        history_query = select(Memory).filter(Memory.agent_id == agent_id)
+        # The previous turn may still be buffered by the write-behind writer
+        await memory_writer.flush(agent.id)
+
+        history_limit = interaction.history_limit or agent.memory_window or DEFAULT_HISTORY_LIMIT
+        conversation_history = await get_conversation_history(db, agent_id, history_limit)
+
+        # Older messages are only included through the rolling summary
+        summary_memory = await get_rolling_summary(db, agent_id)
+        summary = summary_memory.content if summary_memory else None
+
+    return agent, conversation_history, summary
+
 
-        # Apply history limit if specified
-        if interaction.history_limit:
-            history_query = history_query.order_by(Memory.created_at.desc()).limit(interaction.history_limit)
+async def _store_message(agent: Agent, interaction: InteractionRequest) -> Memory:
+    """
+    Store the user message before the response is generated.
 
-        history_result = await db.execute(history_query)
-        conversation_history = history_result.scalars().all()
+    The message is kept even if generating the response fails. It is stored
+    with the time it was received.
+    """
+    memories = await memory_writer.write(
+        [{"agent_id": agent.id, "role": "user", "content": interaction.message, "created_at": datetime.utcnow()}],
+        durable=interaction.durable,
+    )
+    return memories[0]
 
-        # Reverse the history to get chronological order
-        if conversation_history:
-            conversation_history = list(reversed(conversation_history))
 
-    # Create a memory for the user message
-    user_memory = await create_memory_from_interaction(
-        agent_id=agent_id,
-        role="user",
-        content=interaction.message,
+async def _store_response(
+    agent: Agent,
+    interaction: InteractionRequest,
+    message: Memory,
+    response: str,
+) -> List[Memory]:
+    """Store the response, and get the memories of the interaction."""
+    memories = await memory_writer.write(
+        [{"agent_id": agent.id, "role": "assistant", "content": response}],
+        durable=interaction.durable,
     )
-    db.add(user_memory)
-    await db.commit()
-    await db.refresh(user_memory)
+
+    # Fold messages that left the memory window into the summary
+    schedule_summary_update(agent)
+
+    return [message, *memories]
+
+
+@router.post("", response_model=InteractionResponse)
+async def interact_with_agent(
+    agent_id: uuid.UUID,
+    interaction: InteractionRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Interact with an agent.
+    """
+    agent, conversation_history, summary = await _load_interaction(db, agent_id, interaction)
+    message = await _store_message(agent, interaction)
 
     # Generate a response from the agent
     response = await generate_agent_response(
@@ -82,20 +123,46 @@ async def interact_with_agent(
         message=interaction.message,
         conversation_history=conversation_history,
         db=db,
+        summary=summary,
     )
 
-    # Create a memory for the assistant response
-    assistant_memory = await create_memory_from_interaction(
-        agent_id=agent_id,
-        role="assistant",
-        content=response,
-    )
-    db.add(assistant_memory)
-    await db.commit()
-    await db.refresh(assistant_memory)
+    memories = await _store_response(agent, interaction, message, response)
 
     # Return the response and memories
     return InteractionResponse(
         response=response,
-        memories=[user_memory, assistant_memory],
+        memories=memories,
     )
+
+
+@router.post("/stream")
+async def stream_interaction_with_agent(
+    agent_id: uuid.UUID,
+    interaction: InteractionRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Interact with an agent, streaming the response as Server-Sent Events.
+
+    Sends a "token" event with each chunk of the response as the provider
+    generates it. The user message is stored before streaming starts. Once
+    the response is complete, it is stored and a "done" event is sent with
+    the same body as the non-streaming endpoint.
+    """
+    agent, conversation_history, summary = await _load_interaction(db, agent_id, interaction)
+    message = await _store_message(agent, interaction)
+
+    # Prepare everything that needs the database before streaming starts
+    chunks = await stream_agent_response(
+        agent=agent,
+        message=interaction.message,
+        conversation_history=conversation_history,
+        db=db,
+        summary=summary,
+    )
+
+    async def on_complete(response: str) -> InteractionResponse:
+        memories = await _store_response(agent, interaction, message, response)
+        return InteractionResponse(response=response, memories=memories)
+
+    return sse_response(stream_response_events(chunks, on_complete))
@@ -3,26 +3,39 @@ Memory management endpoints.
 """
 
 import uuid
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import crud
+from app.core.config import settings
 from app.db.models import Agent, Memory
 from app.db.session import get_db
 from app.schemas.memory import Memory as MemorySchema
 from app.schemas.memory import MemoryCreate, MemoryUpdate
+from app.utils.pagination import decode_cursor, page_response, parse_fields
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[MemorySchema])
 async def list_memories(
-    agent_id: uuid.UUID, db: AsyncSession = Depends(get_db)
+    agent_id: uuid.UUID,
+    response: Response,
+    memory_type: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=settings.LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    List all memories for an agent.
+    List the memories of an agent, a page at a time.
+
+    Pages are ordered by creation time, pass the X-Next-Cursor header of a
+    page as cursor to get the next one. fields limits the returned fields,
+    embeddings are only returned when requested.
     """
     # Check if agent exists
     result = await db.execute(select(Agent).filter(Agent.id == agent_id))
@@ -34,9 +47,15 @@ async def list_memories(
         )
 
     # Get memories
-    result = await db.execute(select(Memory).filter(Memory.agent_id == agent_id))
-    memories = result.scalars().all()
-    return memories
+    memories = await crud.memory.get_by_agent(
+        db,
+        agent_id,
+        memory_type=memory_type,
+        after=decode_cursor(cursor),
+        limit=limit,
+        columns=parse_fields(Memory, fields),
+    )
+    return page_response(response, memories, limit, fields)
 
 
 @router.post("", response_model=MemorySchema, status_code=status.HTTP_201_CREATED)
@@ -10,11 +10,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
 from app.api.deps import get_db
+from app.core.config import settings
 from app.utils.memory_cleanup import (
     cleanup_execution_memories,
     cleanup_temporary_memories,
     get_memory_stats,
 )
+from app.utils.memory_retention import retention_worker
 
 router = APIRouter()
 
@@ -22,18 +24,43 @@ router = APIRouter()
 @router.get("/stats")
 async def get_memory_statistics(
     agent_id: Optional[uuid.UUID] = None,
+    by_agent: bool = False,
+    estimate: bool = False,
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Get memory statistics.
     
     This endpoint returns statistics about the agent's memory usage,
-    including counts of permanent, temporary, and execution memories.
+    including counts, sizes and age ranges of permanent, temporary, and
+    execution memories. Set by_agent for a per-agent breakdown, or estimate
+    for fast approximate statistics of very large tables.
     """
-    stats = await get_memory_stats(db, str(agent_id) if agent_id else None)
+    stats = await get_memory_stats(
+        db,
+        str(agent_id) if agent_id else None,
+        by_agent=by_agent,
+        estimate=estimate,
+    )
     return stats
 
 
+@router.get("/retention")
+async def get_retention_metrics() -> Any:
+    """
+    Get memory retention metrics.
+    
+    This endpoint returns the retention policies and how many memories and
+    partitions the background retention worker of this process removed.
+    """
+    return {
+        "enabled": settings.RETENTION_ENABLED,
+        "interval": retention_worker.interval,
+        "policies": retention_worker.policies,
+        **retention_worker.metrics,
+    }
+
+
 @router.post("/cleanup/temporary")
 async def cleanup_temporary_memory(
     agent_id: Optional[uuid.UUID] = None,
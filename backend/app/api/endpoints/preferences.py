@@ -4,35 +4,50 @@ API endpoints for preferences.
 
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
 from app.api.deps import get_db
+from app.core.config import settings
+from app.db.models.knowledge_base import Preference as PreferenceModel
 from app.schemas.knowledge_base import (
     Preference,
     PreferenceCreate,
     PreferenceUpdate,
 )
+from app.utils.pagination import decode_cursor, page_response, parse_fields
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[Preference])
 async def get_preferences(
+    response: Response,
     agent_id: Optional[str] = None,
     category: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=settings.LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Get all preferences.
+
+    Pages are ordered by creation time, pass the X-Next-Cursor header of a
+    page as cursor to get the next one. fields limits the returned fields.
     """
     preferences = await crud.preference.get_multi(
-        db, agent_id=agent_id, category=category, skip=skip, limit=limit
+        db,
+        agent_id=agent_id,
+        category=category,
+        skip=skip,
+        limit=limit,
+        after=decode_cursor(cursor),
+        columns=parse_fields(PreferenceModel, fields),
     )
-    return preferences
+    return page_response(response, preferences, limit, fields)
 
 
 @router.post("/", response_model=Preference)
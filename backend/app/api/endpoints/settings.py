@@ -1,24 +1,37 @@
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
 from app.api.deps import get_db
+from app.core.config import settings as app_settings
+from app.db.models.settings import Settings as SettingsModel
 from app.schemas.settings import AllSettings, ProviderSettings, Settings, SettingsCreate, SettingsUpdate
+from app.utils.llm_providers import invalidate_chat_models
+from app.utils.pagination import decode_cursor, page_response, parse_fields
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[Settings])
 async def get_settings(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=app_settings.LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
 ) -> Any:
-    """Get all settings."""
-    settings = await crud.settings.get_multi(db, skip=skip, limit=limit)
-    return settings
+    """Get all settings, a page at a time (see app/utils/pagination.py)."""
+    settings = await crud.settings.get_multi(
+        db,
+        skip=skip,
+        limit=limit,
+        after=decode_cursor(cursor),
+        columns=parse_fields(SettingsModel, fields),
+    )
+    return page_response(response, settings, limit, fields)
 
 
 @router.get("/all", response_model=AllSettings)
@@ -76,7 +89,11 @@ async def update_setting(
             detail=f"Setting with key {key} not found",
         )
 
-    return await crud.settings.update(db, setting, setting_in)
+    setting = await crud.settings.update(db, setting, setting_in)
+    if key.startswith("provider_"):
+        invalidate_chat_models(key[len("provider_"):])
+
+    return setting
 
 
 @router.get("/{key}", response_model=Settings)
@@ -108,7 +125,11 @@ async def delete_setting(
             detail=f"Setting with key {key} not found",
         )
 
-    return await crud.settings.delete(db, setting.id)
+    setting = await crud.settings.delete(db, setting.id)
+    if key.startswith("provider_"):
+        invalidate_chat_models(key[len("provider_"):])
+
+    return setting
 
 
 @router.post("/provider/{provider}", response_model=Settings)
@@ -128,13 +149,18 @@ async def update_provider_settings(
     settings_dict = settings.model_dump(exclude_none=True)
 
     # Upsert the settings
-    return await crud.settings.upsert(
+    setting = await crud.settings.upsert(
         db,
         key=f"provider_{provider}",
         value=settings_dict,
         description=f"Settings for {provider} provider",
     )
 
+    # Chat models built with the old settings are stale now
+    invalidate_chat_models(provider)
+
+    return setting
+
 
 @router.get("/provider/{provider}", response_model=ProviderSettings)
 async def get_provider_settings(
@@ -181,8 +207,8 @@ async def delete_provider_settings(
         )
 
     # Delete the settings
-    await db.delete(setting)
-    await db.commit()
+    await crud.settings.delete(db, setting.id)
+    invalidate_chat_models(provider)
 
     return None
 
@@ -4,35 +4,50 @@ API endpoints for task templates.
 
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
 from app.api.deps import get_db
+from app.core.config import settings
+from app.db.models.knowledge_base import TaskTemplate as TaskTemplateModel
 from app.schemas.knowledge_base import (
     TaskTemplate,
     TaskTemplateCreate,
     TaskTemplateUpdate,
 )
+from app.utils.pagination import decode_cursor, page_response, parse_fields
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[TaskTemplate])
 async def get_task_templates(
+    response: Response,
     agent_id: Optional[str] = None,
     task_type: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=settings.LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Get all task templates.
+
+    Pages are ordered by creation time, pass the X-Next-Cursor header of a
+    page as cursor to get the next one. fields limits the returned fields.
     """
     task_templates = await crud.task_template.get_multi(
-        db, agent_id=agent_id, task_type=task_type, skip=skip, limit=limit
+        db,
+        agent_id=agent_id,
+        task_type=task_type,
+        skip=skip,
+        limit=limit,
+        after=decode_cursor(cursor),
+        columns=parse_fields(TaskTemplateModel, fields),
     )
-    return task_templates
+    return page_response(response, task_templates, limit, fields)
 
 
 @router.post("/", response_model=TaskTemplate)
@@ -0,0 +1,143 @@
+"""
+API endpoints for workflow execution.
+"""
+
+import asyncio
+import uuid
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.api.deps import get_db
+from app.api.endpoints.workflow_test import SAMPLE_WORKFLOWS
+from app.schemas.workflow import WorkflowJobCreate
+from app.services import workflow_store
+
+router = APIRouter()
+
+
+async def get_workflow_definition(db: AsyncSession, workflow_id: str) -> Optional[Dict[str, Any]]:
+    """Get the definition of a test workflow, or of a stored workflow by UUID."""
+    workflow = next((w for w in SAMPLE_WORKFLOWS if w["id"] == workflow_id), None)
+    if workflow is not None:
+        return workflow["definition"]
+
+    try:
+        db_workflow = await crud.workflow.get(db, uuid.UUID(workflow_id))
+    except ValueError:
+        return None
+    return db_workflow.definition if db_workflow is not None else None
+
+
+@router.post("/test/{workflow_id}/execute")
+async def execute_workflow(
+    workflow_id: str,
+    input_data: Dict[str, Any] = Body(default={}),
+    bypass_cache: bool = False,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Execute a test workflow and wait for the result.
+
+    The execution and each of its steps are stored as they complete, so an
+    execution interrupted by a restart is resumed rather than lost. Use the
+    job endpoints to run long workflows without holding the request open.
+    Set bypass_cache to run every step instead of reusing cached results.
+    """
+    definition = await get_workflow_definition(db, workflow_id)
+    if definition is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+
+    # Stored already leased, so a polling worker can't pick it up first
+    execution = await workflow_store.create_execution(
+        db, workflow_id, definition, input_data, bypass_cache=bypass_cache, leased=True
+    )
+    return await asyncio.shield(workflow_store.run_in_background(execution.id))
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(
+    job: WorkflowJobCreate,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Submit a workflow execution to the job queue.
+
+    The execution is run by the next workflow worker with a free slot, in
+    priority order. Poll GET /jobs/{execution_id} for its status and result.
+    """
+    definition = await get_workflow_definition(db, job.workflow_id)
+    if definition is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+
+    execution = await workflow_store.create_execution(
+        db,
+        job.workflow_id,
+        definition,
+        job.input_data,
+        priority=job.priority,
+        bypass_cache=job.bypass_cache,
+    )
+    return workflow_store.execution_to_dict(execution)
+
+
+@router.get("/jobs/{execution_id}")
+@router.get("/executions/{execution_id}")
+async def get_execution(
+    execution_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Get a workflow execution with its steps.
+    """
+    execution = await workflow_store.get_execution(db, execution_id)
+    if execution is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    steps = await workflow_store.get_step_executions(db, execution_id)
+    return workflow_store.execution_to_dict(execution, steps)
+
+
+@router.post("/jobs/{execution_id}/cancel")
+async def cancel_job(
+    execution_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Cancel a queued or running workflow execution.
+
+    A running execution is stopped by its worker at the next heartbeat.
+    """
+    execution = await workflow_store.get_execution(db, execution_id)
+    if execution is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    if not await workflow_store.cancel_execution(db, execution_id):
+        raise HTTPException(status_code=409, detail=f"Execution is already {execution.status}")
+
+    await db.refresh(execution)
+    return workflow_store.execution_to_dict(execution)
+
+
+@router.post("/executions/{execution_id}/resume")
+async def resume_execution(
+    execution_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Resume an interrupted workflow execution and wait for the result.
+
+    Steps completed before the interruption are not run again. Only
+    executions whose heartbeat is older than WORKFLOW_HEARTBEAT_TIMEOUT can
+    be resumed, so a run still in progress elsewhere isn't duplicated.
+    """
+    execution = await workflow_store.get_execution(db, execution_id)
+    if execution is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    if not await workflow_store.claim_execution(db, execution_id):
+        raise HTTPException(status_code=409, detail=f"Execution is {execution.status}, not interrupted")
+
+    return await asyncio.shield(workflow_store.run_in_background(execution_id))
@@ -2,8 +2,14 @@
 Test API endpoints for workflow system.
 """
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException
+import uuid
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app.core.config import settings
+from app.services import workflow_store
 
 router = APIRouter()
 
@@ -81,35 +87,6 @@ SAMPLE_WORKFLOWS = [
     }
 ]
 
-SAMPLE_EXECUTIONS = [
-    {
-        "id": "exec1",
-        "workflow_id": "1",
-        "started_at": "2023-01-01T12:00:00Z",
-        "completed_at": "2023-01-01T12:00:02Z",
-        "status": "completed",
-        "result": {"result": 10},
-        "error": None,
-        "execution_time": 2.0,
-        "input_data": {"value": 5},
-        "output_data": {"result": 10},
-        "steps": [
-            {
-                "id": "step_exec1",
-                "step_id": "step1",
-                "step_name": "First Step",
-                "status": "completed",
-                "started_at": "2023-01-01T12:00:00Z",
-                "completed_at": "2023-01-01T12:00:02Z",
-                "execution_time": 2.0,
-                "error": None,
-                "input_data": {"value": 5},
-                "output_data": {"result": 10}
-            }
-        ]
-    }
-]
-
 SAMPLE_OPTIMIZATIONS = [
     {
         "id": "opt1",
@@ -182,22 +159,34 @@ async def create_workflow(workflow: Dict[str, Any]):
     return workflow
 
 @router.get("/test/{workflow_id}/executions")
-async def get_workflow_executions(workflow_id: str):
+async def get_workflow_executions(
+    workflow_id: str,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=settings.LIST_MAX_LIMIT),
+    status: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Get all executions for a test workflow.
+    Get the executions of a test workflow, newest first.
     """
-    return [e for e in SAMPLE_EXECUTIONS if e["workflow_id"] == workflow_id]
+    executions = await workflow_store.list_executions(db, workflow_id, status=status, skip=skip, limit=limit)
+    return [workflow_store.execution_to_dict(execution) for execution in executions]
 
 @router.get("/test/{workflow_id}/executions/{execution_id}")
-async def get_workflow_execution(workflow_id: str, execution_id: str):
+async def get_workflow_execution(
+    workflow_id: str,
+    execution_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+):
     """
     Get a specific execution for a test workflow.
     """
-    for execution in SAMPLE_EXECUTIONS:
-        if execution["workflow_id"] == workflow_id and execution["id"] == execution_id:
-            return execution
+    execution = await workflow_store.get_execution(db, execution_id)
+    if execution is None or execution.workflow_id != workflow_id:
+        raise HTTPException(status_code=404, detail="Execution not found")
 
-    raise HTTPException(status_code=404, detail="Execution not found")
+    steps = await workflow_store.get_step_executions(db, execution_id)
+    return workflow_store.execution_to_dict(execution, steps)
 
 @router.get("/test/{workflow_id}/optimizations")
 async def get_workflow_optimizations(workflow_id: str):
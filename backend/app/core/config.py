@@ -45,6 +45,16 @@ class Settings(BaseSettings):
         values = info.data
         return f"postgresql+asyncpg://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@{values.get('POSTGRES_SERVER')}:{values.get('POSTGRES_PORT')}/{values.get('POSTGRES_DB') or ''}"
 
+    # Database connection pool
+    DB_ECHO: bool = False  # Log every SQL statement
+    DB_POOL_SIZE: int = 10  # Connections kept open per process
+    DB_MAX_OVERFLOW: int = 20  # Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_PRE_PING: bool = True  # Check connections are alive before handing them out
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced, -1 to keep them
+    DB_STATEMENT_CACHE_SIZE: int = 500  # Prepared statements cached per connection
+    DB_PGBOUNCER: bool = False  # Behind PgBouncer in transaction mode: no prepared statement caches
+
     # LLM Provider settings
 
     # Default Provider and Model
@@ -70,9 +80,97 @@ class Settings(BaseSettings):
     CUSTOM_API_BASE: str = "https://llm.chutes.ai/v1"
     CUSTOM_DEFAULT_MODEL: str = "RekaAI/reka-flash-3"
 
+    # Cache of values from the settings table
+    SETTINGS_CACHE_TTL: int = 60  # Seconds
+    SETTINGS_CACHE_NOTIFY: bool = False  # Fan invalidations out to all workers with LISTEN/NOTIFY
+
+    # Cache of constructed chat model clients
+    CHAT_MODEL_CACHE_SIZE: int = 64
+    CHAT_MODEL_CACHE_TTL: int = 600  # Seconds
+
+    # Threads used to call LLM providers that only have a blocking API
+    LLM_SYNC_MAX_WORKERS: int = 8
+
+    # Memory retention
+    RETENTION_ENABLED: bool = True
+    RETENTION_INTERVAL: int = 300  # Seconds between retention runs
+    RETENTION_POLICIES: Dict[str, int] = {  # Retention period in seconds by memory type
+        "temporary": 7 * 24 * 3600,
+        "execution": 24 * 3600,
+    }
+    RETENTION_PARTITION_ACTION: str = "drop"  # drop or detach expired partitions
+    MEMORY_PARTITIONED: bool = False  # Partition memory by type and day, see app/db/partitions.py
+    MEMORY_PARTITION_DAYS_AHEAD: int = 3  # Days of partitions created in advance
+    RETENTION_BATCH_SIZE: int = 1000  # Rows deleted per transaction
+    RETENTION_BATCH_SLEEP: float = 0.1  # Seconds to pause between chunks
+
+    # Buffer memory inserts and write them in batches
+    MEMORY_WRITE_BEHIND: bool = True  # False to wait for every memory write to be committed
+    MEMORY_WRITE_BATCH_SIZE: int = 100
+    MEMORY_WRITE_FLUSH_INTERVAL_MS: int = 50
+
+    # Prometheus metrics served at /metrics
+    METRICS_ENABLED: bool = True
+
+    # List endpoints
+    LIST_MAX_LIMIT: int = 1000  # Largest page a list endpoint returns
+    LIST_EXCLUDED_FIELDS: List[str] = ["embedding"]  # Left out of list items unless requested with fields=
+
+    # Load the sections of an agent's context concurrently, one pooled connection each.
+    # A request then holds 6 connections instead of 1, so only a few concurrent
+    # requests fit in DB_POOL_SIZE + DB_MAX_OVERFLOW before they wait for the pool
+    CONTEXT_CONCURRENT_LOADING: bool = False
+
+    # Prompt assembly
+    PROMPT_DEFAULT_CONTEXT_WINDOW: int = 8192  # Tokens, for models without a known context window
+    PROMPT_TOKEN_BUDGET: int = 0  # Cap on prompt tokens, 0 to use the model's context window
+
+    # Rolling summaries of history older than the memory window
+    SUMMARY_ENABLED: bool = True
+    SUMMARY_MIN_MESSAGES: int = 10  # Messages to collect before folding them into the summary
+    SUMMARY_MAX_MESSAGES: int = 50  # Messages folded per update
+    SUMMARY_MAX_TOKENS: int = 512
+
+    # Outbound HTTP (LLM providers)
+    HTTP2_ENABLED: bool = True
+    HTTP_POOL_MAX_CONNECTIONS: int = 100  # Per provider host
+    HTTP_POOL_MAX_KEEPALIVE: int = 20  # Per provider host
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept open
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+    HTTP_TIMEOUT: float = 60.0
+
     # Vector database settings
-    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_MODEL: str = "text-embedding-3-small"  # "local-stub" for the offline deterministic embedder
+    EMBEDDING_PROVIDER: str = "openai"  # Provider whose embeddings endpoint is used
+    EMBEDDING_BATCH_SIZE: int = 64  # Maximum texts per provider call
+    EMBEDDING_BATCH_WAIT_MS: int = 10  # How long to wait for concurrent requests to join a batch
+    EMBEDDING_BACKFILL_ENABLED: bool = False  # Calls EMBEDDING_PROVIDER for every row saved without an embedding
+    EMBEDDING_BACKFILL_INTERVAL: int = 30  # Seconds between backfill passes
+    EMBEDDING_BACKFILL_RETRY_INTERVAL: int = 3600  # Seconds before rows that failed to embed are tried again
+    EMBEDDING_DIMENSIONS: int = 1536
     VECTOR_SIMILARITY_METRIC: str = "cosine"  # cosine, l2, inner_product
+    PGVECTOR_ENABLED: bool = True  # Store memory embeddings as pgvector vectors with an HNSW index
+    VECTOR_HNSW_EF_SEARCH: int = 100  # Candidate list size for HNSW queries
+    VECTOR_CACHE_MAX_AGENTS: int = 256  # Agents whose embedding matrices are cached without pgvector
+    VECTOR_CACHE_TTL: int = 300  # Seconds
+
+    # Workflow execution
+    WORKFLOW_MAX_CONCURRENCY: int = 4  # Default cap on steps running at once per workflow
+    WORKFLOW_HEARTBEAT_INTERVAL: int = 10  # Seconds between heartbeats of a running execution
+    WORKFLOW_HEARTBEAT_TIMEOUT: int = 60  # Visibility timeout: seconds without a heartbeat before a job is leased again
+    WORKFLOW_MAX_ATTEMPTS: int = 3  # Leases of an execution before an interrupted one is failed instead of leased again
+    WORKFLOW_WORKER_ENABLED: bool = True  # Run a workflow worker in the API process
+    WORKFLOW_WORKER_CONCURRENCY: int = 4  # Executions a worker runs at once
+    WORKFLOW_WORKER_POLL_INTERVAL: float = 1.0  # Seconds between polls of an empty job queue
+    WORKFLOW_CODE_POOL_SIZE: int = 2  # Processes running transform and condition code, 0 runs it in-process
+    WORKFLOW_CODE_CPU_LIMIT: float = 10.0  # CPU seconds a transform or condition step may use
+    WORKFLOW_CODE_MEMORY_LIMIT: int = 512  # Megabytes of memory per code process, 0 for no limit
+    WORKFLOW_CODE_CACHE_SIZE: int = 256  # Compiled code objects cached per process
+    WORKFLOW_STEP_CACHE_ENABLED: bool = True  # Reuse results of steps that opt in with a cache config
+    WORKFLOW_STEP_CACHE_SIZE: int = 1024  # Step results cached in memory per process
+    WORKFLOW_STEP_CACHE_TTL: int = 3600  # Default seconds a cached step result is reused
+    WORKFLOW_STEP_CACHE_PERSIST: bool = True  # Also cache step results in the database, shared by all workers
+    WORKFLOW_BINDING_CACHE_SIZE: int = 128  # Workflow definitions whose compiled bindings are cached
 
     class Config:
         case_sensitive = True
@@ -0,0 +1,211 @@
+"""
+Generic async CRUD operations.
+
+CRUDBase implements the operations shared by all models against an
+AsyncSession. Lists are paginated by keyset on (created_at, id), so a page
+costs the same however deep it is, and the bulk operations write all rows
+with a single statement instead of one round trip per row.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+
+from pydantic import BaseModel
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base_class import Base
+
+ModelType = TypeVar("ModelType", bound=Base)
+CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
+UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
+
+# Position of a row in a keyset-paginated list, see CRUDBase.cursor
+Cursor = Tuple[datetime, Any]
+
+
+class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    Async CRUD operations of a model.
+    """
+
+    def __init__(self, model: Type[ModelType]):
+        """Initialize the CRUD operations of a model."""
+        self.model = model
+
+    @staticmethod
+    def cursor(db_obj: ModelType) -> Cursor:
+        """Get the keyset cursor of a row, to fetch the rows after it with get_multi."""
+        return (db_obj.created_at, db_obj.id)
+
+    def _values(self, obj_in: Union[CreateSchemaType, Dict[str, Any]]) -> Dict[str, Any]:
+        """Get the column values of a new row."""
+        values = dict(obj_in) if isinstance(obj_in, dict) else obj_in.model_dump()
+        # Not every model has a default for its ID
+        if values.get("id") is None:
+            values["id"] = uuid.uuid4()
+        return values
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """Get a row by ID."""
+        result = await db.execute(select(self.model).where(self.model.id == id))
+        return result.scalars().first()
+
+    async def get_many(self, db: AsyncSession, ids: Sequence[Any]) -> List[ModelType]:
+        """
+        Get rows by ID with a single query.
+
+        Args:
+            db: Database session
+            ids: Row IDs
+
+        Returns:
+            The rows found, in the order of ids
+        """
+        if not ids:
+            return []
+
+        result = await db.execute(select(self.model).where(self.model.id.in_(ids)))
+        rows = {str(db_obj.id): db_obj for db_obj in result.scalars().all()}
+        return [rows[str(id)] for id in ids if str(id) in rows]
+
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        filters: Optional[Dict[str, Any]] = None,
+        after: Optional[Cursor] = None,
+        descending: bool = False,
+        skip: int = 0,
+        limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Union[List[ModelType], List[Dict[str, Any]]]:
+        """
+        Get a page of rows, ordered by (created_at, id).
+
+        Args:
+            db: Database session
+            filters: Column values the rows must have, None values are ignored
+            after: Cursor of the last row of the previous page
+            descending: Newest rows first
+            skip: Number of rows to skip, only used without a cursor
+            limit: Maximum number of rows to return
+            columns: Only load these columns, plus id and created_at
+
+        Returns:
+            List of rows, or of dictionaries of the loaded columns when
+            columns are given
+        """
+        if columns is not None:
+            names = ["id", "created_at", *(name for name in columns if name not in ("id", "created_at"))]
+            query = select(*(getattr(self.model, name) for name in names))
+        else:
+            query = select(self.model)
+
+        for column, value in (filters or {}).items():
+            if value is not None:
+                query = query.where(getattr(self.model, column) == value)
+
+        key = tuple_(self.model.created_at, self.model.id)
+        if after is not None:
+            query = query.where(key < tuple_(*after) if descending else key > tuple_(*after))
+        elif skip:
+            query = query.offset(skip)
+
+        if descending:
+            query = query.order_by(self.model.created_at.desc(), self.model.id.desc())
+        else:
+            query = query.order_by(self.model.created_at, self.model.id)
+
+        result = await db.execute(query.limit(limit))
+        if columns is not None:
+            return [dict(row) for row in result.mappings().all()]
+        return result.scalars().all()
+
+    async def create(self, db: AsyncSession, obj_in: Union[CreateSchemaType, Dict[str, Any]]) -> ModelType:
+        """Create a row."""
+        db_obj = self.model(**self._values(obj_in))
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def bulk_create(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+    ) -> List[ModelType]:
+        """
+        Create rows with a single multi-row INSERT ... RETURNING.
+
+        Args:
+            db: Database session
+            objs_in: Rows to create
+
+        Returns:
+            The created rows, in the order of objs_in
+        """
+        if not objs_in:
+            return []
+
+        result = await db.scalars(
+            insert(self.model).returning(self.model, sort_by_parameter_order=True),
+            [self._values(obj_in) for obj_in in objs_in],
+        )
+        db_objs = result.all()
+        await db.commit()
+        return db_objs
+
+    async def update(
+        self,
+        db: AsyncSession,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+    ) -> ModelType:
+        """Update a row."""
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+
+        for field in update_data:
+            setattr(db_obj, field, update_data[field])
+
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def bulk_update(self, db: AsyncSession, rows: Sequence[Dict[str, Any]]) -> int:
+        """
+        Update rows by ID with a single UPDATE statement.
+
+        The statement is executed once for all rows as a batch, rows that
+        set different columns are grouped into one batch per set of columns.
+
+        Args:
+            db: Database session
+            rows: Column values to set, each including the row's "id"
+
+        Returns:
+            Number of rows given
+        """
+        if not rows:
+            return 0
+
+        now = datetime.utcnow()
+        await db.execute(
+            update(self.model),
+            [{"updated_at": now, **row} for row in rows],
+        )
+        await db.commit()
+        return len(rows)
+
+    async def delete(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """Delete a row by ID."""
+        db_obj = await self.get(db, id)
+        if db_obj is not None:
+            await db.delete(db_obj)
+            await db.commit()
+        return db_obj
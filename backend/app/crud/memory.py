@@ -1,121 +1,71 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
-from fastapi import HTTPException, status
+"""
+CRUD operations for memories.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase, Cursor
 from app.db.models.memory import Memory
 from app.schemas.memory import MemoryCreate, MemoryUpdate
-import logging
+from app.utils.vector_scoring import embedding_cache
 
-logger = logging.getLogger(__name__)
 
-def get_memory(db: Session, memory_id: int) -> Optional[Memory]:
-    """
-    Get a memory by ID.
-    
-    Args:
-        db: Database session
-        memory_id: ID of the memory to get
-        
-    Returns:
-        The memory if found, None otherwise
+class CRUDMemory(CRUDBase[Memory, MemoryCreate, MemoryUpdate]):
     """
-    return db.query(Memory).filter(Memory.id == memory_id).first()
+    CRUD operations for memories.
 
-def get_memories_by_agent(db: Session, agent_id: int, skip: int = 0, limit: int = 100) -> List[Memory]:
+    The bulk operations skip mapper events, so they drop the cached embedding
+    matrices of the agents they touch themselves.
     """
-    Get all memories for an agent.
-    
-    Args:
-        db: Database session
-        agent_id: ID of the agent
-        skip: Number of memories to skip
-        limit: Maximum number of memories to return
-        
-    Returns:
-        List of memories
-    """
-    return db.query(Memory).filter(Memory.agent_id == agent_id).offset(skip).limit(limit).all()
 
-def create_memory(db: Session, memory: MemoryCreate) -> Memory:
-    """
-    Create a new memory.
-    
-    Args:
-        db: Database session
-        memory: Memory data
-        
-    Returns:
-        The created memory
-    """
-    try:
-        db_memory = Memory(**memory.dict())
-        db.add(db_memory)
-        db.commit()
-        db.refresh(db_memory)
-        return db_memory
-    except SQLAlchemyError as e:
-        db.rollback()
-        logger.error(f"Error creating memory: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error creating memory",
+    async def get_by_agent(
+        self,
+        db: AsyncSession,
+        agent_id: str,
+        *,
+        memory_type: Optional[str] = None,
+        after: Optional[Cursor] = None,
+        limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Union[List[Memory], List[Dict[str, Any]]]:
+        """Get a page of an agent's memories, oldest first."""
+        return await self.get_multi(
+            db,
+            filters={"agent_id": agent_id, "memory_type": memory_type},
+            after=after,
+            limit=limit,
+            columns=columns,
         )
 
-def update_memory(db: Session, memory_id: int, memory: MemoryUpdate) -> Optional[Memory]:
-    """
-    Update a memory.
-    
-    Args:
-        db: Database session
-        memory_id: ID of the memory to update
-        memory: Updated memory data
-        
-    Returns:
-        The updated memory if found, None otherwise
-    """
-    try:
-        db_memory = get_memory(db, memory_id)
-        if not db_memory:
-            return None
-            
-        # Update memory fields
-        for key, value in memory.dict(exclude_unset=True).items():
-            setattr(db_memory, key, value)
-            
-        db.commit()
-        db.refresh(db_memory)
-        return db_memory
-    except SQLAlchemyError as e:
-        db.rollback()
-        logger.error(f"Error updating memory: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error updating memory",
-        )
+    async def bulk_create(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[Union[MemoryCreate, Dict[str, Any]]],
+    ) -> List[Memory]:
+        """Create memories with a single multi-row INSERT ... RETURNING."""
+        db_objs = await super().bulk_create(db, objs_in)
+        for agent_id in {db_obj.agent_id for db_obj in db_objs}:
+            embedding_cache.invalidate(agent_id)
+        return db_objs
 
-def delete_memory(db: Session, memory_id: int) -> bool:
-    """
-    Delete a memory.
-    
-    Args:
-        db: Database session
-        memory_id: ID of the memory to delete
-        
-    Returns:
-        True if the memory was deleted, False otherwise
-    """
-    try:
-        db_memory = get_memory(db, memory_id)
-        if not db_memory:
-            return False
-            
-        db.delete(db_memory)
-        db.commit()
-        return True
-    except SQLAlchemyError as e:
-        db.rollback()
-        logger.error(f"Error deleting memory: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error deleting memory",
-        )
+    async def bulk_update(self, db: AsyncSession, rows: Sequence[Dict[str, Any]]) -> int:
+        """Update memories by ID with a single UPDATE statement."""
+        updated = await super().bulk_update(db, rows)
+        if updated:
+            embedding_cache.invalidate()
+        return updated
+
+
+crud_memory = CRUDMemory(Memory)
+
+get = crud_memory.get
+get_many = crud_memory.get_many
+get_multi = crud_memory.get_multi
+get_by_agent = crud_memory.get_by_agent
+create = crud_memory.create
+bulk_create = crud_memory.bulk_create
+update = crud_memory.update
+bulk_update = crud_memory.bulk_update
+delete = crud_memory.delete
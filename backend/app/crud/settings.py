@@ -1,10 +1,14 @@
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Union
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.crud.base import CRUDBase, Cursor
 from app.db.models.settings import Settings
 from app.schemas.settings import SettingsCreate, SettingsUpdate
+from app.services.settings import publish_settings_change, settings_cache
+
+crud_settings = CRUDBase[Settings, SettingsCreate, SettingsUpdate](Settings)
 
 
 async def get(db: AsyncSession, id: str) -> Optional[Settings]:
@@ -19,10 +23,15 @@ async def get_by_key(db: AsyncSession, key: str) -> Optional[Settings]:
     return result.scalars().first()
 
 
-async def get_multi(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Settings]:
+async def get_multi(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Cursor] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> Union[List[Settings], List[Dict[str, Any]]]:
     """Get multiple settings."""
-    result = await db.execute(select(Settings).offset(skip).limit(limit))
-    return result.scalars().all()
+    return await crud_settings.get_multi(db, after=after, skip=skip, limit=limit, columns=columns)
 
 
 async def create(db: AsyncSession, obj_in: SettingsCreate) -> Settings:
@@ -33,7 +42,9 @@ async def create(db: AsyncSession, obj_in: SettingsCreate) -> Settings:
         description=obj_in.description,
     )
     db.add(db_obj)
+    await publish_settings_change(db, db_obj.key)
     await db.commit()
+    settings_cache.invalidate(db_obj.key)
     await db.refresh(db_obj)
     return db_obj
 
@@ -51,7 +62,9 @@ async def update(
         setattr(db_obj, field, update_data[field])
     
     db.add(db_obj)
+    await publish_settings_change(db, db_obj.key)
     await db.commit()
+    settings_cache.invalidate(db_obj.key)
     await db.refresh(db_obj)
     return db_obj
 
@@ -60,7 +73,9 @@ async def delete(db: AsyncSession, id: str) -> Settings:
     """Delete a setting."""
     db_obj = await get(db, id)
     await db.delete(db_obj)
+    await publish_settings_change(db, db_obj.key)
     await db.commit()
+    settings_cache.invalidate(db_obj.key)
     return db_obj
 
 
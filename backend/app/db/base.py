@@ -9,6 +9,8 @@ from app.db.base_class import Base
 from app.db.models.agent import Agent
 from app.db.models.memory import Memory
 from app.db.models.workflow import Workflow
+from app.db.models.workflow_execution import WorkflowExecution, WorkflowStepCache, WorkflowStepExecution
 from app.db.models.knowledgebase import KnowledgeBase
 from app.db.models.document import Document
+from app.db.models.embedding_cache import EmbeddingCache
 from app.db.models.settings import Settings
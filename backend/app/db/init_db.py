@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import engine, async_session
 from app.db.base import Base
+from app.db.partitions import ensure_memory_partitions
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +36,10 @@ async def init_db() -> None:
         logger.error(f"Error creating database tables: {e}")
         raise
 
+    # Create the memory partitions, if the table is partitioned
+    async with async_session() as session:
+        await ensure_memory_partitions(session)
+
     logger.info("Database initialized")
 
 
@@ -5,16 +5,19 @@ Database models.
 from app.db.models.agent import Agent
 from app.db.models.associations import agent_knowledge_base
 from app.db.models.document import Document
+from app.db.models.embedding_cache import EmbeddingCache
 from app.db.models.knowledge import DocumentKnowledgeBase
 from app.db.models.knowledge_base import TaskTemplate, Preference, KnowledgeBase
 # from app.db.models.knowledgebase import KnowledgeBase
 from app.db.models.memory import Memory
 from app.db.models.settings import Settings
 from app.db.models.workflow import Workflow
+from app.db.models.workflow_execution import WorkflowExecution, WorkflowStepCache, WorkflowStepExecution
 
 __all__ = [
     "Agent",
     "Document",
+    "EmbeddingCache",
     "DocumentKnowledgeBase",
     "KnowledgeBase",
     "TaskTemplate",
@@ -22,5 +25,8 @@ __all__ = [
     "Memory",
     "Settings",
     "Workflow",
+    "WorkflowExecution",
+    "WorkflowStepCache",
+    "WorkflowStepExecution",
     "agent_knowledge_base",
 ]
@@ -4,7 +4,7 @@ Document model.
 
 import uuid
 
-from sqlalchemy import Column, ForeignKey, Float, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Float, String, Text
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import relationship
 
@@ -32,6 +32,9 @@ class Document(Base):
 
     # Embeddings
     embedding = Column(ARRAY(Float), nullable=True)
+    # When the backfill last failed to embed the row, which it is skipped for
+    # EMBEDDING_BACKFILL_RETRY_INTERVAL
+    embedding_failed_at = Column(DateTime, nullable=True)
 
     # Additional metadata
     meta_data = Column(JSONB, nullable=True)
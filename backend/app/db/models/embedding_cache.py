@@ -0,0 +1,28 @@
+"""
+Embedding cache database model.
+"""
+
+import uuid
+
+from sqlalchemy import Column, Float, String
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+from app.db.base_class import Base
+
+
+class EmbeddingCache(Base):
+    """
+    Embedding cache model for reusing embeddings of identical content.
+    """
+    __tablename__ = "embedding_cache"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # SHA-256 of the embedding model and the content
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)
+
+    # Model used to generate the embedding
+    model = Column(String, nullable=False)
+
+    # The embedding
+    embedding = Column(ARRAY(Float), nullable=False)
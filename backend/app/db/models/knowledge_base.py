@@ -47,6 +47,9 @@ class KnowledgeBase(Base):
 
     # Vector embedding for semantic search
     embedding = Column(ARRAY(Float), nullable=True)
+    # When the backfill last failed to embed the row, which it is skipped for
+    # EMBEDDING_BACKFILL_RETRY_INTERVAL
+    embedding_failed_at = Column(DateTime, nullable=True)
 
     # Additional metadata
     meta_data = Column(JSONB, nullable=True)
@@ -3,18 +3,48 @@ Memory database model.
 """
 
 import uuid
-from sqlalchemy import Column, Float, ForeignKey, String, Text
-from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+from sqlalchemy import Column, DateTime, ForeignKey, Index, PrimaryKeyConstraint, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 
+from app.core.config import settings
 from app.db.base_class import Base
+from app.db.vector import embedding_type, vector_ops
 
 
 class Memory(Base):
     """
     Memory database model for storing agent conversation history and vector memories.
     """
-    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
+    __table_args__ = (
+        # Latest memories of an agent, used to load conversation history
+        Index("ix_memory_agent_id_created_at", "agent_id", text("created_at DESC")),
+        # Expired memories of a type, used by retention
+        Index("ix_memory_memory_type_created_at", "memory_type", "created_at"),
+    ) + ((
+        # Approximate nearest neighbour index for similarity search
+        Index(
+            "ix_memory_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": vector_ops()},
+        ),
+    ) if settings.PGVECTOR_ENABLED else ()) + ((
+        # The primary key of a partitioned table must include the partition
+        # keys, so the database doesn't enforce that id alone is unique. IDs
+        # are random UUIDs, see app/db/partitions.py for the partitions
+        PrimaryKeyConstraint("id", "memory_type", "created_at"),
+        {"postgresql_partition_by": "LIST (memory_type)"},
+    ) if settings.MEMORY_PARTITIONED else ())
+
+    # Partitioned tables declare their primary key in __table_args__
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=not settings.MEMORY_PARTITIONED,
+        nullable=False,
+        index=True,
+        default=uuid.uuid4,
+    )
     agent_id = Column(UUID(as_uuid=True), ForeignKey("agent.id"), nullable=False)
 
     # Memory content
@@ -28,10 +58,17 @@ class Memory(Base):
     memory_type = Column(String, nullable=False, default="permanent")
 
     # For vector memories
-    embedding = Column(ARRAY(Float), nullable=True)
+    embedding = Column(embedding_type(), nullable=True)
+    # When the backfill last failed to embed the row, which it is skipped for
+    # EMBEDDING_BACKFILL_RETRY_INTERVAL
+    embedding_failed_at = Column(DateTime, nullable=True)
 
     # Metadata
     meta_data = Column(JSONB, default={})
 
     # Relationships
     agent = relationship("Agent", back_populates="memories")
+
+    # Memories are identified by ID alone, also when the table's primary key
+    # includes the partition keys
+    __mapper_args__ = {"primary_key": [id]}
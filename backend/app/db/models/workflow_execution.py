@@ -0,0 +1,128 @@
+"""
+Workflow execution database models.
+"""
+
+import uuid
+
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+
+class WorkflowExecution(Base):
+    """
+    A run of a workflow, and the job queue of workflow workers.
+
+    The workflow definition is stored with the run, so a run that is resumed
+    after a restart executes the same steps even if the workflow was edited
+    in the meantime.
+    """
+    __tablename__ = "workflow_execution"
+    __table_args__ = (
+        # Workers poll for the highest priority, oldest pending executions
+        Index(
+            "ix_workflow_execution_queue",
+            text("priority DESC"),
+            "created_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        # and for running executions whose heartbeat stopped
+        Index(
+            "ix_workflow_execution_heartbeat_at",
+            "heartbeat_at",
+            postgresql_where=text("status = 'running'"),
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    workflow_id = Column(String, nullable=False, index=True)
+
+    # pending, running, completed, failed, cancelled
+    status = Column(String, nullable=False, default="pending", index=True)
+
+    # Pending executions with a higher priority are run first
+    priority = Column(Integer, nullable=False, default=0)
+
+    definition = Column(JSONB, nullable=False)
+    input_data = Column(JSONB, nullable=False, default={})
+    output_data = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    execution_time = Column(Float, nullable=False, default=0.0)
+
+    # The worker holding the lease of a running execution. It refreshes the
+    # heartbeat while it runs the execution; a running execution whose
+    # heartbeat is older than the visibility timeout was interrupted, and is
+    # leased again by the next worker that polls the queue
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    # Run every step instead of reusing cached step results
+    bypass_cache = Column(Boolean, nullable=False, default=False)
+
+    steps = relationship(
+        "WorkflowStepExecution",
+        back_populates="execution",
+        cascade="all, delete-orphan",
+        order_by="WorkflowStepExecution.started_at",
+    )
+
+
+class WorkflowStepExecution(Base):
+    """
+    The checkpointed result of a step of a workflow execution.
+    """
+    __tablename__ = "workflow_step_execution"
+    __table_args__ = (
+        UniqueConstraint("execution_id", "step_id", name="uq_workflow_step_execution_step"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    execution_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("workflow_execution.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    step_id = Column(String, nullable=False)
+    step_name = Column(String, nullable=True)
+    step_type = Column(String, nullable=True)
+
+    # completed or failed, only completed steps are skipped when resuming
+    status = Column(String, nullable=False)
+
+    # Input bound by the step's input config, None if it received the
+    # workflow input
+    input_data = Column(JSONB, nullable=True)
+    output_data = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Result cache use of the step: hit, miss or bypass, None if not cached
+    cache_status = Column(String, nullable=True)
+
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    execution_time = Column(Float, nullable=False, default=0.0)
+
+    execution = relationship("WorkflowExecution", back_populates="steps")
+
+
+class WorkflowStepCache(Base):
+    """
+    Cached result of a workflow step, for steps that opt in to caching.
+    """
+    __tablename__ = "workflow_step_cache"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # SHA-256 of the step type, config and input
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)
+    step_type = Column(String, nullable=False)
+
+    output_data = Column(JSONB, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,106 @@
+"""
+Partitioning of the memory table.
+
+With MEMORY_PARTITIONED enabled, memory is list-partitioned by memory_type.
+Memory types with a retention policy get their own partition, which is in
+turn range-partitioned by created_at into one partition per day, so expired
+memories can be removed by dropping or detaching whole partitions. All other
+memory types (permanent, summary, ...) live in a default partition.
+
+    memory                      PARTITION BY LIST (memory_type)
+    ├── memory_default          DEFAULT
+    ├── memory_temporary        FOR VALUES IN ('temporary') PARTITION BY RANGE (created_at)
+    │   ├── memory_temporary_20261017
+    │   ├── ...
+    │   └── memory_temporary_default
+    └── memory_execution        ...
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def partition_parent(memory_type: str) -> str:
+    """Get the name of the table holding the time partitions of a memory type."""
+    return f"memory_{memory_type}"
+
+
+def partition_name(memory_type: str, day: date) -> str:
+    """Get the name of the partition holding a day of memories of a type."""
+    return f"{partition_parent(memory_type)}_{day:%Y%m%d}"
+
+
+def memory_partition_ddl(today: date, days_ahead: int) -> List[str]:
+    """
+    Get the statements creating the memory partitions.
+
+    Every statement is idempotent, so they can be run repeatedly to create the
+    partitions of upcoming days.
+
+    Args:
+        today: First day to create a partition for
+        days_ahead: Number of days after today to create partitions for
+
+    Returns:
+        List of SQL statements
+    """
+    statements = ["CREATE TABLE IF NOT EXISTS memory_default PARTITION OF memory DEFAULT"]
+
+    for memory_type in settings.RETENTION_POLICIES:
+        parent = partition_parent(memory_type)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {parent} PARTITION OF memory "
+            f"FOR VALUES IN ('{memory_type}') PARTITION BY RANGE (created_at)"
+        )
+        # Catches rows outside the created days, e.g. when partitions fall behind
+        statements.append(f"CREATE TABLE IF NOT EXISTS {parent}_default PARTITION OF {parent} DEFAULT")
+
+        for offset in range(days_ahead + 1):
+            day = today + timedelta(days=offset)
+            statements.append(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(memory_type, day)} PARTITION OF {parent} "
+                f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+            )
+
+    return statements
+
+
+async def is_memory_partitioned(db: AsyncSession) -> bool:
+    """Check whether the memory table is partitioned in the database."""
+    result = await db.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('memory')")
+    )
+    return result.first() is not None
+
+
+async def ensure_memory_partitions(db: AsyncSession) -> None:
+    """
+    Create the memory partitions of today and the next MEMORY_PARTITION_DAYS_AHEAD days.
+
+    Does nothing unless MEMORY_PARTITIONED is enabled and the table is
+    partitioned.
+
+    Args:
+        db: Database session
+    """
+    if not settings.MEMORY_PARTITIONED or not await is_memory_partitioned(db):
+        return
+
+    today = datetime.utcnow().date()
+    for statement in memory_partition_ddl(today, settings.MEMORY_PARTITION_DAYS_AHEAD):
+        # A partition can't be created while its default partition holds rows
+        # of its range, which shouldn't stop the others from being created
+        try:
+            async with db.begin_nested():
+                await db.execute(text(statement))
+        except Exception as e:
+            logger.warning(f"Could not create memory partition: {e}")
+    await db.commit()
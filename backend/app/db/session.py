@@ -2,18 +2,147 @@
 Database session.
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import time
+import uuid
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.services.metrics import metrics
+
+
+def get_connect_args(database_url: str) -> Dict[str, Any]:
+    """
+    Get the driver arguments of new database connections.
+
+    asyncpg prepares every statement, and both asyncpg and SQLAlchemy cache
+    the prepared statements per connection. PgBouncer in transaction mode
+    hands each transaction a different server connection, where cached
+    statements don't exist, so in that mode the caches are disabled and
+    statements get unique names.
+
+    Args:
+        database_url: Database URL
+
+    Returns:
+        Dictionary of connect arguments
+    """
+    if make_url(database_url).get_driver_name() != "asyncpg":
+        return {}
+
+    if settings.DB_PGBOUNCER:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+
+
+class PoolMetrics:
+    """
+    Connection pool checkout metrics of an engine.
+    """
+
+    def __init__(self):
+        """Initialize the metrics."""
+        self._engine = None
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.exhausted_checkouts = 0
+        self.max_checked_out = 0
+        self.hold_time_total = 0.0
+        self.max_hold_time = 0.0
+
+    def attach(self, engine: AsyncEngine) -> None:
+        """Record the pool events of an engine."""
+        self._engine = engine
+        event.listen(engine.sync_engine, "connect", self._on_connect)
+        event.listen(engine.sync_engine, "checkout", self._on_checkout)
+        event.listen(engine.sync_engine, "checkin", self._on_checkin)
+        event.listen(engine.sync_engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        self.checkouts += 1
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+        pool = self._engine.sync_engine.pool
+        checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+        self.max_checked_out = max(self.max_checked_out, checked_out)
+        # The last connection the pool can hand out, later checkouts wait
+        if hasattr(pool, "size") and checked_out >= pool.size() + settings.DB_MAX_OVERFLOW:
+            self.exhausted_checkouts += 1
+
+    def _on_checkin(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self.checkins += 1
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            hold_time = time.perf_counter() - checked_out_at
+            self.hold_time_total += hold_time
+            self.max_hold_time = max(self.max_hold_time, hold_time)
+
+    def _on_invalidate(self, dbapi_connection: Any, connection_record: Any, exception: Any) -> None:
+        self.invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the pool status and checkout metrics.
+
+        Returns:
+            Dictionary of statistics
+        """
+        stats: Dict[str, Any] = {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pgbouncer": settings.DB_PGBOUNCER,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "exhausted_checkouts": self.exhausted_checkouts,
+            "max_checked_out": self.max_checked_out,
+            "avg_hold_time_ms": round(self.hold_time_total / self.checkins * 1000, 2) if self.checkins else None,
+            "max_hold_time_ms": round(self.max_hold_time * 1000, 2),
+        }
+
+        pool = self._engine.sync_engine.pool if self._engine is not None else None
+        if pool is not None and hasattr(pool, "checkedout"):
+            stats["checked_out"] = pool.checkedout()
+            stats["checked_in"] = pool.checkedin()
+            stats["overflow"] = pool.overflow()
+
+        return stats
+
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
+    echo=settings.DB_ECHO,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args=get_connect_args(settings.DATABASE_URL),
 )
 
+pool_metrics = PoolMetrics()
+pool_metrics.attach(engine)
+metrics.instrument_engine(engine, pool_metrics)
+
 # Create async session
 async_session = sessionmaker(
     engine,
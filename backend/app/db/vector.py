@@ -0,0 +1,82 @@
+"""
+Vector column helpers.
+
+Embeddings are stored as pgvector vectors when the extension is available, so
+similarity search can run in SQL against an approximate nearest neighbour
+index. Deployments without pgvector store them as float arrays instead.
+"""
+
+from typing import Any, List, Optional
+
+from sqlalchemy import Float, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+# Operator classes for each similarity metric
+VECTOR_OPS = {
+    "cosine": "vector_cosine_ops",
+    "l2": "vector_l2_ops",
+    "inner_product": "vector_ip_ops",
+}
+
+
+def embedding_type() -> Any:
+    """
+    Get the column type for embeddings.
+    """
+    if settings.PGVECTOR_ENABLED:
+        from pgvector.sqlalchemy import Vector
+
+        return Vector(settings.EMBEDDING_DIMENSIONS)
+    return ARRAY(Float)
+
+
+def vector_ops() -> str:
+    """
+    Get the index operator class for the configured similarity metric.
+    """
+    return VECTOR_OPS.get(settings.VECTOR_SIMILARITY_METRIC, VECTOR_OPS["cosine"])
+
+
+def distance(column: Any, embedding: List[float]) -> Any:
+    """
+    Build a SQL distance expression for the configured similarity metric.
+
+    Smaller values are more similar, so the expression can be used directly
+    in ORDER BY.
+
+    Args:
+        column: The vector column
+        embedding: The query embedding
+
+    Returns:
+        SQL expression for the distance between the column and the embedding
+    """
+    if settings.VECTOR_SIMILARITY_METRIC == "l2":
+        return column.l2_distance(embedding)
+    elif settings.VECTOR_SIMILARITY_METRIC == "inner_product":
+        return column.max_inner_product(embedding)
+    return column.cosine_distance(embedding)
+
+
+# Whether the installed pgvector supports iterative index scans, once checked
+_iterative_scan: Optional[bool] = None
+
+
+async def supports_iterative_scan(db: AsyncSession) -> bool:
+    """
+    Check whether pgvector supports iterative index scans (0.8 and later).
+
+    Without them, an HNSW scan returns at most ef_search candidates, and
+    filters applied afterwards can leave fewer rows than the LIMIT.
+    """
+    global _iterative_scan
+    if _iterative_scan is None:
+        version = (await db.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        )).scalar()
+        parts = tuple(int(part) for part in version.split(".")[:2] if part.isdigit()) if version else ()
+        _iterative_scan = parts >= (0, 8)
+    return _iterative_scan
@@ -1,6 +1,7 @@
 import logging
 import asyncio
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import create_async_engine
 
@@ -9,6 +10,14 @@ from app.api.api import api_router
 from app.db.base import Base
 from app.db.init_db import init_db
 from app.db.session import engine
+from app.services.code_runner import code_runner
+from app.services.embeddings import embedding_backfill
+from app.services.http_client import http_clients
+from app.services.memory_writer import memory_writer
+from app.services.metrics import get_route_label, metrics
+from app.services.settings import settings_listener
+from app.services.workflow_worker import workflow_worker
+from app.utils.memory_retention import retention_worker
 
 # Setup logging
 logging.basicConfig(
@@ -32,8 +41,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record the latency of every request by route."""
+    start = time.perf_counter()
+    response = await call_next(request)
+    metrics.observe_request(
+        request.method,
+        get_route_label(request.scope),
+        response.status_code,
+        time.perf_counter() - start,
+    )
+    return response
+
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting Fra-Gent API server")
@@ -46,10 +71,47 @@ async def startup_event():
         logger.error(f"Error initializing database: {e}")
         # Continue anyway to allow the API to start
 
+    # Invalidate cached settings when other workers change them
+    if settings.SETTINGS_CACHE_NOTIFY:
+        try:
+            await settings_listener.start()
+        except Exception as e:
+            logger.error(f"Error starting settings listener: {e}")
+
+    # Embed rows that were saved without an embedding
+    if settings.EMBEDDING_BACKFILL_ENABLED:
+        embedding_backfill.start()
+
+    # Remove expired temporary and execution memories
+    if settings.RETENTION_ENABLED:
+        retention_worker.start()
+
+    # Start the processes running transform and condition steps
+    try:
+        await code_runner.start()
+    except Exception as e:
+        logger.error(f"Error starting workflow code processes: {e}")
+
+    # Run queued workflow executions, including ones interrupted by a restart
+    if settings.WORKFLOW_WORKER_ENABLED:
+        workflow_worker.start()
+
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Fra-Gent API server")
 
+    # Write buffered memories before the database goes away
+    await memory_writer.aclose()
+
+    await embedding_backfill.stop()
+    await retention_worker.stop()
+    await workflow_worker.stop()
+    await code_runner.stop()
+
+    # Close pooled HTTP clients
+    await http_clients.aclose()
+    await settings_listener.stop()
+
 @app.get("/")
 async def root():
     """Root endpoint for health check."""
@@ -59,5 +121,13 @@ async def root():
         "status": "ok",
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Metrics in the Prometheus text format."""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
 # Include API routes
 app.include_router(api_router, prefix=settings.API_PREFIX)
@@ -12,7 +12,7 @@ from app.schemas.knowledge import (
     KnowledgeBaseUpdate,
 )
 from app.schemas.memory import Memory, MemoryCreate, MemoryUpdate
-from app.schemas.workflow import Workflow, WorkflowCreate, WorkflowUpdate
+from app.schemas.workflow import Workflow, WorkflowCreate, WorkflowJobCreate, WorkflowUpdate
 
 __all__ = [
     "Agent",
@@ -29,5 +29,6 @@ __all__ = [
     "MemoryUpdate",
     "Workflow",
     "WorkflowCreate",
+    "WorkflowJobCreate",
     "WorkflowUpdate",
 ]
@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Dict, List, Optional, Union
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class MemoryBase(BaseModel):
@@ -38,6 +38,12 @@ class Memory(MemoryBase):
     updated_at: datetime
     embedding: Optional[List[float]] = None
 
+    @field_validator("embedding", mode="before")
+    @classmethod
+    def embedding_to_list(cls, v):
+        """Convert pgvector values (numpy arrays) to lists."""
+        return v.tolist() if hasattr(v, "tolist") else v
+
     class Config:
         """Pydantic config."""
         from_attributes = True
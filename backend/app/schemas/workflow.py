@@ -37,3 +37,13 @@ class Workflow(WorkflowBase):
     class Config:
         """Pydantic config."""
         from_attributes = True
+
+
+class WorkflowJobCreate(BaseModel):
+    """Workflow job submission schema."""
+    workflow_id: str
+    input_data: Dict[str, Any] = Field(default_factory=dict)
+    # Jobs with a higher priority are run first
+    priority: int = 0
+    # Run every step instead of reusing cached step results
+    bypass_cache: bool = False
@@ -0,0 +1,218 @@
+"""
+Process pool for the code of transform and condition steps.
+
+Step code runs in a pool of worker processes rather than on the event loop,
+so a CPU-heavy transform doesn't stall other requests. Each process limits
+the memory it can allocate (WORKFLOW_CODE_MEMORY_LIMIT) and the CPU time a
+single step can use (WORKFLOW_CODE_CPU_LIMIT), and caches compiled code by
+its hash, so code shared by many executions is compiled once per process.
+
+With WORKFLOW_CODE_POOL_SIZE set to 0, code runs in the calling process
+without limits.
+"""
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import signal
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class CodeLimitExceeded(Exception):
+    """Raised when step code exceeds its CPU time."""
+
+
+class CodeCache:
+    """
+    LRU cache of compiled code objects by hash of their source.
+    """
+
+    def __init__(self, max_size: int):
+        """Initialize the cache."""
+        self.max_size = max_size
+        self._code: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, code_hash: str, source: str) -> Any:
+        """
+        Get the compiled code of a source, compiling it on a miss.
+
+        Raises:
+            SyntaxError: If the source doesn't compile
+        """
+        code = self._code.get(code_hash)
+        if code is not None:
+            self._code.move_to_end(code_hash)
+            self.hits += 1
+            return code
+
+        self.misses += 1
+        code = compile(source, "<string>", "exec")
+        self._code[code_hash] = code
+        if len(self._code) > self.max_size:
+            self._code.popitem(last=False)
+        return code
+
+
+# Compiled code of the current process
+_code_cache = CodeCache(settings.WORKFLOW_CODE_CACHE_SIZE)
+
+
+def code_hash(source: str) -> str:
+    """Get the cache key of a source."""
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def _on_cpu_limit(signum: int, frame: Any) -> None:
+    raise CodeLimitExceeded("Step exceeded its CPU time limit")
+
+
+def _init_process(memory_limit_mb: int) -> None:
+    """Set up the limits of a pool process."""
+    if resource is None:
+        return
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    signal.signal(signal.SIGXCPU, _on_cpu_limit)
+
+
+def _run_code(
+    code_hash: str,
+    source: str,
+    namespace: Dict[str, Any],
+    cpu_limit: Optional[float] = None,
+) -> Any:
+    """
+    Run step code in the current process.
+
+    Args:
+        code_hash: Hash of the source
+        source: Python source of the step
+        namespace: Globals of the code
+        cpu_limit: CPU seconds the code may use, if limits are available
+
+    Returns:
+        The value of `result` after running the code
+    """
+    code = _code_cache.get(code_hash, source)
+
+    limited = cpu_limit and resource is not None
+    if limited:
+        # RLIMIT_CPU counts the CPU time of the whole process, so the step's
+        # budget is added to what the process used so far
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = int(usage.ru_utime + usage.ru_stime + cpu_limit) + 1
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    try:
+        exec(code, namespace)
+    except MemoryError:
+        raise MemoryError("Step exceeded its memory limit")
+    finally:
+        if limited:
+            resource.setrlimit(resource.RLIMIT_CPU, (resource.RLIM_INFINITY, hard))
+
+    return namespace.get("result")
+
+
+def _warm_up() -> None:
+    """Task that makes the pool start a process."""
+
+
+class CodeRunner:
+    """
+    Runs step code in a pool of worker processes.
+    """
+
+    def __init__(self, pool_size: int, cpu_limit: float, memory_limit_mb: int):
+        """Initialize the runner."""
+        self.pool_size = pool_size
+        self.cpu_limit = cpu_limit
+        self.memory_limit_mb = memory_limit_mb
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Get the process pool, starting it on first use."""
+        if self._pool is None:
+            # Forked children of a process with running threads can deadlock,
+            # so processes are forked from a clean server process
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.pool_size,
+                mp_context=context,
+                initializer=_init_process,
+                initargs=(self.memory_limit_mb,),
+            )
+        return self._pool
+
+    async def start(self) -> None:
+        """Start the pool processes ahead of the first step."""
+        if self.pool_size <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        await asyncio.gather(*(loop.run_in_executor(pool, _warm_up) for _ in range(self.pool_size)))
+        logger.info(f"Started {self.pool_size} workflow code processes")
+
+    async def run(self, source: str, namespace: Dict[str, Any]) -> Any:
+        """
+        Run step code.
+
+        Args:
+            source: Python source of the step, which sets `result`
+            namespace: Globals of the code, which must be picklable
+
+        Returns:
+            The value of `result` after running the code
+
+        Raises:
+            CodeLimitExceeded: If the code used more than its CPU time
+            MemoryError: If the code allocated more than the memory limit
+            Exception: Any error raised by the code
+        """
+        key = code_hash(source)
+        if self.pool_size <= 0:
+            return _run_code(key, source, namespace)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._get_pool(), _run_code, key, source, namespace, self.cpu_limit
+            )
+        except BrokenProcessPool:
+            # A process died (killed by the OS, or the CPU hard limit), and
+            # the pool can't be used anymore
+            if self._pool is not None:
+                logger.error("Workflow code process died, restarting the pool")
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            raise
+
+    async def stop(self) -> None:
+        """Stop the pool processes."""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(None, pool.shutdown)
+
+
+code_runner = CodeRunner(
+    settings.WORKFLOW_CODE_POOL_SIZE,
+    settings.WORKFLOW_CODE_CPU_LIMIT,
+    settings.WORKFLOW_CODE_MEMORY_LIMIT,
+)
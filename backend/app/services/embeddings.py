@@ -0,0 +1,420 @@
+"""
+Embedding service for generating text embeddings.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.models import Document, EmbeddingCache, KnowledgeBase, Memory
+from app.db.session import async_session
+from app.services.http_client import get_http_client
+from app.services.settings import get_settings_service
+from app.utils.conversation_summary import SUMMARY_MEMORY_TYPE
+from app.utils.llm_providers import get_provider_settings_from_env
+from app.utils.vector_scoring import embedding_cache
+
+logger = logging.getLogger(__name__)
+
+# Model name that selects the offline embedder
+LOCAL_STUB_MODEL = "local-stub"
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class EmbeddingError(Exception):
+    """Raised when embeddings can't be generated."""
+
+
+def content_hash(model: str, text: str) -> str:
+    """
+    Hash text for the embedding cache.
+
+    The model is part of the hash, so changing EMBEDDING_MODEL doesn't reuse
+    embeddings from another model.
+    """
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class LocalEmbedder:
+    """
+    Deterministic offline embedder.
+
+    Hashes each word into one of the dimensions (feature hashing), so texts
+    that share words get similar embeddings. Intended for tests and local
+    development, not for production retrieval quality.
+    """
+
+    def __init__(self, dimensions: int):
+        """Initialize the embedder."""
+        self.dimensions = dimensions
+
+    def embed_text(self, text: str) -> List[float]:
+        """Embed a single text."""
+        vector = [0.0] * self.dimensions
+        tokens = _TOKEN_PATTERN.findall(text.lower()) or [text]
+        for token in tokens:
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "big")
+            vector[value % self.dimensions] += 1.0 if value >> 63 else -1.0
+
+        norm = math.sqrt(sum(x * x for x in vector))
+        if norm == 0:
+            vector[0] = norm = 1.0
+        return [x / norm for x in vector]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts."""
+        return [self.embed_text(text) for text in texts]
+
+
+class ProviderEmbedder:
+    """
+    Embedder that calls an OpenAI-compatible embeddings endpoint.
+    """
+
+    def __init__(self, provider: str, model: str, dimensions: int):
+        """Initialize the embedder."""
+        self.provider = provider
+        self.model = model
+        self.dimensions = dimensions
+
+    async def _get_endpoint(self) -> Tuple[str, str]:
+        """Get the API base URL and key of the provider."""
+        provider_settings = await get_settings_service().get_provider_settings(self.provider)
+        if not provider_settings:
+            provider_settings = get_provider_settings_from_env(self.provider)
+
+        api_base = provider_settings.get("api_base") or provider_settings.get("host")
+        if not api_base:
+            raise EmbeddingError(f"No API base URL configured for provider {self.provider}")
+
+        return api_base.rstrip("/"), provider_settings.get("api_key") or ""
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts in one request."""
+        api_base, api_key = await self._get_endpoint()
+
+        payload = {"model": self.model, "input": texts}
+        # Only the text-embedding-3 models can shorten their embeddings
+        if self.model.startswith("text-embedding-3"):
+            payload["dimensions"] = self.dimensions
+
+        client = get_http_client(api_base)
+        response = await client.post(
+            f"{api_base}/embeddings",
+            json=payload,
+            headers={"Authorization": f"Bearer {api_key}"},
+        )
+        if response.status_code != 200:
+            raise EmbeddingError(f"Error: {response.status_code} - {response.text}")
+
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        if len(data) != len(texts):
+            raise EmbeddingError(f"Expected {len(texts)} embeddings, got {len(data)}")
+
+        return [item["embedding"] for item in data]
+
+
+class EmbeddingBatcher:
+    """
+    Collects concurrent embedding requests into batched provider calls.
+
+    A batch is sent when it reaches max_batch_size texts or max_wait seconds
+    after its first text arrived, whichever comes first.
+    """
+
+    def __init__(self, embedder, max_batch_size: int, max_wait: float):
+        """Initialize the batcher."""
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, text: str) -> List[float]:
+        """
+        Embed a text as part of the next batch.
+
+        Args:
+            text: The text to embed
+
+        Returns:
+            The embedding of the text
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Send the pending texts as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Embed a batch and resolve its futures."""
+        # Concurrent callers often embed the same text, send it once
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = dict(zip(texts, await self.embedder.embed(texts)))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, future in batch:
+            if not future.done():
+                future.set_result(embeddings[text])
+
+
+class EmbeddingService:
+    """
+    Embedding service backed by a persistent content-hash cache.
+
+    Texts already embedded with the configured model are read from the
+    embedding_cache table, the rest are embedded in batches and stored.
+    """
+
+    def __init__(self, embedder, model: str, max_batch_size: int, max_wait: float):
+        """Initialize the embedding service."""
+        self.model = model
+        self.batcher = EmbeddingBatcher(embedder, max_batch_size, max_wait)
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Embed a single text.
+
+        Args:
+            text: The text to embed
+
+        Returns:
+            The embedding of the text
+        """
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Embed several texts.
+
+        Args:
+            texts: The texts to embed
+
+        Returns:
+            One embedding per text, in the same order
+        """
+        if not texts:
+            return []
+
+        hashes = [content_hash(self.model, text) for text in texts]
+        embeddings = await self._get_cached(set(hashes))
+
+        missing = {h: text for h, text in zip(hashes, texts) if h not in embeddings}
+        if missing:
+            generated = await asyncio.gather(*[self.batcher.submit(text) for text in missing.values()])
+            new_embeddings = dict(zip(missing.keys(), generated))
+            await self._store(new_embeddings)
+            embeddings.update(new_embeddings)
+
+        return [embeddings[h] for h in hashes]
+
+    async def _get_cached(self, hashes: Set[str]) -> Dict[str, List[float]]:
+        """Read cached embeddings by content hash."""
+        try:
+            async with async_session() as db:
+                result = await db.execute(
+                    select(EmbeddingCache.content_hash, EmbeddingCache.embedding).where(
+                        EmbeddingCache.content_hash.in_(hashes)
+                    )
+                )
+                return {h: list(embedding) for h, embedding in result.all()}
+        except Exception as e:
+            logger.error(f"Error reading embedding cache: {e}")
+            return {}
+
+    async def _store(self, embeddings: Dict[str, List[float]]) -> None:
+        """Store new embeddings in the cache."""
+        try:
+            async with async_session() as db:
+                await db.execute(
+                    insert(EmbeddingCache)
+                    .values([
+                        {"content_hash": h, "model": self.model, "embedding": embedding}
+                        for h, embedding in embeddings.items()
+                    ])
+                    .on_conflict_do_nothing(index_elements=["content_hash"])
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error writing embedding cache: {e}")
+
+
+def create_embedding_service() -> EmbeddingService:
+    """Create the embedding service for the configured model."""
+    if settings.EMBEDDING_MODEL == LOCAL_STUB_MODEL:
+        embedder = LocalEmbedder(settings.EMBEDDING_DIMENSIONS)
+    else:
+        embedder = ProviderEmbedder(
+            settings.EMBEDDING_PROVIDER,
+            settings.EMBEDDING_MODEL,
+            settings.EMBEDDING_DIMENSIONS,
+        )
+
+    return EmbeddingService(
+        embedder,
+        settings.EMBEDDING_MODEL,
+        settings.EMBEDDING_BATCH_SIZE,
+        settings.EMBEDDING_BATCH_WAIT_MS / 1000,
+    )
+
+
+embedding_service = create_embedding_service()
+
+
+async def _embed_rows(rows: List[Tuple[Any, str]]) -> Dict[Any, Optional[List[float]]]:
+    """
+    Embed the content of rows, one by one if the batch fails.
+
+    Returns:
+        The embedding per row ID, None for rows that couldn't be embedded
+    """
+    try:
+        embeddings = await embedding_service.embed_many([content for _, content in rows])
+        return {row_id: embedding for (row_id, _), embedding in zip(rows, embeddings)}
+    except Exception as e:
+        if len(rows) == 1:
+            logger.error(f"Error embedding row {rows[0][0]}: {e}")
+            return {rows[0][0]: None}
+        logger.warning(f"Error embedding a batch of {len(rows)} rows, retrying them one by one: {e}")
+
+    embedded: Dict[Any, Optional[List[float]]] = {}
+    for row in rows:
+        embedded.update(await _embed_rows([row]))
+    return embedded
+
+
+async def backfill_embeddings(batch_size: int = 100) -> int:
+    """
+    Embed one batch of rows without an embedding in each embedded table.
+
+    Rows that fail to embed, such as content the provider rejects, are
+    marked with embedding_failed_at and skipped for
+    EMBEDDING_BACKFILL_RETRY_INTERVAL, so they don't block the rows after
+    them. Rolling summaries are never searched, so they aren't embedded.
+
+    Args:
+        batch_size: Maximum number of rows to embed per table
+
+    Returns:
+        Number of rows processed, embedded or marked as failed
+    """
+    now = datetime.utcnow()
+    retry_before = now - timedelta(seconds=settings.EMBEDDING_BACKFILL_RETRY_INTERVAL)
+
+    total = 0
+    for model in (Memory, KnowledgeBase, Document):
+        query = select(model.id, model.content).where(
+            model.embedding.is_(None),
+            or_(model.embedding_failed_at.is_(None), model.embedding_failed_at < retry_before),
+        )
+        if model is Memory:
+            query = query.where(Memory.memory_type != SUMMARY_MEMORY_TYPE)
+
+        async with async_session() as db:
+            result = await db.execute(query.limit(batch_size))
+            rows = result.all()
+            if not rows:
+                continue
+
+            embeddings = await _embed_rows(rows)
+
+            # Bulk update by primary key
+            await db.execute(
+                update(model),
+                [
+                    {"id": row_id, "embedding": embedding}
+                    if embedding is not None
+                    else {"id": row_id, "embedding_failed_at": now}
+                    for row_id, embedding in embeddings.items()
+                ],
+            )
+            await db.commit()
+
+            # Bulk updates skip mapper events, so drop cached matrices here
+            if model is Memory:
+                embedding_cache.invalidate()
+
+            failed = sum(1 for embedding in embeddings.values() if embedding is None)
+            if failed:
+                logger.warning(f"Failed to embed {failed} rows in {model.__tablename__}")
+            logger.info(f"Backfilled embeddings of {len(rows) - failed} rows in {model.__tablename__}")
+            total += len(rows)
+
+    return total
+
+
+class EmbeddingBackfillWorker:
+    """
+    Background task that embeds rows saved without an embedding.
+    """
+
+    def __init__(self, interval: float, batch_size: int = 100):
+        """Initialize the worker."""
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the worker."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Started embedding backfill worker")
+
+    async def _run(self) -> None:
+        """Backfill embeddings until stopped."""
+        while True:
+            try:
+                # Keep going without waiting while there is a backlog
+                while await backfill_embeddings(self.batch_size) > 0:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error backfilling embeddings: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self) -> None:
+        """Stop the worker."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+embedding_backfill = EmbeddingBackfillWorker(settings.EMBEDDING_BACKFILL_INTERVAL)
@@ -0,0 +1,135 @@
+"""
+Shared HTTP clients for outbound calls to LLM providers.
+"""
+
+import importlib.util
+import logging
+from typing import Any, Dict
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClientRegistry:
+    """
+    Registry of pooled HTTP clients, one per provider host.
+
+    Clients are created lazily on first use and reused for every later request
+    to the same host, so connections are kept alive between calls instead of
+    paying for a new TCP and TLS handshake each time. The registry is closed
+    when the application shuts down.
+    """
+
+    def __init__(self):
+        """Initialize the registry."""
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._transports: Dict[str, httpx.AsyncHTTPTransport] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._http2 = settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+        if settings.HTTP2_ENABLED and not self._http2:
+            logger.warning("HTTP/2 is enabled but the h2 package is not installed, using HTTP/1.1")
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        """Get the pool key (scheme, host and port) for a URL."""
+        parsed = httpx.URL(url)
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        return f"{parsed.scheme}://{parsed.host}:{port}"
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """
+        Get the pooled client for the host of a URL.
+
+        Args:
+            url: Any URL on the provider host
+
+        Returns:
+            The shared client for that host
+        """
+        key = self._host_key(url)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = self._create_client(key)
+            self._clients[key] = client
+        return client
+
+    def _create_client(self, key: str) -> httpx.AsyncClient:
+        """Create a pooled client for a host."""
+        stats = self._stats.setdefault(key, {"requests": 0, "responses": 0, "errors": 0})
+
+        async def on_request(request: httpx.Request) -> None:
+            stats["requests"] += 1
+
+        async def on_response(response: httpx.Response) -> None:
+            stats["responses"] += 1
+            if response.status_code >= 400:
+                stats["errors"] += 1
+
+        transport = httpx.AsyncHTTPTransport(
+            http2=self._http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        self._transports[key] = transport
+
+        logger.info(f"Creating pooled HTTP client for {key} (http2={self._http2})")
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+            event_hooks={"request": [on_request], "response": [on_response]},
+        )
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get connection pool statistics for every host.
+
+        Returns:
+            Dictionary of statistics keyed by host
+        """
+        pools = {}
+        for key, stats in self._stats.items():
+            pool_stats: Dict[str, Any] = dict(stats)
+
+            # httpx does not expose its connection pool, so read it from httpcore
+            pool = getattr(self._transports.get(key), "_pool", None)
+            connections = getattr(pool, "connections", None)
+            if connections is not None:
+                idle = sum(1 for connection in connections if connection.is_idle())
+                pool_stats["connections"] = len(connections)
+                pool_stats["idle_connections"] = idle
+                pool_stats["active_connections"] = len(connections) - idle
+
+            pools[key] = pool_stats
+
+        return {
+            "http2": self._http2,
+            "max_connections": settings.HTTP_POOL_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.HTTP_POOL_MAX_KEEPALIVE,
+            "pools": pools,
+        }
+
+    async def aclose(self) -> None:
+        """Close every pooled client."""
+        for key, client in self._clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Error closing HTTP client for {key}: {e}")
+        self._clients = {}
+        self._transports = {}
+
+
+# Application-wide registry
+http_clients = HTTPClientRegistry()
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """Get the shared HTTP client for the host of a URL."""
+    return http_clients.get_client(url)
@@ -5,10 +5,10 @@ LLM service for interacting with language models.
 import os
 from typing import Any, Dict, List, Optional
 
-import httpx
 from fastapi import Depends
 
 from app.db.models import Agent
+from app.services.http_client import get_http_client
 from app.services.settings import get_settings_service
 
 
@@ -26,19 +26,9 @@ class LLMService:
         # Get the provider settings
         provider = agent.integration_settings.get("provider", "custom")
 
-        # Get provider settings from the database
-        from app.db.session import async_session
-        from sqlalchemy import select
-        from app.db.models import Settings
-
-        # Create a new session
-        async with async_session() as db:
-            # Get the provider settings
-            result = await db.execute(
-                select(Settings).filter(Settings.key == f"provider_{provider}")
-            )
-            settings = result.scalars().first()
-            provider_settings = settings.value if settings else None
+        # Get provider settings (cached, read from the database on a miss)
+        settings_service = self.settings_service or get_settings_service()
+        provider_settings = await settings_service.get_provider_settings(provider)
 
         if not provider_settings:
             return "Error: Provider settings not found."
@@ -80,24 +70,23 @@ class LLMService:
         }
 
         try:
-            # Make the API request
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{host}/chat/completions",
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Bearer {api_key}"
-                    },
-                    timeout=60.0
-                )
-
-                # Check if the request was successful
-                if response.status_code == 200:
-                    data = response.json()
-                    return data["choices"][0]["message"]["content"]
-                else:
-                    return f"Error: {response.status_code} - {response.text}"
+            # Make the API request with the shared client for the provider host
+            client = get_http_client(host)
+            response = await client.post(
+                f"{host}/chat/completions",
+                json=payload,
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {api_key}"
+                },
+            )
+
+            # Check if the request was successful
+            if response.status_code == 200:
+                data = response.json()
+                return data["choices"][0]["message"]["content"]
+            else:
+                return f"Error: {response.status_code} - {response.text}"
         except Exception as e:
             return f"Error: {str(e)}"
 
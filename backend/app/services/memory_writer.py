@@ -0,0 +1,192 @@
+"""
+Write-behind memory writer.
+
+Memories are buffered and inserted in batches with a single multi-row
+INSERT ... RETURNING and one commit per batch, instead of one commit per
+memory. IDs and timestamps are assigned when a memory is written, so callers
+get complete memories back without waiting for the database. Callers that
+need the memories to be committed before they continue write them durably,
+which waits for the batch holding them to be committed. Readers that need
+an agent's latest memories flush the agent's pending writes first.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.models.memory import Memory
+from app.db.session import async_session
+from app.utils.vector_scoring import embedding_cache
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryWriter:
+    """
+    Buffers memory inserts and flushes them in batches.
+
+    A batch is flushed when it reaches max_batch_size memories, when a durable
+    write is waiting, or flush_interval seconds after its first memory was
+    buffered, whichever comes first.
+    """
+
+    def __init__(self, max_batch_size: int, flush_interval: float, max_retries: int = 1):
+        """Initialize the writer."""
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._buffer: List[Tuple[Dict[str, Any], Optional[asyncio.Future], int]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        # Pending inserts and the agents whose memories they write
+        self._tasks: Dict[asyncio.Task, Set[Any]] = {}
+
+    async def write(self, memories: List[Dict[str, Any]], durable: Optional[bool] = None) -> List[Memory]:
+        """
+        Write memories.
+
+        Args:
+            memories: Column values of each memory. id, memory_type, meta_data
+                and timestamps are filled in when missing.
+            durable: Wait until the memories are committed, defaults to
+                not MEMORY_WRITE_BEHIND
+
+        Returns:
+            The memories, in the same order. Durable writes return the
+            inserted rows, others return unsaved Memory objects with the same
+            values.
+        """
+        if durable is None:
+            durable = not settings.MEMORY_WRITE_BEHIND
+
+        now = datetime.utcnow()
+        rows = []
+        for index, values in enumerate(memories):
+            # Keep memories written together in order when sorted by time
+            created_at = values.get("created_at") or now + timedelta(microseconds=index)
+            rows.append({
+                "memory_type": "permanent",
+                "meta_data": {},
+                **values,
+                "id": values.get("id") or uuid.uuid4(),
+                "created_at": created_at,
+                "updated_at": values.get("updated_at") or created_at,
+            })
+
+        if not durable:
+            for row in rows:
+                self._buffer.append((row, None, 0))
+            self._schedule_flush()
+            return [Memory(**row) for row in rows]
+
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in rows]
+        for row, future in zip(rows, futures):
+            self._buffer.append((row, future, 0))
+
+        # Durable writes are flushed on the next loop iteration, together with
+        # anything buffered and other durable writes made in the meantime
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_soon(self._flush)
+        return list(await asyncio.gather(*futures))
+
+    def _schedule_flush(self) -> None:
+        """Flush the buffer when it's full, or schedule a flush."""
+        if len(self._buffer) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._flush)
+
+    def _flush(self) -> None:
+        """Insert the buffered memories in the background."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._buffer:
+            batch, self._buffer = self._buffer[:self.max_batch_size], self._buffer[self.max_batch_size:]
+            task = asyncio.create_task(self._insert(batch))
+            self._tasks[task] = {row["agent_id"] for row, _, _ in batch}
+            task.add_done_callback(self._discard_task)
+
+    def _discard_task(self, task: asyncio.Task) -> None:
+        """Forget a finished insert."""
+        self._tasks.pop(task, None)
+
+    async def _insert(self, batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future], int]]) -> None:
+        """Insert a batch of memories and resolve the durable writes."""
+        try:
+            async with async_session() as db:
+                result = await db.scalars(
+                    insert(Memory).returning(Memory),
+                    [row for row, _, _ in batch],
+                )
+                inserted = {memory.id: memory for memory in result.all()}
+                await db.commit()
+        except Exception as e:
+            self._handle_failure(batch, e)
+            return
+
+        for row, future, _ in batch:
+            if future is not None and not future.done():
+                future.set_result(inserted.get(row["id"]))
+
+        # Bulk inserts skip mapper events, so drop cached matrices here
+        for agent_id in {row["agent_id"] for row, _, _ in batch}:
+            embedding_cache.invalidate(agent_id)
+
+    def _handle_failure(
+        self,
+        batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future], int]],
+        error: Exception,
+    ) -> None:
+        """Fail the durable writes of a batch and retry the others."""
+        retried = 0
+        for row, future, attempts in batch:
+            if future is not None:
+                if not future.done():
+                    future.set_exception(error)
+            elif attempts < self.max_retries:
+                self._buffer.append((row, None, attempts + 1))
+                retried += 1
+
+        lost = len(batch) - retried - sum(1 for _, future, _ in batch if future is not None)
+        logger.error(f"Error writing {len(batch)} memories, retrying {retried}, dropping {lost}: {error}")
+        if retried:
+            self._schedule_flush()
+
+    async def flush(self, agent_id: Any) -> None:
+        """
+        Wait until the buffered and pending memories of an agent are committed.
+
+        Memories whose insert failed are retried or dropped as usual, without
+        raising here.
+
+        Args:
+            agent_id: Agent ID
+        """
+        while True:
+            if any(row["agent_id"] == agent_id for row, _, _ in self._buffer):
+                self._flush()
+            tasks = [task for task, agents in self._tasks.items() if agent_id in agents]
+            if not tasks:
+                return
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Flush the buffered memories and wait for pending inserts."""
+        self._flush()
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+            self._flush()
+
+
+memory_writer = MemoryWriter(
+    settings.MEMORY_WRITE_BATCH_SIZE,
+    settings.MEMORY_WRITE_FLUSH_INTERVAL_MS / 1000,
+)
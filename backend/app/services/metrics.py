@@ -0,0 +1,241 @@
+"""
+Prometheus metrics.
+
+The hot paths record into the module-level `metrics` registry, which is
+served in the Prometheus text format at /metrics. Recording is a no-op when
+METRICS_ENABLED is off or prometheus_client isn't installed, so callers never
+need to check.
+"""
+
+import importlib.util
+import logging
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds, from fast queries up to slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _PoolCollector:
+    """Reads the database pool statistics when metrics are scraped."""
+
+    def __init__(self, pool_metrics: Any):
+        """Initialize the collector."""
+        self.pool_metrics = pool_metrics
+
+    def collect(self) -> Iterator[Any]:
+        """Yield the pool gauges and counters."""
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+        stats = self.pool_metrics.get_stats()
+        for name, key, help_text in (
+            ("db_pool_size", "pool_size", "Connections kept open by the pool"),
+            ("db_pool_checked_out", "checked_out", "Connections currently checked out"),
+            ("db_pool_checked_in", "checked_in", "Idle connections in the pool"),
+            ("db_pool_overflow", "overflow", "Connections open beyond the pool size"),
+            ("db_pool_max_checked_out", "max_checked_out", "Most connections checked out at once"),
+        ):
+            if stats.get(key) is not None:
+                yield GaugeMetricFamily(name, help_text, value=stats[key])
+
+        for name, key, help_text in (
+            ("db_pool_connects", "connects", "Connections opened"),
+            ("db_pool_checkouts", "checkouts", "Connections checked out"),
+            ("db_pool_invalidations", "invalidations", "Connections invalidated"),
+            ("db_pool_exhausted_checkouts", "exhausted_checkouts", "Checkouts that took the last free connection"),
+        ):
+            yield CounterMetricFamily(name, help_text, value=stats[key])
+
+
+class Metrics:
+    """
+    Registry of the application metrics.
+    """
+
+    def __init__(self, enabled: bool):
+        """Initialize the registry."""
+        self.enabled = enabled and importlib.util.find_spec("prometheus_client") is not None
+        if enabled and not self.enabled:
+            logger.warning("Metrics are enabled but prometheus_client is not installed")
+        if not self.enabled:
+            return
+
+        from prometheus_client import CollectorRegistry, Counter, Histogram
+
+        self.registry = CollectorRegistry()
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Time to respond to HTTP requests, until the response starts for streams",
+            ["method", "route", "status"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.llm_duration = Histogram(
+            "llm_request_duration_seconds",
+            "Duration of LLM calls",
+            ["provider", "model", "operation"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.llm_tokens = Counter(
+            "llm_tokens",
+            "Tokens used by LLM calls",
+            ["provider", "model", "type"],
+            registry=self.registry,
+        )
+        self.db_query_duration = Histogram(
+            "db_query_duration_seconds",
+            "Duration of database statements",
+            ["operation"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.context_duration = Histogram(
+            "agent_context_duration_seconds",
+            "Time to load the sections of an agent's context",
+            ["section"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.workflow_step_duration = Histogram(
+            "workflow_step_duration_seconds",
+            "Duration of workflow steps",
+            ["step_type", "status"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.workflow_step_cache = Counter(
+            "workflow_step_cache",
+            "Result cache lookups of workflow steps",
+            ["step_type", "result"],
+            registry=self.registry,
+        )
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        """Record an HTTP request."""
+        if self.enabled:
+            self.request_duration.labels(method, route, str(status)).observe(seconds)
+
+    def observe_llm_call(
+        self,
+        provider: str,
+        model: str,
+        operation: str,
+        seconds: float,
+        usage: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Record an LLM call.
+
+        Args:
+            provider: LLM provider
+            model: Model name
+            operation: invoke, stream or workflow
+            seconds: Duration of the call
+            usage: Token usage reported by the provider, with OpenAI
+                (prompt_tokens/completion_tokens) or LangChain
+                (input_tokens/output_tokens) keys
+        """
+        if not self.enabled:
+            return
+
+        self.llm_duration.labels(provider, model, operation).observe(seconds)
+        if usage:
+            prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens"))
+            completion_tokens = usage.get("completion_tokens", usage.get("output_tokens"))
+            if prompt_tokens:
+                self.llm_tokens.labels(provider, model, "prompt").inc(prompt_tokens)
+            if completion_tokens:
+                self.llm_tokens.labels(provider, model, "completion").inc(completion_tokens)
+
+    def observe_context(self, timings: Dict[str, float]) -> None:
+        """Record the section timings of an agent context, in milliseconds."""
+        if self.enabled:
+            for section, milliseconds in timings.items():
+                self.context_duration.labels(section).observe(milliseconds / 1000)
+
+    def observe_workflow_step(self, step_type: str, status: str, seconds: float) -> None:
+        """Record a workflow step."""
+        if self.enabled:
+            self.workflow_step_duration.labels(step_type, status).observe(seconds)
+
+    def observe_step_cache(self, step_type: str, result: str) -> None:
+        """Record a result cache lookup of a workflow step: hit, miss or bypass."""
+        if self.enabled:
+            self.workflow_step_cache.labels(step_type, result).inc()
+
+    def instrument_engine(self, engine: Any, pool_metrics: Any) -> None:
+        """
+        Record the statement durations and pool usage of a database engine.
+
+        Args:
+            engine: Async engine
+            pool_metrics: PoolMetrics of the engine
+        """
+        if not self.enabled:
+            return
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._query_start = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            start = getattr(context, "_query_start", None)
+            if start is None:
+                return
+            operation = statement.split(None, 1)[0].upper() if statement.strip() else "OTHER"
+            if operation not in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+                operation = "OTHER"
+            self.db_query_duration.labels(operation).observe(time.perf_counter() - start)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+        self.registry.register(_PoolCollector(pool_metrics))
+
+    def render(self) -> Tuple[bytes, str]:
+        """
+        Render the metrics in the Prometheus text format.
+
+        Returns:
+            A tuple of (body, content type)
+        """
+        from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+
+def get_route_label(scope: Dict[str, Any]) -> str:
+    """
+    Get the route template of a request, such as /api/agents/{agent_id}.
+
+    Labelling by template rather than path keeps the number of series
+    bounded. The template is rebuilt from the path and the path parameters,
+    since routers included with a prefix don't always carry the full
+    template.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+
+    params = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    segments = []
+    for segment in scope["path"].split("/"):
+        name = params.pop(segment, None)
+        segments.append(f"{{{name}}}" if name else segment)
+    return "/".join(segments)
+
+
+def get_usage(response: Any) -> Optional[Dict[str, Any]]:
+    """Get the token usage of a LangChain chat model response, if it reports one."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return dict(usage)
+    response_metadata = getattr(response, "response_metadata", None) or {}
+    return response_metadata.get("token_usage") or response_metadata.get("usage")
+
+
+metrics = Metrics(settings.METRICS_ENABLED)
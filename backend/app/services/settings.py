@@ -2,48 +2,169 @@
 Settings service for managing application settings.
 """
 
-from typing import Any, Dict, Optional
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings as app_settings
 from app.db.models import Settings
-from app.db.session import get_db
+from app.db.session import async_session, get_db
+
+logger = logging.getLogger(__name__)
+
+# Channel used to tell other workers that a setting changed
+SETTINGS_CHANNEL = "settings_changed"
+
+
+class SettingsCache:
+    """
+    In-process cache of settings values by key.
+
+    Missing keys are cached too, so deployments that rely on environment
+    fallbacks don't query the settings table on every call.
+    """
+
+    def __init__(self, ttl: float):
+        """Initialize the cache."""
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+
+    def get(self, key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Get a cached value.
+
+        Returns:
+            A tuple of (whether the key was cached, cached value)
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, value = entry
+        if time.monotonic() > expires_at:
+            del self._entries[key]
+            return False, None
+
+        return True, value
+
+    def set(self, key: str, value: Optional[Dict[str, Any]]) -> None:
+        """Cache a value."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Remove a cached value.
+
+        Args:
+            key: The key to remove. If None, clear the whole cache.
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+settings_cache = SettingsCache(app_settings.SETTINGS_CACHE_TTL)
 
 
 class SettingsService:
     """Settings service for managing application settings."""
 
     def __init__(self, db: AsyncSession = None):
-        """Initialize the settings service."""
+        """
+        Initialize the settings service.
+
+        Without a session, a short-lived one is opened on cache misses.
+        """
         self.db = db
 
     async def get_settings(self, key: str) -> Optional[Dict[str, Any]]:
         """Get settings by key."""
-        result = await self.db.execute(select(Settings).filter(Settings.key == key))
-        settings = result.scalars().first()
-        return settings.value if settings else None
+        cached, value = settings_cache.get(key)
+        if cached:
+            return value
+
+        if self.db is not None:
+            value = await self._fetch(self.db, key)
+        else:
+            async with async_session() as db:
+                value = await self._fetch(db, key)
+
+        settings_cache.set(key, value)
+        return value
+
+    @staticmethod
+    async def _fetch(db: AsyncSession, key: str) -> Optional[Dict[str, Any]]:
+        """Read a settings value from the database."""
+        result = await db.execute(select(Settings.value).filter(Settings.key == key))
+        return result.scalars().first()
 
     async def get_provider_settings(self, provider: str) -> Optional[Dict[str, Any]]:
         """Get provider settings."""
-        result = await self.db.execute(
-            select(Settings).filter(Settings.key == f"provider_{provider}")
-        )
-        settings = result.scalars().first()
-        return settings.value if settings else None
+        return await self.get_settings(f"provider_{provider}")
 
     async def get_default_provider(self) -> Optional[str]:
         """Get the default provider."""
-        result = await self.db.execute(
-            select(Settings).filter(Settings.key == "default_provider")
+        value = await self.get_settings("default_provider")
+        return value.get("value") if value else None
+
+
+async def publish_settings_change(db: AsyncSession, key: str) -> None:
+    """
+    Tell other workers that a setting changed.
+
+    The notification is sent in the caller's transaction, so it is only
+    delivered once the change is committed. Does nothing unless
+    SETTINGS_CACHE_NOTIFY is enabled.
+    """
+    if app_settings.SETTINGS_CACHE_NOTIFY:
+        await db.execute(
+            text("SELECT pg_notify(:channel, :key)"),
+            {"channel": SETTINGS_CHANNEL, "key": key},
         )
-        settings = result.scalars().first()
-        return settings.value.get("provider") if settings else None
+
+
+class SettingsChangeListener:
+    """
+    Listener that invalidates the settings cache when another worker changes a setting.
+
+    Uses Postgres LISTEN/NOTIFY on a dedicated asyncpg connection.
+    """
+
+    def __init__(self):
+        """Initialize the listener."""
+        self._connection = None
+
+    async def start(self) -> None:
+        """Start listening for settings changes."""
+        import asyncpg
+
+        dsn = app_settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+        self._connection = await asyncpg.connect(dsn)
+        await self._connection.add_listener(SETTINGS_CHANNEL, self._on_notify)
+        logger.info(f"Listening for settings changes on channel {SETTINGS_CHANNEL}")
+
+    def _on_notify(self, connection, pid, channel, key) -> None:
+        """Invalidate a changed setting."""
+        settings_cache.invalidate(key or None)
+
+    async def stop(self) -> None:
+        """Stop listening for settings changes."""
+        if self._connection is not None:
+            try:
+                await self._connection.close()
+            except Exception as e:
+                logger.error(f"Error closing settings listener: {e}")
+            self._connection = None
+
+
+settings_listener = SettingsChangeListener()
 
 
 def get_settings_service() -> SettingsService:
     """Get the settings service."""
-    from app.db.session import get_db_sync
-    db = get_db_sync()
-    return SettingsService(db)
+    return SettingsService()
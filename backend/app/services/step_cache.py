@@ -0,0 +1,230 @@
+"""
+Result cache for workflow steps.
+
+Steps opt in with a `cache` entry in their config, either `true` or
+`{"ttl": seconds, "persist": bool}`. A cached result is reused by any step
+of the same type and config (ignoring the cache entry itself) that receives
+the same input. Results are kept in an in-process LRU and, unless persist
+is off, in the workflow_step_cache table, so they are shared by every
+worker. Failed steps and simulated LLM responses are never cached. Expired
+rows are removed by the retention worker.
+
+Only opt in deterministic steps, such as pure transforms, conditions and
+LLM steps with a temperature of 0.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.workflow_execution import WorkflowStepCache
+from app.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+
+def get_cache_options(config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Get the cache options of a step.
+
+    Args:
+        config: Step config
+
+    Returns:
+        The TTL and persist options, or None if the step isn't cached
+    """
+    option = config.get("cache")
+    if not option or not settings.WORKFLOW_STEP_CACHE_ENABLED:
+        return None
+
+    options = option if isinstance(option, dict) else {}
+    return {
+        "ttl": options.get("ttl", settings.WORKFLOW_STEP_CACHE_TTL),
+        "persist": options.get("persist", settings.WORKFLOW_STEP_CACHE_PERSIST),
+    }
+
+
+def step_cache_key(step_type: str, config: Dict[str, Any], input_data: Dict[str, Any]) -> str:
+    """
+    Hash a step and its input for the cache.
+
+    The cache options aren't part of the key, so changing a TTL keeps the
+    cached results.
+    """
+    config = {key: value for key, value in config.items() if key != "cache"}
+    encoded = json.dumps([step_type, config, input_data], sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class StepResultCache:
+    """
+    Two-tier cache of step results, in memory and in the database.
+    """
+
+    def __init__(self, max_size: int):
+        """Initialize the cache."""
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of a result from memory, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, result = entry
+        if time.monotonic() > expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        # Steps may modify their result, which must not change the cache
+        return copy.deepcopy(result)
+
+    def _set_local(self, key: str, result: Dict[str, Any], ttl: float) -> None:
+        """Store a copy of a result in memory, evicting the least recently used one if full."""
+        self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str, persist: bool) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Get a cached step result.
+
+        Args:
+            key: Cache key of the step and its input
+            persist: Whether to look in the database on a memory miss
+
+        Returns:
+            A tuple of (result, tier it was found in: memory or database),
+            or (None, None) on a miss
+        """
+        result = self._get_local(key)
+        if result is not None:
+            return result, "memory"
+        if not persist:
+            return None, None
+
+        try:
+            async with async_session() as db:
+                row = (await db.execute(
+                    select(WorkflowStepCache.output_data, WorkflowStepCache.expires_at).where(
+                        WorkflowStepCache.cache_key == key,
+                        WorkflowStepCache.expires_at > datetime.utcnow(),
+                    )
+                )).first()
+        except Exception as e:
+            logger.error(f"Error reading step result cache: {e}")
+            return None, None
+
+        if row is None:
+            return None, None
+
+        output_data, expires_at = row
+        self._set_local(key, output_data, (expires_at - datetime.utcnow()).total_seconds())
+        return output_data, "database"
+
+    async def set(self, key: str, step_type: str, result: Dict[str, Any], ttl: float, persist: bool) -> None:
+        """
+        Store a step result.
+
+        Args:
+            key: Cache key of the step and its input
+            step_type: Type of the step
+            result: Output of the step
+            ttl: Seconds the result is reused for
+            persist: Whether to store the result in the database too
+        """
+        self._set_local(key, result, ttl)
+        if not persist:
+            return
+
+        now = datetime.utcnow()
+        values = {"step_type": step_type, "output_data": result, "expires_at": now + timedelta(seconds=ttl)}
+        try:
+            async with async_session() as db:
+                await db.execute(
+                    insert(WorkflowStepCache)
+                    .values(cache_key=key, created_at=now, updated_at=now, **values)
+                    # Replaces expired results too
+                    .on_conflict_do_update(index_elements=["cache_key"], set_={**values, "updated_at": now})
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error writing step result cache: {e}")
+
+    def clear(self) -> None:
+        """Remove the results cached in memory."""
+        self._entries.clear()
+
+
+async def purge_expired_step_results(
+    db: AsyncSession,
+    batch_size: Optional[int] = None,
+    batch_sleep: Optional[float] = None,
+) -> int:
+    """
+    Remove expired step results from the database, in chunks.
+
+    Like memory retention, each chunk is deleted and committed in its own
+    short transaction, walking the rows in (expires_at, id) order and
+    skipping rows locked by other transactions.
+
+    Args:
+        db: Database session
+        batch_size: Rows per chunk, defaults to RETENTION_BATCH_SIZE
+        batch_sleep: Seconds to pause between chunks, defaults to RETENTION_BATCH_SLEEP
+
+    Returns:
+        Number of results removed
+    """
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    batch_sleep = settings.RETENTION_BATCH_SLEEP if batch_sleep is None else batch_sleep
+
+    now = datetime.utcnow()
+    deleted = 0
+    last_key = None
+    while True:
+        chunk = select(WorkflowStepCache.id).where(WorkflowStepCache.expires_at <= now)
+        if last_key is not None:
+            chunk = chunk.where(tuple_(WorkflowStepCache.expires_at, WorkflowStepCache.id) > last_key)
+        chunk = (
+            chunk.order_by(WorkflowStepCache.expires_at, WorkflowStepCache.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+
+        result = await db.execute(
+            delete(WorkflowStepCache)
+            .where(WorkflowStepCache.id.in_(chunk.scalar_subquery()))
+            .returning(WorkflowStepCache.expires_at, WorkflowStepCache.id)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        await db.commit()
+
+        if not rows:
+            break
+
+        deleted += len(rows)
+        last_key = max(tuple(row) for row in rows)
+        if len(rows) < batch_size:
+            break
+        await asyncio.sleep(batch_sleep)
+
+    return deleted
+
+
+step_result_cache = StepResultCache(settings.WORKFLOW_STEP_CACHE_SIZE)
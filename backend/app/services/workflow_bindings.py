@@ -0,0 +1,305 @@
+"""
+Data bindings between workflow steps.
+
+String values of a step config can reference the workflow input and the
+results of earlier steps with `{{input.path}}` and `{{steps.step_id.path}}`,
+where path is a dot-separated list of keys and list indexes. A string that
+is a single expression is replaced by the referenced value itself, so large
+payloads are passed between steps by reference rather than copied or
+converted to text; expressions embedded in a longer string are rendered as
+text. A step's `input` config entry sets the input it receives, instead of
+the workflow input; a value that isn't a dictionary is passed as
+{"value": ...}. Braces that don't reference the input or a step of the
+workflow, such as JSON or Jinja examples in a prompt, are left as they are.
+
+Templates are compiled once per workflow definition. Code of transform and
+condition steps is never templated, since results of other steps must not
+be able to inject code.
+"""
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from app.core.config import settings
+
+EXPRESSION = re.compile(r"\{\{\s*([^{}]*?)\s*\}\}")
+
+# Config entries holding code, which are never templated
+CODE_KEYS = ("code", "condition")
+
+# Config entry binding the input of a step
+INPUT_KEY = "input"
+
+
+class BindingError(Exception):
+    """Raised when a binding is invalid or can't be resolved."""
+
+
+class Binding(ABC):
+    """A compiled value that depends on the input or step results."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def resolve(self, context: Dict[str, Any]) -> Any:
+        """Get the value for a context of {"input": ..., "steps": {...}}."""
+
+
+class Reference(Binding):
+    """A reference to the input, a step result, or a value inside them."""
+
+    __slots__ = ("path",)
+
+    def __init__(self, path: Tuple[str, ...]):
+        """Initialize the reference."""
+        self.path = path
+
+    def resolve(self, context: Dict[str, Any]) -> Any:
+        value = context
+        for index, part in enumerate(self.path):
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            elif isinstance(value, (list, tuple)) and part.isdigit() and int(part) < len(value):
+                value = value[int(part)]
+            else:
+                raise BindingError(f"{'.'.join(self.path[:index + 1])} is not available")
+        return value
+
+
+class Template(Binding):
+    """A string with embedded expressions."""
+
+    __slots__ = ("parts",)
+
+    def __init__(self, parts: List[Union[str, Reference]]):
+        """Initialize the template."""
+        self.parts = parts
+
+    def resolve(self, context: Dict[str, Any]) -> str:
+        return "".join(
+            part if isinstance(part, str) else _to_text(part.resolve(context))
+            for part in self.parts
+        )
+
+
+class BoundDict(Binding):
+    """A dictionary with bound values."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: Dict[str, Any]):
+        """Initialize the dictionary."""
+        self.items = items
+
+    def resolve(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: resolve_value(value, context) for key, value in self.items.items()}
+
+
+class BoundList(Binding):
+    """A list with bound values."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: List[Any]):
+        """Initialize the list."""
+        self.items = items
+
+    def resolve(self, context: Dict[str, Any]) -> List[Any]:
+        return [resolve_value(value, context) for value in self.items]
+
+
+def _to_text(value: Any) -> str:
+    """Render a value embedded in a string."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def parse_reference(expression: str, step_ids: Set[str]) -> Optional[Reference]:
+    """
+    Parse an expression such as steps.step1.result.
+
+    Returns:
+        The reference, or None if the expression doesn't reference the input
+        or a step of the workflow, and is literal text
+    """
+    path = tuple(expression.split("."))
+    if path[0] == "input" or (path[0] == "steps" and len(path) > 1 and path[1] in step_ids):
+        return Reference(path)
+    return None
+
+
+def compile_value(value: Any, step_ids: Set[str]) -> Any:
+    """
+    Compile the templates in a value.
+
+    Args:
+        value: Config value
+        step_ids: IDs of the steps of the workflow
+
+    Returns:
+        A Binding, or the value itself if it holds no expression
+    """
+    if isinstance(value, str):
+        matches = [
+            (match, reference)
+            for match in EXPRESSION.finditer(value)
+            for reference in [parse_reference(match.group(1), step_ids)]
+            if reference is not None
+        ]
+        if not matches:
+            return value
+        if len(matches) == 1 and matches[0][0].span() == (0, len(value)):
+            return matches[0][1]
+
+        parts: List[Union[str, Reference]] = []
+        position = 0
+        for match, reference in matches:
+            if match.start() > position:
+                parts.append(value[position:match.start()])
+            parts.append(reference)
+            position = match.end()
+        if position < len(value):
+            parts.append(value[position:])
+        return Template(parts)
+
+    if isinstance(value, dict):
+        items = {key: compile_value(item, step_ids) for key, item in value.items()}
+        return BoundDict(items) if any(isinstance(item, Binding) for item in items.values()) else value
+
+    if isinstance(value, list):
+        items = [compile_value(item, step_ids) for item in value]
+        return BoundList(items) if any(isinstance(item, Binding) for item in items) else value
+
+    return value
+
+
+def resolve_value(value: Any, context: Dict[str, Any]) -> Any:
+    """Resolve a value compiled with compile_value."""
+    return value.resolve(context) if isinstance(value, Binding) else value
+
+
+class CompiledWorkflow:
+    """
+    The compiled bindings of a workflow definition.
+    """
+
+    def __init__(self, definition: Dict[str, Any]):
+        """
+        Compile the bindings of a workflow definition.
+
+        Raises:
+            BindingError: If an expression is invalid
+        """
+        steps = definition.get("steps", [])
+        step_ids = {step["id"] for step in steps}
+
+        # Per step, the config with its input binding and code left out
+        self.configs: Dict[str, Any] = {}
+        self.inputs: Dict[str, Any] = {}
+        for step in steps:
+            config = step.get("config", {})
+            self.configs[step["id"]] = compile_value(
+                {key: value for key, value in config.items() if key not in CODE_KEYS and key != INPUT_KEY},
+                step_ids,
+            )
+            if INPUT_KEY in config:
+                compiled = compile_value(config[INPUT_KEY], step_ids)
+                if isinstance(compiled, (str, list, Template, BoundList)):
+                    raise BindingError(f"The input of step {step['id']} must be a dictionary or a single reference")
+                self.inputs[step["id"]] = compiled
+
+        self.output: Dict[str, Any] = {}
+        for key, value in definition.get("output", {}).items():
+            if isinstance(value, dict) and "source" in value and "path" in value:
+                # Output mappings of the workflow builder
+                if value["source"] == "variables":
+                    self.output[key] = Reference(("steps", *value["path"].split(".")))
+                elif value["source"] == "input":
+                    self.output[key] = Reference(("input", *value["path"].split(".")))
+            else:
+                self.output[key] = compile_value(value, step_ids)
+
+    def resolve_config(self, step_id: str, config: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the config of a step with its bindings resolved.
+
+        Returns:
+            The config itself if it has no bindings
+        """
+        compiled = self.configs.get(step_id)
+        if not isinstance(compiled, Binding):
+            return config
+
+        resolved = compiled.resolve(context)
+        for key in CODE_KEYS + (INPUT_KEY,):
+            if key in config:
+                resolved[key] = config[key]
+        return resolved
+
+    def resolve_input(self, step_id: str, context: Dict[str, Any]) -> Any:
+        """
+        Get the input of a step.
+
+        Returns:
+            The value bound by the step's input config, or the workflow input
+            itself, which isn't copied
+        """
+        if step_id not in self.inputs:
+            return context["input"]
+
+        value = resolve_value(self.inputs[step_id], context)
+        # Steps read their input as a dictionary
+        return value if isinstance(value, dict) else {"value": value}
+
+    def has_input_binding(self, step_id: str) -> bool:
+        """Whether a step has its own input."""
+        return step_id in self.inputs
+
+    def resolve_output(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the output of the workflow.
+
+        Output values whose references aren't available, such as results of
+        skipped steps, are left out.
+        """
+        output = {}
+        for key, value in self.output.items():
+            try:
+                output[key] = resolve_value(value, context)
+            except BindingError:
+                continue
+        return output
+
+
+# Compiled workflows by hash of their definition
+_compiled: "OrderedDict[str, CompiledWorkflow]" = OrderedDict()
+
+
+def compile_workflow(definition: Dict[str, Any]) -> CompiledWorkflow:
+    """
+    Get the compiled bindings of a workflow definition.
+
+    Definitions are compiled once and cached by the hash of their content,
+    so every execution of a workflow reuses its compiled templates.
+
+    Raises:
+        BindingError: If an expression is invalid
+    """
+    key = hashlib.sha256(json.dumps(definition, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    compiled: Optional[CompiledWorkflow] = _compiled.get(key)
+    if compiled is not None:
+        _compiled.move_to_end(key)
+        return compiled
+
+    compiled = CompiledWorkflow(definition)
+    _compiled[key] = compiled
+    while len(_compiled) > settings.WORKFLOW_BINDING_CACHE_SIZE:
+        _compiled.popitem(last=False)
+    return compiled
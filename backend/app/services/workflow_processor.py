@@ -2,15 +2,25 @@
 Real workflow processor that can execute workflows with LLM steps.
 """
 
+import asyncio
 import json
 import logging
 import os
 import time
-from typing import Any, Dict, List, Optional
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
-import httpx
 from pydantic import BaseModel
 
+from app.core.config import settings
+from app.services.code_runner import code_runner
+from app.services.http_client import get_http_client
+from app.services.metrics import metrics
+from app.services.step_cache import get_cache_options, step_cache_key, step_result_cache
+from app.services.workflow_bindings import CompiledWorkflow, compile_workflow
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,6 +41,7 @@ class WorkflowDefinition(BaseModel):
     steps: List[WorkflowStep]
     connections: List[WorkflowConnection]
     output: Dict[str, Any]
+    max_concurrency: Optional[int] = None
 
 class WorkflowExecution(BaseModel):
     id: str
@@ -45,6 +56,12 @@ class WorkflowExecution(BaseModel):
     output_data: Optional[Dict[str, Any]] = None
     steps: List[Dict[str, Any]] = []
 
+def _timestamp() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string with microsecond precision.
+    """
+    return datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
 async def execute_llm_step(step: WorkflowStep, input_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Execute an LLM step using the OpenAI API.
@@ -105,16 +122,9 @@ async def execute_llm_step(step: WorkflowStep, input_data: Dict[str, Any]) -> Di
         # Get model from step config or use default
         model = step.config.get("model", "gpt-3.5-turbo")
 
-        # Get prompt from step config and replace variables
-        prompt_template = step.config.get("prompt", "")
-        prompt = prompt_template
-
-        # Replace variables in the prompt
-        for key, value in input_data.items():
-            if isinstance(value, str):
-                prompt = prompt.replace(f"{{{{input.{key}}}}}", value)
-            else:
-                prompt = prompt.replace(f"{{{{input.{key}}}}}", str(value))
+        # Get prompt from step config, its {{input.*}} and {{steps.*}}
+        # expressions are resolved before the step runs
+        prompt = step.config.get("prompt", "")
 
         # Prepare the API request
         headers = {
@@ -129,28 +139,31 @@ async def execute_llm_step(step: WorkflowStep, input_data: Dict[str, Any]) -> Di
             "max_tokens": step.config.get("max_tokens", 1000)
         }
 
-        # Make the API request
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=60.0
-            )
+        # Make the API request with the shared client for the provider host
+        url = "https://api.openai.com/v1/chat/completions"
+        client = get_http_client(url)
+        request_start = time.perf_counter()
+        response = await client.post(
+            url,
+            headers=headers,
+            json=payload,
+        )
+        request_time = time.perf_counter() - request_start
 
-            if response.status_code != 200:
-                raise ValueError(f"OpenAI API error: {response.text}")
+        if response.status_code != 200:
+            raise ValueError(f"OpenAI API error: {response.text}")
 
-            result = response.json()
+        result = response.json()
 
-            # Extract the response text
-            response_text = result["choices"][0]["message"]["content"]
+        # Extract the response text
+        response_text = result["choices"][0]["message"]["content"]
+        metrics.observe_llm_call("openai", model, "workflow", request_time, result.get("usage"))
 
-            return {
-                "result": response_text,
-                "model": model,
-                "usage": result.get("usage", {})
-            }
+        return {
+            "result": response_text,
+            "model": model,
+            "usage": result.get("usage", {})
+        }
 
     except Exception as e:
         logger.error(f"Error executing LLM step: {e}")
@@ -159,22 +172,18 @@ async def execute_llm_step(step: WorkflowStep, input_data: Dict[str, Any]) -> Di
 async def execute_transform_step(step: WorkflowStep, input_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Execute a transform step using the provided code.
+
+    The code runs in the code process pool, and sets `result` from `input`.
     """
     try:
         # Get the code from the step config
         code = step.config.get("code", "")
 
-        # Create a function from the code
-        transform_fn = compile(code, "<string>", "exec")
-
-        # Create a namespace for the function
-        namespace = {"input": input_data, "result": {}}
-
-        # Execute the function
-        exec(transform_fn, namespace)
+        # Run the code with a namespace holding the input
+        result = await code_runner.run(code, {"input": input_data, "result": {}})
 
         # Return the result
-        return namespace.get("result", {})
+        return result if result is not None else {}
 
     except Exception as e:
         logger.error(f"Error executing transform step: {e}")
@@ -183,31 +192,329 @@ async def execute_transform_step(step: WorkflowStep, input_data: Dict[str, Any])
 async def execute_condition_step(step: WorkflowStep, input_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Execute a condition step using the provided condition.
+
+    The condition is evaluated in the code process pool.
     """
     try:
         # Get the condition from the step config
         condition = step.config.get("condition", "")
 
-        # Create a function from the condition
-        condition_fn = compile(f"result = {condition}", "<string>", "exec")
-
-        # Create a namespace for the function
-        namespace = {"input": input_data, "result": False}
-
-        # Execute the function
-        exec(condition_fn, namespace)
+        # Evaluate the condition with a namespace holding the input
+        result = await code_runner.run(f"result = {condition}", {"input": input_data, "result": False})
 
         # Return the result
-        return {"result": namespace["result"]}
+        return {"result": result}
 
     except Exception as e:
         logger.error(f"Error executing condition step: {e}")
         return {"error": str(e)}
 
-async def execute_workflow(workflow_id: str, workflow_def: Dict[str, Any], input_data: Dict[str, Any]) -> WorkflowExecution:
+async def execute_step(step: WorkflowStep, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Execute a single step based on its type.
+    """
+    if step.type == "llm":
+        return await execute_llm_step(step, input_data)
+    elif step.type == "transform":
+        return await execute_transform_step(step, input_data)
+    elif step.type == "condition":
+        return await execute_condition_step(step, input_data)
+    else:
+        return {"error": f"Unknown step type: {step.type}"}
+
+def build_step_graph(workflow: WorkflowDefinition) -> Tuple[Dict[str, List[WorkflowConnection]], Dict[str, int]]:
+    """
+    Build the dependency graph of a workflow from its connections.
+
+    Connections that reference something other than a step (such as the input
+    and output nodes drawn in the builder) are ignored.
+
+    Args:
+        workflow: The workflow definition
+
+    Returns:
+        A tuple of (outgoing connections per step, number of incoming connections per step)
+
+    Raises:
+        ValueError: If the connections contain a cycle
+    """
+    outgoing: Dict[str, List[WorkflowConnection]] = {step.id: [] for step in workflow.steps}
+    indegree: Dict[str, int] = {step.id: 0 for step in workflow.steps}
+
+    for connection in workflow.connections:
+        if connection.from_step in outgoing and connection.to_step in outgoing:
+            outgoing[connection.from_step].append(connection)
+            indegree[connection.to_step] += 1
+
+    # Topologically sort the steps to make sure every step can eventually run
+    remaining = dict(indegree)
+    queue = deque(step_id for step_id, count in remaining.items() if count == 0)
+    visited = 0
+    while queue:
+        step_id = queue.popleft()
+        visited += 1
+        for connection in outgoing[step_id]:
+            remaining[connection.to_step] -= 1
+            if remaining[connection.to_step] == 0:
+                queue.append(connection.to_step)
+
+    if visited != len(outgoing):
+        raise ValueError("Workflow connections contain a cycle")
+
+    return outgoing, indegree
+
+def is_connection_active(connection: WorkflowConnection, result: Optional[Dict[str, Any]]) -> bool:
+    """
+    Check whether a connection should be followed given the result of its source step.
+
+    A connection is never followed from a skipped or failed step. Conditional
+    connections are only followed when the condition step's result matches.
+    """
+    if result is None or "error" in result:
+        return False
+    if connection.condition is None:
+        return True
+    return bool(result.get("result")) == connection.condition
+
+# Called with the step execution record and result of every step that ran
+StepCallback = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[None]]
+
+class StepScheduler:
+    """
+    Scheduler that runs workflow steps as soon as their dependencies are done.
+
+    Steps are ordered by the workflow connections, and every step whose
+    dependencies have finished is started at once, up to max_concurrency steps
+    at a time. Conditional connections are gates: a step runs when all of
+    its conditional incoming connections are taken and at least one of its
+    incoming connections is active; otherwise it is skipped, and the skip
+    propagates downstream. The
+    bindings of a step's config are resolved against the workflow input and
+    the results of the steps finished before it.
+
+    Steps with a checkpoint (the record of an earlier completed run of the
+    step, when resuming an execution) are not run again; their checkpointed
+    output is used instead. Steps that opt in to the result cache reuse the
+    result of an earlier run with the same input, unless bypass_cache is set;
+    their records tell whether the cache was hit, missed or bypassed.
+    """
+
+    def __init__(
+        self,
+        workflow: WorkflowDefinition,
+        execution_id: str,
+        input_data: Dict[str, Any],
+        max_concurrency: int,
+        bindings: CompiledWorkflow,
+        checkpoints: Optional[Dict[str, Dict[str, Any]]] = None,
+        on_step_complete: Optional[StepCallback] = None,
+        bypass_cache: bool = False,
+    ):
+        """Initialize the scheduler."""
+        self.workflow = workflow
+        self.execution_id = execution_id
+        self.input_data = input_data
+        self.bindings = bindings
+        self.checkpoints = checkpoints or {}
+        self.on_step_complete = on_step_complete
+        self.bypass_cache = bypass_cache
+        self.steps = {step.id: step for step in workflow.steps}
+        self.outgoing, self.indegree = build_step_graph(workflow)
+        self.pending = dict(self.indegree)
+        self.active_inputs = {step_id: 0 for step_id in self.steps}
+        # Steps with a conditional incoming connection that wasn't taken
+        self.gated: Set[str] = set()
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.tasks: Set[asyncio.Task] = set()
+        self.step_results: Dict[str, Dict[str, Any]] = {}
+        self.step_executions: Dict[str, Dict[str, Any]] = {}
+
+    async def run(self) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Run all steps of the workflow.
+
+        Returns:
+            A tuple of (results per step ID, step executions in definition order)
+        """
+        for step in self.workflow.steps:
+            if self.indegree[step.id] == 0:
+                self._schedule(step.id)
+
+        try:
+            while self.tasks:
+                done, self.tasks = await asyncio.wait(self.tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step_id, result = task.result()
+                    self.step_results[step_id] = result
+                    self._complete(step_id, result)
+        finally:
+            for task in self.tasks:
+                task.cancel()
+
+        step_executions = [
+            self.step_executions[step.id]
+            for step in self.workflow.steps
+            if step.id in self.step_executions
+        ]
+        return self.step_results, step_executions
+
+    def _schedule(self, step_id: str) -> None:
+        """Start a step in the background."""
+        self.tasks.add(asyncio.create_task(self._run_step(self.steps[step_id])))
+
+    def _complete(self, step_id: str, result: Optional[Dict[str, Any]]) -> None:
+        """Release the dependents of a finished or skipped step."""
+        for connection in self.outgoing[step_id]:
+            target = connection.to_step
+            if is_connection_active(connection, result):
+                self.active_inputs[target] += 1
+            elif connection.condition is not None:
+                self.gated.add(target)
+            self.pending[target] -= 1
+
+            if self.pending[target] == 0:
+                if self.active_inputs[target] and target not in self.gated:
+                    self._schedule(target)
+                else:
+                    self._skip(target)
+
+    def _skip(self, step_id: str) -> None:
+        """Record a step that will not run because its inputs aren't active."""
+        step = self.steps[step_id]
+        timestamp = _timestamp()
+        self.step_executions[step_id] = {
+            "id": f"{self.execution_id}_{step.id}",
+            "step_id": step.id,
+            "step_name": step.name,
+            "status": "skipped",
+            "started_at": timestamp,
+            "completed_at": timestamp,
+            "execution_time": 0.0,
+        }
+        self._complete(step_id, None)
+
+    async def _execute_cached(
+        self,
+        step: WorkflowStep,
+        step_input: Any,
+        step_execution: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Execute a step, through the result cache if it opted in."""
+        options = get_cache_options(step.config)
+        if options is None:
+            return await execute_step(step, step_input)
+
+        key = step_cache_key(step.type, step.config, step_input)
+        if self.bypass_cache:
+            step_execution["cache"] = "bypass"
+        else:
+            cached, tier = await step_result_cache.get(key, options["persist"])
+            step_execution["cache"] = "hit" if cached is not None else "miss"
+            if cached is not None:
+                step_execution["cache_tier"] = tier
+        metrics.observe_step_cache(step.type, step_execution["cache"])
+        if step_execution["cache"] == "hit":
+            return cached
+
+        result = await execute_step(step, step_input)
+        # Responses simulated without an API key must not be reused once a
+        # key is configured
+        if "error" not in result and result.get("model") != "simulation":
+            await step_result_cache.set(key, step.type, result, options["ttl"], options["persist"])
+        return result
+
+    async def _run_step(self, step: WorkflowStep) -> Tuple[str, Dict[str, Any]]:
+        """Run a single step and record its execution."""
+        checkpoint = self.checkpoints.get(step.id)
+        if checkpoint is not None:
+            self.step_executions[step.id] = {
+                **checkpoint,
+                "id": f"{self.execution_id}_{step.id}",
+                "resumed": True,
+            }
+            return step.id, checkpoint.get("output_data") or {}
+
+        async with self.semaphore:
+            step_start_time = time.time()
+            step_execution = {
+                "id": f"{self.execution_id}_{step.id}",
+                "step_id": step.id,
+                "step_name": step.name,
+                "step_type": step.type,
+                "status": "running",
+                "started_at": _timestamp(),
+            }
+            self.step_executions[step.id] = step_execution
+
+            try:
+                # Resolve the bindings of the step against the results so far.
+                # Values are passed by reference, and only a step's own input
+                # is recorded; the workflow input is stored once, on the
+                # execution
+                context = {"input": self.input_data, "steps": self.step_results}
+                step_input = self.bindings.resolve_input(step.id, context)
+                if self.bindings.has_input_binding(step.id):
+                    step_execution["input_data"] = step_input
+                config = self.bindings.resolve_config(step.id, step.config, context)
+                if config is not step.config:
+                    step = step.model_copy(update={"config": config})
+
+                result = await self._execute_cached(step, step_input, step_execution)
+
+                # Update the step execution
+                step_execution["status"] = "completed" if "error" not in result else "failed"
+                step_execution["output_data"] = result
+
+                if "error" in result:
+                    step_execution["error"] = result["error"]
+
+            except Exception as e:
+                logger.error(f"Error executing step {step.id}: {e}")
+                result = {"error": str(e)}
+                step_execution["status"] = "failed"
+                step_execution["error"] = str(e)
+
+            step_execution["completed_at"] = _timestamp()
+            step_execution["execution_time"] = time.time() - step_start_time
+            metrics.observe_workflow_step(step.type, step_execution["status"], step_execution["execution_time"])
+
+            # Checkpoint the step so a resumed execution doesn't run it again
+            if self.on_step_complete is not None:
+                try:
+                    await self.on_step_complete(step_execution, result)
+                except Exception as e:
+                    logger.error(f"Error checkpointing step {step.id} of execution {self.execution_id}: {e}")
+
+            return step.id, result
+
+async def execute_workflow(
+    workflow_id: str,
+    workflow_def: Dict[str, Any],
+    input_data: Dict[str, Any],
+    execution_id: Optional[str] = None,
+    checkpoints: Optional[Dict[str, Dict[str, Any]]] = None,
+    on_step_complete: Optional[StepCallback] = None,
+    bypass_cache: bool = False,
+) -> WorkflowExecution:
     """
     Execute a workflow with the given input data.
+
+    Steps are scheduled from the workflow connections, so independent steps run
+    concurrently. The number of steps running at once is capped by the
+    workflow's max_concurrency, or WORKFLOW_MAX_CONCURRENCY if it is not set.
+
+    Args:
+        workflow_id: ID of the workflow
+        workflow_def: Workflow definition
+        input_data: Input of the workflow
+        execution_id: ID of the execution, a new UUID by default
+        checkpoints: Records of steps completed by an earlier run of the
+            execution by step ID, which are not run again
+        on_step_complete: Called after each step that runs, to checkpoint it
+        bypass_cache: Run every step instead of reusing cached step results
     """
+    execution_id = execution_id or str(uuid.uuid4())
+
     # Parse the workflow definition
     try:
         # Convert the steps to WorkflowStep objects
@@ -234,15 +541,19 @@ async def execute_workflow(workflow_id: str, workflow_def: Dict[str, Any], input
         workflow = WorkflowDefinition(
             steps=steps,
             connections=connections,
-            output=workflow_def.get("output", {})
+            output=workflow_def.get("output", {}),
+            max_concurrency=workflow_def.get("max_concurrency")
         )
+
+        # Compile the bindings between steps, once per definition
+        bindings = compile_workflow(workflow_def)
     except Exception as e:
         logger.error(f"Error parsing workflow definition: {e}")
         return WorkflowExecution(
-            id=f"exec_{int(time.time())}",
+            id=execution_id,
             workflow_id=workflow_id,
-            started_at=time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            completed_at=time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            started_at=_timestamp(),
+            completed_at=_timestamp(),
             status="failed",
             error=f"Error parsing workflow definition: {str(e)}",
             execution_time=0.0,
@@ -250,13 +561,12 @@ async def execute_workflow(workflow_id: str, workflow_def: Dict[str, Any], input
         )
 
     # Start the execution
-    execution_id = f"exec_{int(time.time())}"
     start_time = time.time()
 
     execution = WorkflowExecution(
         id=execution_id,
         workflow_id=workflow_id,
-        started_at=time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        started_at=_timestamp(),
         status="running",
         execution_time=0.0,
         input_data=input_data,
@@ -264,68 +574,24 @@ async def execute_workflow(workflow_id: str, workflow_def: Dict[str, Any], input
     )
 
     try:
-        # Execute the workflow
-        step_results = {}
-        step_executions = []
-
-        # Execute each step
-        for step in workflow.steps:
-            step_start_time = time.time()
-            step_execution = {
-                "id": f"step_exec_{int(time.time())}",
-                "step_id": step.id,
-                "step_name": step.name,
-                "status": "running",
-                "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "input_data": input_data
-            }
-
-            try:
-                # Execute the step based on its type
-                if step.type == "llm":
-                    result = await execute_llm_step(step, input_data)
-                elif step.type == "transform":
-                    result = await execute_transform_step(step, input_data)
-                elif step.type == "condition":
-                    result = await execute_condition_step(step, input_data)
-                else:
-                    result = {"error": f"Unknown step type: {step.type}"}
-
-                # Store the result
-                step_results[step.id] = result
-
-                # Update the step execution
-                step_execution["status"] = "completed" if "error" not in result else "failed"
-                step_execution["completed_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ")
-                step_execution["execution_time"] = time.time() - step_start_time
-                step_execution["output_data"] = result
-
-                if "error" in result:
-                    step_execution["error"] = result["error"]
-
-            except Exception as e:
-                logger.error(f"Error executing step {step.id}: {e}")
-                step_execution["status"] = "failed"
-                step_execution["completed_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ")
-                step_execution["execution_time"] = time.time() - step_start_time
-                step_execution["error"] = str(e)
-
-            # Add the step execution to the list
-            step_executions.append(step_execution)
+        # Execute the steps in dependency order
+        scheduler = StepScheduler(
+            workflow,
+            execution_id,
+            input_data,
+            workflow.max_concurrency or settings.WORKFLOW_MAX_CONCURRENCY,
+            bindings,
+            checkpoints=checkpoints,
+            on_step_complete=on_step_complete,
+            bypass_cache=bypass_cache,
+        )
+        step_results, step_executions = await scheduler.run()
 
         # Determine the output
-        output_data = {}
-        for key, value in workflow.output.items():
-            if isinstance(value, dict) and "source" in value and "path" in value:
-                if value["source"] == "variables":
-                    path = value["path"].split(".")
-                    if len(path) == 2:
-                        step_id, result_key = path
-                        if step_id in step_results and result_key in step_results[step_id]:
-                            output_data[key] = step_results[step_id][result_key]
+        output_data = bindings.resolve_output({"input": input_data, "steps": step_results})
 
         # Update the execution
-        execution.completed_at = time.strftime("%Y-%m-%dT%H:%M:%SZ")
+        execution.completed_at = _timestamp()
         execution.status = "completed"
         execution.execution_time = time.time() - start_time
         execution.output_data = output_data
@@ -335,7 +601,7 @@ async def execute_workflow(workflow_id: str, workflow_def: Dict[str, Any], input
 
     except Exception as e:
         logger.error(f"Error executing workflow: {e}")
-        execution.completed_at = time.strftime("%Y-%m-%dT%H:%M:%SZ")
+        execution.completed_at = _timestamp()
         execution.status = "failed"
         execution.error = str(e)
         execution.execution_time = time.time() - start_time
@@ -0,0 +1,505 @@
+"""
+Durable workflow executions.
+
+Executions and the results of their steps are stored in the database. Each
+step is checkpointed as soon as it completes, and the process running an
+execution refreshes its heartbeat while it runs. An execution whose
+heartbeat stopped (its process crashed or was redeployed) is resumed from
+its checkpoints, so completed steps, and the LLM calls they made, are not
+run again.
+
+The execution table is also the job queue of the workflow workers: pending
+executions are leased with SELECT ... FOR UPDATE SKIP LOCKED, so any number
+of workers can poll it without handing out a job twice. A lease lasts while
+its worker keeps up the heartbeat; WORKFLOW_HEARTBEAT_TIMEOUT is the
+visibility timeout after which an interrupted job is leased again. A job
+interrupted after WORKFLOW_MAX_ATTEMPTS leases, such as one that keeps
+killing its worker, is failed instead.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.workflow_execution import WorkflowExecution, WorkflowStepExecution
+from app.db.session import async_session
+from app.services.workflow_processor import execute_workflow
+
+logger = logging.getLogger(__name__)
+
+# Identifies the leases held by this process
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a timestamp of a step execution record."""
+    return datetime.fromisoformat(value.rstrip("Z")) if value else None
+
+
+def _format_timestamp(value: Optional[datetime]) -> Optional[str]:
+    """Format a timestamp like the step execution records."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ") if value else None
+
+
+def step_to_dict(step: WorkflowStepExecution) -> Dict[str, Any]:
+    """
+    Get the API representation of a stored step execution.
+
+    The workflow input isn't repeated in every step; it is part of the
+    execution. Only steps with an input binding have their own input_data.
+    """
+    record = {
+        "id": f"{step.execution_id}_{step.step_id}",
+        "step_id": step.step_id,
+        "step_name": step.step_name,
+        "step_type": step.step_type,
+        "status": step.status,
+        "started_at": _format_timestamp(step.started_at),
+        "completed_at": _format_timestamp(step.completed_at),
+        "execution_time": step.execution_time,
+        "error": step.error,
+        "cache": step.cache_status,
+        "output_data": step.output_data,
+    }
+    if step.input_data is not None:
+        record["input_data"] = step.input_data
+    return record
+
+
+def execution_to_dict(
+    execution: WorkflowExecution,
+    steps: Optional[List[WorkflowStepExecution]] = None,
+) -> Dict[str, Any]:
+    """
+    Get the API representation of a stored execution.
+
+    Args:
+        execution: The execution
+        steps: Its step executions, to include them
+
+    Returns:
+        Dictionary with the fields of WorkflowExecution
+    """
+    return {
+        "id": str(execution.id),
+        "workflow_id": execution.workflow_id,
+        "started_at": _format_timestamp(execution.started_at or execution.created_at),
+        "completed_at": _format_timestamp(execution.completed_at),
+        "status": execution.status,
+        "result": execution.output_data,
+        "error": execution.error,
+        "execution_time": execution.execution_time,
+        "bypass_cache": execution.bypass_cache,
+        "input_data": execution.input_data,
+        "output_data": execution.output_data,
+        "steps": [step_to_dict(step) for step in steps or []],
+    }
+
+
+async def create_execution(
+    db: AsyncSession,
+    workflow_id: str,
+    definition: Dict[str, Any],
+    input_data: Dict[str, Any],
+    priority: int = 0,
+    bypass_cache: bool = False,
+    leased: bool = False,
+) -> WorkflowExecution:
+    """
+    Store a new execution of a workflow, pending unless leased.
+
+    Args:
+        db: Database session
+        workflow_id: ID of the workflow
+        definition: Workflow definition to execute
+        input_data: Input of the workflow
+        priority: Priority of the execution in the job queue
+        bypass_cache: Run every step instead of reusing cached step results
+        leased: Store the execution already leased by this process, so no
+            worker can lease it before the caller runs it
+
+    Returns:
+        The execution
+    """
+    now = datetime.utcnow()
+    execution = WorkflowExecution(
+        id=uuid.uuid4(),
+        workflow_id=workflow_id,
+        status="running" if leased else "pending",
+        definition=definition,
+        input_data=input_data,
+        priority=priority,
+        bypass_cache=bypass_cache,
+        worker_id=WORKER_ID if leased else None,
+        heartbeat_at=now if leased else None,
+        started_at=now if leased else None,
+        attempts=1 if leased else 0,
+        execution_time=0.0,
+    )
+    db.add(execution)
+    await db.commit()
+    await db.refresh(execution)
+    return execution
+
+
+async def get_execution(db: AsyncSession, execution_id: Any) -> Optional[WorkflowExecution]:
+    """Get an execution by ID."""
+    result = await db.execute(select(WorkflowExecution).where(WorkflowExecution.id == execution_id))
+    return result.scalars().first()
+
+
+async def get_step_executions(db: AsyncSession, execution_id: Any) -> List[WorkflowStepExecution]:
+    """Get the stored step executions of an execution, in the order they started."""
+    result = await db.execute(
+        select(WorkflowStepExecution)
+        .where(WorkflowStepExecution.execution_id == execution_id)
+        .order_by(WorkflowStepExecution.started_at, WorkflowStepExecution.step_id)
+    )
+    return result.scalars().all()
+
+
+async def list_executions(
+    db: AsyncSession,
+    workflow_id: str,
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[WorkflowExecution]:
+    """List the executions of a workflow, newest first."""
+    query = select(WorkflowExecution).where(WorkflowExecution.workflow_id == workflow_id)
+    if status:
+        query = query.where(WorkflowExecution.status == status)
+    query = query.order_by(WorkflowExecution.created_at.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+async def save_step(db: AsyncSession, execution_id: Any, step_execution: Dict[str, Any]) -> None:
+    """
+    Checkpoint a step execution.
+
+    Args:
+        db: Database session
+        execution_id: ID of the execution
+        step_execution: Step execution record from the scheduler
+    """
+    values = {
+        "step_name": step_execution.get("step_name"),
+        "step_type": step_execution.get("step_type"),
+        "status": step_execution["status"],
+        "input_data": step_execution.get("input_data"),
+        "output_data": step_execution.get("output_data"),
+        "error": step_execution.get("error"),
+        "cache_status": step_execution.get("cache"),
+        "started_at": _parse_timestamp(step_execution.get("started_at")),
+        "completed_at": _parse_timestamp(step_execution.get("completed_at")),
+        "execution_time": step_execution.get("execution_time") or 0.0,
+        "updated_at": datetime.utcnow(),
+    }
+    statement = insert(WorkflowStepExecution).values(
+        id=uuid.uuid4(),
+        execution_id=execution_id,
+        step_id=step_execution["step_id"],
+        created_at=datetime.utcnow(),
+        **values,
+    )
+    # A step that failed before the execution was resumed is overwritten
+    await db.execute(
+        statement.on_conflict_do_update(constraint="uq_workflow_step_execution_step", set_=values)
+    )
+    await db.commit()
+
+
+async def get_checkpoints(db: AsyncSession, execution_id: Any) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the records of the completed steps of an execution.
+
+    Returns:
+        Step execution records by step ID
+    """
+    steps = await get_step_executions(db, execution_id)
+    return {step.step_id: step_to_dict(step) for step in steps if step.status == "completed"}
+
+
+def _lease_values(now: datetime) -> Dict[str, Any]:
+    """Get the column values of an execution leased by this process."""
+    return {
+        "status": "running",
+        "worker_id": WORKER_ID,
+        "heartbeat_at": now,
+        "started_at": func.coalesce(WorkflowExecution.started_at, now),
+        "attempts": WorkflowExecution.attempts + 1,
+        "updated_at": now,
+    }
+
+
+def _interrupted(now: datetime) -> Any:
+    """Condition of the running executions whose heartbeat stopped."""
+    stale = now - timedelta(seconds=settings.WORKFLOW_HEARTBEAT_TIMEOUT)
+    return (WorkflowExecution.status == "running") & or_(
+        WorkflowExecution.heartbeat_at.is_(None), WorkflowExecution.heartbeat_at < stale
+    )
+
+
+def _leasable(now: datetime) -> Any:
+    """Condition of the executions that can be leased: pending, or interrupted with attempts left."""
+    return or_(WorkflowExecution.status == "pending", _interrupted(now)) & (
+        WorkflowExecution.attempts < settings.WORKFLOW_MAX_ATTEMPTS
+    )
+
+
+async def _fail_exhausted(db: AsyncSession, now: datetime) -> None:
+    """Fail the interrupted executions that used up their attempts, without committing."""
+    result = await db.execute(
+        update(WorkflowExecution)
+        .where(_interrupted(now), WorkflowExecution.attempts >= settings.WORKFLOW_MAX_ATTEMPTS)
+        .values(
+            status="failed",
+            error=f"Execution was interrupted after {settings.WORKFLOW_MAX_ATTEMPTS} attempts",
+            worker_id=None,
+            completed_at=now,
+            updated_at=now,
+        )
+        .returning(WorkflowExecution.id)
+        .execution_options(synchronize_session=False)
+    )
+    for (execution_id,) in result.all():
+        logger.error(
+            f"Failed workflow execution {execution_id}, "
+            f"interrupted after {settings.WORKFLOW_MAX_ATTEMPTS} attempts"
+        )
+
+
+async def claim_execution(db: AsyncSession, execution_id: Any) -> bool:
+    """
+    Lease an execution for this process, if it is pending or interrupted.
+
+    The claim is a single conditional UPDATE, so when several processes try
+    to run the same execution only one of them wins.
+
+    Returns:
+        Whether the execution was claimed
+    """
+    now = datetime.utcnow()
+    await _fail_exhausted(db, now)
+    result = await db.execute(
+        update(WorkflowExecution)
+        .where(WorkflowExecution.id == execution_id, _leasable(now))
+        .values(**_lease_values(now))
+        .returning(WorkflowExecution.id)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = result.first() is not None
+    await db.commit()
+    return claimed
+
+
+async def lease_executions(db: AsyncSession, limit: int) -> List[Any]:
+    """
+    Lease the next executions of the job queue for this process.
+
+    Pending and interrupted executions are leased by priority, then age.
+    Rows locked by another worker polling at the same time are skipped
+    rather than waited for.
+
+    Args:
+        db: Database session
+        limit: Maximum number of executions to lease
+
+    Returns:
+        IDs of the leased executions
+    """
+    now = datetime.utcnow()
+    await _fail_exhausted(db, now)
+    queued = (
+        select(WorkflowExecution.id)
+        .where(_leasable(now))
+        .order_by(WorkflowExecution.priority.desc(), WorkflowExecution.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(WorkflowExecution)
+        .where(WorkflowExecution.id.in_(queued))
+        .values(**_lease_values(now))
+        .returning(WorkflowExecution.id)
+        .execution_options(synchronize_session=False)
+    )
+    leased = [row[0] for row in result.all()]
+    await db.commit()
+    return leased
+
+
+async def cancel_execution(db: AsyncSession, execution_id: Any) -> bool:
+    """
+    Cancel an execution that hasn't finished.
+
+    A pending execution is never leased. A running one is stopped by its
+    worker at its next heartbeat; steps that already started may still
+    complete.
+
+    Returns:
+        Whether the execution was cancelled
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(WorkflowExecution)
+        .where(WorkflowExecution.id == execution_id, WorkflowExecution.status.in_(("pending", "running")))
+        .values(status="cancelled", completed_at=now, updated_at=now)
+        .returning(WorkflowExecution.id)
+        .execution_options(synchronize_session=False)
+    )
+    cancelled = result.first() is not None
+    await db.commit()
+    return cancelled
+
+
+def _owned(execution_id: Any) -> Any:
+    """Condition of an execution still leased by this process."""
+    return (
+        (WorkflowExecution.id == execution_id)
+        & (WorkflowExecution.status == "running")
+        & (WorkflowExecution.worker_id == WORKER_ID)
+    )
+
+
+async def release_execution(db: AsyncSession, execution_id: Any) -> None:
+    """
+    Give up the lease of an execution, so another worker resumes it without
+    waiting for the visibility timeout.
+    """
+    await db.execute(
+        update(WorkflowExecution)
+        .where(_owned(execution_id))
+        .values(status="pending", worker_id=None, heartbeat_at=None, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def _heartbeat(execution_id: Any) -> None:
+    """
+    Refresh the heartbeat of an execution while this process holds its lease.
+
+    Returns when the lease is lost, because the execution was cancelled or
+    its heartbeat timed out and another worker leased it.
+    """
+    while True:
+        await asyncio.sleep(settings.WORKFLOW_HEARTBEAT_INTERVAL)
+        try:
+            async with async_session() as db:
+                result = await db.execute(
+                    update(WorkflowExecution)
+                    .where(_owned(execution_id))
+                    .values(heartbeat_at=datetime.utcnow())
+                    .returning(WorkflowExecution.id)
+                    .execution_options(synchronize_session=False)
+                )
+                owned = result.first() is not None
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error refreshing heartbeat of execution {execution_id}: {e}")
+            continue
+
+        if not owned:
+            return
+
+
+async def run_execution(execution_id: Any) -> Optional[Dict[str, Any]]:
+    """
+    Run an execution leased by this process to the end.
+
+    Steps completed by earlier attempts are not run again, and every step that
+    runs is checkpointed when it completes. The run stops if the lease is
+    lost.
+
+    Args:
+        execution_id: ID of the execution
+
+    Returns:
+        The execution, or None if it doesn't exist
+    """
+    async with async_session() as db:
+        execution = await get_execution(db, execution_id)
+        if execution is None:
+            return None
+        checkpoints = await get_checkpoints(db, execution_id)
+
+    if checkpoints:
+        logger.info(f"Resuming execution {execution_id} after {len(checkpoints)} completed steps")
+
+    async def checkpoint(step_execution: Dict[str, Any], result: Dict[str, Any]) -> None:
+        async with async_session() as db:
+            await save_step(db, execution_id, step_execution)
+
+    run = asyncio.create_task(execute_workflow(
+        execution.workflow_id,
+        execution.definition,
+        execution.input_data,
+        execution_id=str(execution_id),
+        checkpoints=checkpoints,
+        on_step_complete=checkpoint,
+        bypass_cache=execution.bypass_cache,
+    ))
+    heartbeat = asyncio.create_task(_heartbeat(execution_id))
+    try:
+        await asyncio.wait({run, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        heartbeat.cancel()
+        if not run.done():
+            logger.info(f"Stopping execution {execution_id}, its lease was lost")
+            run.cancel()
+            # The run is only cancelled once it handled the cancellation
+            await asyncio.gather(run, return_exceptions=True)
+
+    async with async_session() as db:
+        if not run.cancelled():
+            result = run.result()
+            now = datetime.utcnow()
+            await db.execute(
+                update(WorkflowExecution)
+                .where(_owned(execution_id))
+                .values(
+                    status=result.status,
+                    output_data=result.output_data,
+                    error=result.error,
+                    completed_at=now,
+                    execution_time=result.execution_time,
+                    updated_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+        execution = await get_execution(db, execution_id)
+        return execution_to_dict(execution, await get_step_executions(db, execution_id))
+
+
+# Executions running in the background, kept so they aren't garbage collected
+_background_runs: Set[asyncio.Task] = set()
+
+
+def run_in_background(execution_id: Any) -> asyncio.Task:
+    """
+    Run a leased execution in a background task.
+
+    The run isn't tied to the request that started it, so it continues if the
+    client disconnects.
+
+    Returns:
+        The task, whose result is the finished execution
+    """
+    task = asyncio.create_task(run_execution(execution_id))
+    _background_runs.add(task)
+    task.add_done_callback(_background_runs.discard)
+    return task
@@ -0,0 +1,140 @@
+"""
+Workflow worker.
+
+Runs the executions submitted to the job queue (see workflow_store). Each
+worker leases up to WORKFLOW_WORKER_CONCURRENCY executions at a time, so
+throughput scales with the number of worker processes, which can run
+inside the API servers or on their own with `python -m app.worker`.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+from app.db.session import async_session
+from app.services import workflow_store
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowWorker:
+    """
+    Background task that leases executions from the job queue and runs them.
+    """
+
+    def __init__(self, concurrency: int, poll_interval: float):
+        """Initialize the worker."""
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+        self._runs: Dict[asyncio.Task, Any] = {}
+        self.metrics: Dict[str, Any] = {
+            "leased": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "errors": 0,
+            "last_error": None,
+        }
+
+    @property
+    def running(self) -> int:
+        """Number of executions being run."""
+        return len(self._runs)
+
+    def start(self) -> None:
+        """Start the worker."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"Started workflow worker {workflow_store.WORKER_ID} "
+                f"running up to {self.concurrency} executions"
+            )
+
+    def _on_run_done(self, task: asyncio.Task) -> None:
+        """Record the outcome of an execution."""
+        execution_id = self._runs.pop(task, None)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.metrics["errors"] += 1
+            self.metrics["last_error"] = str(task.exception())
+            logger.error(f"Error running workflow execution {execution_id}: {task.exception()}")
+            return
+
+        execution = task.result()
+        if execution is not None and execution["status"] in self.metrics:
+            self.metrics[execution["status"]] += 1
+
+    async def poll(self) -> int:
+        """
+        Lease executions for the free slots of the worker and start them.
+
+        Returns:
+            Number of executions leased
+        """
+        free = self.concurrency - len(self._runs)
+        if free <= 0:
+            return 0
+
+        async with async_session() as db:
+            execution_ids = await workflow_store.lease_executions(db, free)
+
+        for execution_id in execution_ids:
+            task = asyncio.create_task(workflow_store.run_execution(execution_id))
+            self._runs[task] = execution_id
+            task.add_done_callback(self._on_run_done)
+        self.metrics["leased"] += len(execution_ids)
+        return len(execution_ids)
+
+    async def _run(self) -> None:
+        """Run executions from the job queue until stopped."""
+        while True:
+            try:
+                leased = await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                leased = 0
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = str(e)
+                logger.error(f"Error polling the workflow job queue: {e}")
+
+            if len(self._runs) >= self.concurrency:
+                # Poll again as soon as a slot frees up
+                await asyncio.wait(set(self._runs), return_when=asyncio.FIRST_COMPLETED)
+            elif not leased:
+                await asyncio.sleep(self.poll_interval)
+
+    async def stop(self) -> None:
+        """
+        Stop the worker.
+
+        Executions still running are stopped and their leases released, so
+        other workers resume them from their last completed step.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        runs: Set[asyncio.Task] = set(self._runs)
+        execution_ids = list(self._runs.values())
+        for task in runs:
+            task.cancel()
+        if runs:
+            await asyncio.gather(*runs, return_exceptions=True)
+
+        for execution_id in execution_ids:
+            try:
+                async with async_session() as db:
+                    await workflow_store.release_execution(db, execution_id)
+            except Exception as e:
+                logger.error(f"Error releasing workflow execution {execution_id}: {e}")
+
+
+workflow_worker = WorkflowWorker(settings.WORKFLOW_WORKER_CONCURRENCY, settings.WORKFLOW_WORKER_POLL_INTERVAL)
@@ -3,16 +3,36 @@ Utility functions for working with agents.
 """
 
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
-from langchain.schema import AIMessage, HumanMessage, SystemMessage
+from langchain.schema import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
 from app.core.config import settings
 from app.db.models import Agent, Memory
-from app.utils.llm_providers import create_chat_model, create_chat_model_async, format_messages
+from app.utils.llm_providers import (
+    create_chat_model,
+    create_chat_model_async,
+    format_messages,
+    invoke_chat_model,
+    stream_chat_model,
+)
+from app.utils.prompt_builder import PromptBuilder, PromptSection, get_prompt_budget
 
 logger = logging.getLogger(__name__)
 
+# Packing priorities of the prompt sections, lower is packed first. Sections
+# below HISTORY_PRIORITY take precedence over the conversation history.
+TEMPLATE_PRIORITY = 0
+PREFERENCES_PRIORITY = 1
+HISTORY_PRIORITY = 2
+KNOWLEDGE_PRIORITY = 3
+EXAMPLES_PRIORITY = 4
+
+
+def get_agent_provider(agent: Agent) -> str:
+    """Get the LLM provider an agent uses."""
+    return agent.integration_settings.get("provider", settings.DEFAULT_PROVIDER)
+
 
 async def generate_agent_response(
     agent: Agent,
@@ -20,6 +40,7 @@ async def generate_agent_response(
     conversation_history: Optional[List[Memory]] = None,
     context: Optional[Dict[str, Any]] = None,
     db = None,
+    summary: Optional[str] = None,
 ) -> str:
     """
     Generate a response from an agent.
@@ -30,16 +51,78 @@ async def generate_agent_response(
         conversation_history: The conversation history to use for context.
         context: Additional context for the agent.
         db: The database session to use for retrieving settings.
+        summary: Rolling summary of messages older than the conversation history.
 
     Returns:
         The generated response.
     """
+    chat, formatted_messages = await prepare_agent_chat(
+        agent, message, conversation_history, context, db, summary
+    )
+
+    # Generate the response without blocking the event loop
+    return await invoke_chat_model(chat, formatted_messages, get_agent_provider(agent))
+
+
+async def stream_agent_response(
+    agent: Agent,
+    message: str,
+    conversation_history: Optional[List[Memory]] = None,
+    context: Optional[Dict[str, Any]] = None,
+    db = None,
+    summary: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream a response from an agent.
+
+    The chat model and prompt are prepared before this returns, so the
+    database session is no longer needed while the stream is consumed.
+
+    Args:
+        agent: The agent to generate a response from.
+        message: The message to respond to.
+        conversation_history: The conversation history to use for context.
+        context: Additional context for the agent.
+        db: The database session to use for retrieving settings.
+        summary: Rolling summary of messages older than the conversation history.
+
+    Returns:
+        An async iterator over the chunks of the response.
+    """
+    chat, formatted_messages = await prepare_agent_chat(
+        agent, message, conversation_history, context, db, summary
+    )
+    return stream_chat_model(chat, formatted_messages, get_agent_provider(agent))
+
+
+async def prepare_agent_chat(
+    agent: Agent,
+    message: str,
+    conversation_history: Optional[List[Memory]] = None,
+    context: Optional[Dict[str, Any]] = None,
+    db = None,
+    summary: Optional[str] = None,
+) -> Tuple[Any, List[BaseMessage]]:
+    """
+    Create the chat model of an agent and the messages to send to it.
+
+    Args:
+        agent: The agent to generate a response from.
+        message: The message to respond to.
+        conversation_history: The conversation history to use for context.
+        context: Additional context for the agent.
+        db: The database session to use for retrieving settings.
+        summary: Rolling summary of messages older than the conversation history.
+
+    Returns:
+        A tuple of (chat model, formatted messages).
+    """
     # Create the chat model
     if db:
         # Use async version with database settings
         chat = await create_chat_model_async(
             db=db,
-            provider=agent.integration_settings.get("provider", settings.DEFAULT_PROVIDER),
+            provider=get_agent_provider(agent),
             model=agent.model,
             temperature=agent.temperature,
             max_tokens=agent.max_tokens,
@@ -47,19 +130,17 @@ async def generate_agent_response(
     else:
         # Use sync version with environment variables
         chat = create_chat_model(
-            provider=agent.integration_settings.get("provider", settings.DEFAULT_PROVIDER),
+            provider=get_agent_provider(agent),
             model=agent.model,
             temperature=agent.temperature,
             max_tokens=agent.max_tokens,
         )
 
-    # Format the messages
-    messages = []
-
-    # Prepare enhanced system prompt with context
+    # Prepare the base system prompt
     system_prompt = agent.system_prompt or ""
 
-    # Add context to system prompt if available
+    # Collect context sections, packed into the prompt by priority
+    sections = []
     if context:
         # Add agent personality and bio
         if agent.personality or agent.bio:
@@ -67,48 +148,57 @@ async def generate_agent_response(
 
         # Add knowledge
         if context.get("knowledge"):
-            system_prompt += "\n\nYou have the following knowledge:\n"
-            for item in context["knowledge"]:
-                system_prompt += f"- {item['name']}: {item['content']}\n"
+            sections.append(PromptSection(
+                "\n\nYou have the following knowledge:\n",
+                [f"- {item['name']}: {item['content']}\n" for item in context["knowledge"]],
+                priority=KNOWLEDGE_PRIORITY,
+            ))
 
         # Add preferences
         if context.get("preferences"):
-            system_prompt += "\n\nYou have the following preferences:\n"
-            for key, value in context["preferences"].items():
-                system_prompt += f"- {key}: {value}\n"
+            sections.append(PromptSection(
+                "\n\nYou have the following preferences:\n",
+                [f"- {key}: {value}\n" for key, value in context["preferences"].items()],
+                priority=PREFERENCES_PRIORITY,
+            ))
 
         # Add task template if available
         if context.get("task_template"):
             template = context["task_template"]
-            system_prompt += f"\n\nFor tasks of type '{template['task_type']}', follow these steps:\n"
-            for i, step in enumerate(template["steps"]):
-                system_prompt += f"{i+1}. {step}\n"
+            sections.append(PromptSection(
+                f"\n\nFor tasks of type '{template['task_type']}', follow these steps:\n",
+                [f"{i+1}. {step}\n" for i, step in enumerate(template["steps"])],
+                priority=TEMPLATE_PRIORITY,
+                atomic=True,
+            ))
 
             if template.get("examples"):
-                system_prompt += "\nExamples:\n"
-                for example in template["examples"]:
-                    system_prompt += f"- Input: {example['input']}\n  Output: {example['output']}\n"
-
-    # Add conversation history if available
+                sections.append(PromptSection(
+                    "\nExamples:\n",
+                    [
+                        f"- Input: {example['input']}\n  Output: {example['output']}\n"
+                        for example in template["examples"]
+                    ],
+                    priority=EXAMPLES_PRIORITY,
+                ))
+
+    # Use the conversation history, or memories from context if none is provided
+    history = []
     if conversation_history:
-        for memory in conversation_history:
-            messages.append({
-                "role": memory.role,
-                "content": memory.content,
-            })
+        history = [{"role": memory.role, "content": memory.content} for memory in conversation_history]
     elif context and context.get("memories"):
-        # Use memories from context if no conversation history is provided
-        for memory in context["memories"]:
-            messages.append({
-                "role": memory["role"],
-                "content": memory["content"],
-            })
-
-    # Add the current message
-    messages.append({
-        "role": "user",
-        "content": message,
-    })
+        history = [{"role": memory["role"], "content": memory["content"]} for memory in context["memories"]]
+
+    # Pack everything into the model's prompt budget
+    builder = PromptBuilder(agent.model, get_prompt_budget(agent.model, agent.max_tokens))
+    system_prompt, messages = builder.build(
+        system_prompt=system_prompt,
+        message=message,
+        sections=sections,
+        history=history,
+        summary=summary,
+        history_priority=HISTORY_PRIORITY,
+    )
 
     # Format the messages for the chat model
     formatted_messages = format_messages(
@@ -116,11 +206,7 @@ async def generate_agent_response(
         messages=messages,
     )
 
-    # Generate the response
-    response = chat.predict_messages(formatted_messages)
-
-    # Return the response content
-    return response.content
+    return chat, formatted_messages
 
 
 async def create_memory_from_interaction(
@@ -0,0 +1,192 @@
+"""
+Rolling summaries of conversation history.
+
+Messages that fall out of an agent's memory window are folded into a single
+summary memory per agent. Each update only summarizes the messages added
+since the previous update together with the existing summary, so the cost of
+an update doesn't grow with the length of the conversation.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+
+from app.core.config import settings
+from app.db.models import Agent, Memory
+from app.db.session import async_session
+from app.utils.llm_providers import create_chat_model_async, format_messages, invoke_chat_model
+
+logger = logging.getLogger(__name__)
+
+# Memory type of rolling summaries
+SUMMARY_MEMORY_TYPE = "summary"
+
+SUMMARY_PROMPT = (
+    "You maintain a concise running summary of a conversation between a user "
+    "and an assistant. Update the summary with the new messages. Keep facts, "
+    "decisions, preferences and open questions, drop small talk. Reply with "
+    "the updated summary only."
+)
+
+# Agents with an update in progress in this process
+_updating: Set[str] = set()
+_tasks: Set[asyncio.Task] = set()
+
+
+async def get_rolling_summary(db: AsyncSession, agent_id: str) -> Optional[Memory]:
+    """
+    Get the rolling summary memory of an agent.
+
+    Args:
+        db: Database session
+        agent_id: Agent ID
+
+    Returns:
+        The summary memory, or None if nothing was summarized yet
+    """
+    result = await db.execute(
+        select(Memory)
+        .where(Memory.agent_id == agent_id, Memory.memory_type == SUMMARY_MEMORY_TYPE)
+        .options(defer(Memory.embedding))
+        .order_by(Memory.created_at.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def _get_unsummarized_messages(
+    db: AsyncSession,
+    agent_id: str,
+    window: int,
+    summarized_until: Optional[datetime],
+) -> List[Any]:
+    """Get messages older than the memory window that aren't summarized yet."""
+    # Creation time of the oldest message inside the window
+    result = await db.execute(
+        select(Memory.created_at)
+        .where(Memory.agent_id == agent_id, Memory.memory_type != SUMMARY_MEMORY_TYPE)
+        .order_by(Memory.created_at.desc())
+        .offset(max(window - 1, 0))
+        .limit(1)
+    )
+    cutoff = result.scalar()
+    if cutoff is None:
+        return []
+
+    query = select(Memory.role, Memory.content, Memory.created_at).where(
+        Memory.agent_id == agent_id,
+        Memory.memory_type != SUMMARY_MEMORY_TYPE,
+        Memory.created_at < cutoff,
+    )
+    if summarized_until is not None:
+        query = query.where(Memory.created_at > summarized_until)
+
+    result = await db.execute(
+        query.order_by(Memory.created_at).limit(settings.SUMMARY_MAX_MESSAGES)
+    )
+    return result.all()
+
+
+async def _summarize(db: AsyncSession, agent: Agent, summary: Optional[str], messages: List[Any]) -> str:
+    """Fold messages into a summary with the agent's model."""
+    provider = agent.integration_settings.get("provider", settings.DEFAULT_PROVIDER)
+    chat = await create_chat_model_async(
+        db=db,
+        provider=provider,
+        model=agent.model,
+        temperature=0.0,
+        max_tokens=settings.SUMMARY_MAX_TOKENS,
+    )
+
+    transcript = "\n".join(f"{message.role}: {message.content}" for message in messages)
+    content = f"Current summary:\n{summary or '(empty)'}\n\nNew messages:\n{transcript}"
+
+    return await invoke_chat_model(
+        chat,
+        format_messages(system_prompt=SUMMARY_PROMPT, messages=[{"role": "user", "content": content}]),
+        provider,
+    )
+
+
+async def update_rolling_summary(db: AsyncSession, agent: Agent) -> bool:
+    """
+    Fold messages that left the agent's memory window into its summary.
+
+    Nothing happens until at least SUMMARY_MIN_MESSAGES messages are waiting,
+    so the summary is updated in batches rather than on every turn.
+
+    Args:
+        db: Database session
+        agent: The agent
+
+    Returns:
+        Whether the summary was updated
+    """
+    summary = await get_rolling_summary(db, agent.id)
+    summarized_until = None
+    if summary and summary.meta_data.get("summarized_until"):
+        summarized_until = datetime.fromisoformat(summary.meta_data["summarized_until"])
+
+    messages = await _get_unsummarized_messages(db, agent.id, agent.memory_window or 10, summarized_until)
+    if len(messages) < settings.SUMMARY_MIN_MESSAGES:
+        return False
+
+    content = await _summarize(db, agent, summary.content if summary else None, messages)
+    meta_data = {
+        "summarized_until": messages[-1].created_at.isoformat(),
+        "summarized_count": (summary.meta_data.get("summarized_count", 0) if summary else 0) + len(messages),
+    }
+
+    if summary:
+        summary.content = content
+        summary.meta_data = meta_data
+        # Summaries aren't searched, drop an embedding of an earlier version
+        summary.embedding = None
+    else:
+        db.add(Memory(
+            agent_id=agent.id,
+            role="system",
+            content=content,
+            memory_type=SUMMARY_MEMORY_TYPE,
+            meta_data=meta_data,
+        ))
+
+    await db.commit()
+    logger.info(f"Folded {len(messages)} messages into the summary of agent {agent.id}")
+    return True
+
+
+def schedule_summary_update(agent: Agent) -> None:
+    """
+    Update an agent's rolling summary in the background.
+
+    Skipped if an update of the same agent is already running in this process.
+
+    Args:
+        agent: The agent
+    """
+    if not settings.SUMMARY_ENABLED:
+        return
+
+    key = str(agent.id)
+    if key in _updating:
+        return
+    _updating.add(key)
+
+    async def run() -> None:
+        try:
+            async with async_session() as db:
+                await update_rolling_summary(db, agent)
+        except Exception as e:
+            logger.error(f"Error updating summary of agent {agent.id}: {e}")
+        finally:
+            _updating.discard(key)
+
+    task = asyncio.create_task(run())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
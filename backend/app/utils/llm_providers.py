@@ -2,15 +2,22 @@
 Utility functions for working with different LLM providers.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
 import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud
 from app.core.config import settings
+from app.services.metrics import get_usage, metrics
+from app.services.settings import SettingsService
 
 from langchain_community.chat_models import ChatOpenAI
 from langchain.schema import AIMessage, HumanMessage, SystemMessage
@@ -19,6 +26,12 @@ from langchain_core.messages import BaseMessage
 
 logger = logging.getLogger(__name__)
 
+# Bounded pool for chat models that only support blocking calls
+_sync_llm_executor = ThreadPoolExecutor(
+    max_workers=settings.LLM_SYNC_MAX_WORKERS,
+    thread_name_prefix="llm-sync",
+)
+
 
 class LLMProvider(str, Enum):
     """Supported LLM providers."""
@@ -41,10 +54,10 @@ async def get_provider_settings_from_db(db: AsyncSession, provider: str) -> Dict
         A dictionary of settings for the provider
     """
     try:
-        # Try to get settings from the database
-        setting = await crud.settings.get_by_key(db, provider)
-        if setting and setting.value:
-            return setting.value
+        # Try to get settings from the database (cached)
+        value = await SettingsService(db).get_settings(provider)
+        if value:
+            return value
     except Exception as e:
         logger.error(f"Error getting provider settings from database: {e}")
 
@@ -127,11 +140,7 @@ async def create_chat_model_async(
     # Get default provider from database if not specified
     if not provider:
         try:
-            default_provider_setting = await crud.settings.get_by_key(db, "default_provider")
-            if default_provider_setting and default_provider_setting.value:
-                provider = default_provider_setting.value.get("value", settings.DEFAULT_PROVIDER)
-            else:
-                provider = settings.DEFAULT_PROVIDER
+            provider = await SettingsService(db).get_default_provider() or settings.DEFAULT_PROVIDER
         except Exception as e:
             logger.error(f"Error getting default provider from database: {e}")
             provider = settings.DEFAULT_PROVIDER
@@ -171,6 +180,78 @@ def create_chat_model(
     return create_chat_model_with_settings(provider, model, temperature, max_tokens, provider_settings)
 
 
+class ChatModelCache:
+    """
+    LRU cache of constructed chat models with a time to live.
+
+    Building a chat model also creates its HTTP session, so models are reused
+    across interactions that share the same provider, model, generation
+    parameters and provider settings.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """Initialize the cache."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Get a cached chat model, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        created_at, chat = entry
+        if time.monotonic() - created_at > self.ttl:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return chat
+
+    def set(self, key: Tuple, chat: Any) -> None:
+        """Store a chat model, evicting the least recently used one if full."""
+        self._entries[key] = (time.monotonic(), chat)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, provider: Optional[str] = None) -> int:
+        """
+        Remove cached chat models.
+
+        Args:
+            provider: Only remove models for this provider. If None, remove all.
+
+        Returns:
+            Number of models removed
+        """
+        keys = [key for key in self._entries if provider is None or key[0] == provider]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+
+_chat_model_cache = ChatModelCache(settings.CHAT_MODEL_CACHE_SIZE, settings.CHAT_MODEL_CACHE_TTL)
+
+
+def _settings_hash(provider_settings: Dict[str, Any]) -> str:
+    """Get a stable hash of provider settings."""
+    encoded = json.dumps(provider_settings, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def invalidate_chat_models(provider: Optional[str] = None) -> None:
+    """
+    Drop cached chat models after provider settings change.
+
+    Args:
+        provider: The provider whose settings changed. If None, drop all models.
+    """
+    removed = _chat_model_cache.invalidate(provider)
+    logger.debug(f"Invalidated {removed} cached chat models for provider: {provider or 'all'}")
+
+
 def create_chat_model_with_settings(
     provider: str,
     model: Optional[str],
@@ -179,7 +260,41 @@ def create_chat_model_with_settings(
     provider_settings: Dict[str, Any],
 ) -> ChatOpenAI:
     """
-    Create a chat model with the given settings.
+    Create a chat model with the given settings, reusing a cached one if possible.
+
+    Args:
+        provider: The LLM provider to use.
+        model: The model to use.
+        temperature: The temperature to use for generation.
+        max_tokens: The maximum number of tokens to generate.
+        provider_settings: The provider settings to use.
+
+    Returns:
+        A ChatOpenAI instance configured with the given settings.
+    """
+    key = (provider, model, temperature, max_tokens, _settings_hash(provider_settings))
+    chat = _chat_model_cache.get(key)
+    if chat is not None:
+        return chat
+
+    chat = _build_chat_model(provider, model, temperature, max_tokens, provider_settings)
+
+    # Don't cache the fallback so a fixed configuration is picked up right away
+    if not isinstance(chat, MockChatModel):
+        _chat_model_cache.set(key, chat)
+
+    return chat
+
+
+def _build_chat_model(
+    provider: str,
+    model: Optional[str],
+    temperature: float,
+    max_tokens: Optional[int],
+    provider_settings: Dict[str, Any],
+) -> ChatOpenAI:
+    """
+    Build a new chat model with the given settings.
 
     Args:
         provider: The LLM provider to use.
@@ -228,9 +343,9 @@ def create_chat_model_with_settings(
         )
     elif provider == LLMProvider.CUSTOM:
         # Custom API host (like Chutes.ai)
-        logger.info(f"Creating custom chat model for provider: {custom_provider_name}")
-        logger.info(f"API base: {provider_settings.get('api_base')}")
-        logger.info(f"Model: {model}")
+        logger.debug(f"Creating custom chat model for provider: {custom_provider_name}")
+        logger.debug(f"API base: {provider_settings.get('api_base')}")
+        logger.debug(f"Model: {model}")
 
         # Add custom headers based on the provider name
         headers = {}
@@ -239,10 +354,10 @@ def create_chat_model_with_settings(
         if "anthropic" in custom_provider_name.lower() or "claude" in model.lower():
             # Anthropic/Claude specific settings
             headers = {"anthropic-version": "2023-06-01"}
-            logger.info("Using Anthropic/Claude specific settings")
+            logger.debug("Using Anthropic/Claude specific settings")
         elif "chutes" in custom_provider_name.lower() or "reka" in model.lower():
             # Chutes.ai/Reka specific settings
-            logger.info("Using Chutes.ai/Reka specific settings")
+            logger.debug("Using Chutes.ai/Reka specific settings")
 
         return ChatOpenAI(
             model=model,
@@ -256,6 +371,74 @@ def create_chat_model_with_settings(
         raise ValueError(f"Unsupported LLM provider: {provider}")
 
 
+def _model_name(chat: Any) -> str:
+    """Get the model name of a chat model, for metrics."""
+    return getattr(chat, "model_name", None) or getattr(chat, "model", None) or type(chat).__name__
+
+
+async def invoke_chat_model(chat: Any, messages: List[BaseMessage], provider: str = "unknown") -> str:
+    """
+    Generate a response from a chat model without blocking the event loop.
+
+    Models with an async API (LangChain chat models and LLMs) are awaited
+    directly. Models that only have the blocking predict_messages call are run
+    on a bounded thread pool so they cannot stall other requests.
+
+    Args:
+        chat: The chat model to use.
+        messages: The formatted messages to send.
+        provider: The provider of the chat model, for metrics.
+
+    Returns:
+        The content of the generated response.
+    """
+    start = time.perf_counter()
+    if hasattr(chat, "ainvoke"):
+        response = await chat.ainvoke(messages)
+    else:
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(_sync_llm_executor, chat.predict_messages, messages)
+    metrics.observe_llm_call(
+        provider, _model_name(chat), "invoke", time.perf_counter() - start, get_usage(response)
+    )
+
+    # Chat models return a message, plain LLMs (such as Ollama) return a string
+    return getattr(response, "content", response)
+
+
+async def stream_chat_model(
+    chat: Any, messages: List[BaseMessage], provider: str = "unknown"
+) -> AsyncIterator[str]:
+    """
+    Stream a response from a chat model as it is generated.
+
+    Models with an async streaming API forward each chunk from the provider.
+    Other models are invoked normally and yield their whole response as a
+    single chunk.
+
+    Args:
+        chat: The chat model to use.
+        messages: The formatted messages to send.
+        provider: The provider of the chat model, for metrics.
+
+    Yields:
+        Chunks of the generated response.
+    """
+    if not hasattr(chat, "astream"):
+        yield await invoke_chat_model(chat, messages, provider)
+        return
+
+    start = time.perf_counter()
+    usage = None
+    async for chunk in chat.astream(messages):
+        usage = get_usage(chunk) or usage
+        # Chat models stream message chunks, plain LLMs stream strings
+        content = getattr(chunk, "content", chunk)
+        if content:
+            yield content
+    metrics.observe_llm_call(provider, _model_name(chat), "stream", time.perf_counter() - start, usage)
+
+
 class MockChatModel:
     """A mock chat model that returns a fixed response."""
     def predict_messages(self, messages: List[Any]) -> str:
@@ -3,13 +3,16 @@ Memory cleanup utilities.
 """
 
 import logging
-from datetime import datetime, timedelta
-from typing import List, Optional
+import re
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import delete, select
+from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.memory import Memory
+from app.db.partitions import is_memory_partitioned
+from app.utils.memory_retention import apply_retention
 
 logger = logging.getLogger(__name__)
 
@@ -30,25 +33,9 @@ async def cleanup_temporary_memories(
     Returns:
         Number of memories deleted
     """
-    # Calculate cutoff date
-    cutoff_date = datetime.utcnow() - timedelta(days=older_than_days)
-    
-    # Build query
-    query = delete(Memory).where(
-        Memory.memory_type == "temporary",
-        Memory.created_at < cutoff_date,
-    )
-    
-    # Filter by agent ID if specified
-    if agent_id:
-        query = query.where(Memory.agent_id == agent_id)
-    
-    # Execute query
-    result = await db.execute(query)
-    await db.commit()
-    
-    # Get number of rows deleted
-    deleted_count = result.rowcount
+    # Drop expired partitions and delete the remaining rows in chunks
+    result = await apply_retention(db, "temporary", timedelta(days=older_than_days), agent_id)
+    deleted_count = result["deleted"]
     
     logger.info(f"Deleted {deleted_count} temporary memories")
     
@@ -71,77 +58,262 @@ async def cleanup_execution_memories(
     Returns:
         Number of memories deleted
     """
-    # Calculate cutoff date
-    cutoff_date = datetime.utcnow() - timedelta(hours=older_than_hours)
-    
-    # Build query
-    query = delete(Memory).where(
-        Memory.memory_type == "execution",
-        Memory.created_at < cutoff_date,
-    )
-    
-    # Filter by agent ID if specified
-    if agent_id:
-        query = query.where(Memory.agent_id == agent_id)
-    
-    # Execute query
-    result = await db.execute(query)
-    await db.commit()
-    
-    # Get number of rows deleted
-    deleted_count = result.rowcount
+    # Drop expired partitions and delete the remaining rows in chunks
+    result = await apply_retention(db, "execution", timedelta(hours=older_than_hours), agent_id)
+    deleted_count = result["deleted"]
     
     logger.info(f"Deleted {deleted_count} execution memories")
     
     return deleted_count
 
 
+# Memory types reported by get_memory_stats even when they have no rows
+MEMORY_TYPES = ["permanent", "temporary", "execution"]
+
+# Memory type of a top-level partition, from its bound
+_PARTITION_TYPE_PATTERN = re.compile(r"FOR VALUES IN \('([^']+)'\)")
+
+
+def _memory_size():
+    """SQL expression for the stored size of a memory row's data in bytes."""
+    return (
+        func.coalesce(func.pg_column_size(Memory.content), 0)
+        + func.coalesce(func.pg_column_size(Memory.embedding), 0)
+        + func.coalesce(func.pg_column_size(Memory.meta_data), 0)
+    )
+
+
+def _empty_type_stats() -> Dict[str, Any]:
+    """Get statistics of a memory type without rows."""
+    return {"count": 0, "bytes": 0, "oldest": None, "newest": None}
+
+
+def _summarize_types(by_type: Dict[str, Dict[str, Any]], agent_id: Optional[str]) -> Dict[str, Any]:
+    """Build the statistics response from per-type statistics."""
+    for memory_type in MEMORY_TYPES:
+        by_type.setdefault(memory_type, _empty_type_stats())
+
+    oldest = [stats["oldest"] for stats in by_type.values() if stats["oldest"] is not None]
+    newest = [stats["newest"] for stats in by_type.values() if stats["newest"] is not None]
+
+    stats = {
+        "total": sum(stats["count"] for stats in by_type.values()),
+        "bytes": sum(stats["bytes"] for stats in by_type.values()),
+        "oldest": min(oldest) if oldest else None,
+        "newest": max(newest) if newest else None,
+        "agent_id": agent_id,
+        "by_type": by_type,
+    }
+    for memory_type in MEMORY_TYPES:
+        stats[memory_type] = by_type[memory_type]["count"]
+    return stats
+
+
 async def get_memory_stats(
     db: AsyncSession,
     agent_id: Optional[str] = None,
+    by_agent: bool = False,
+    estimate: bool = False,
 ) -> dict:
     """
     Get memory statistics.
-    
+
+    Counts, sizes and age ranges are aggregated in the database, so no memory
+    rows are loaded.
+
     Args:
         db: Database session
         agent_id: Agent ID (if None, get stats for all agents)
-        
+        by_agent: Include a breakdown per agent
+        estimate: Use planner statistics instead of scanning the table. Only
+            used for all agents without a breakdown, and only once the table
+            has been analyzed.
+
     Returns:
         Dictionary with memory statistics
     """
-    # Build query for permanent memories
-    permanent_query = select(Memory).where(Memory.memory_type == "permanent")
-    if agent_id:
-        permanent_query = permanent_query.where(Memory.agent_id == agent_id)
-    
-    # Build query for temporary memories
-    temporary_query = select(Memory).where(Memory.memory_type == "temporary")
-    if agent_id:
-        temporary_query = temporary_query.where(Memory.agent_id == agent_id)
-    
-    # Build query for execution memories
-    execution_query = select(Memory).where(Memory.memory_type == "execution")
+    if estimate and not agent_id and not by_agent:
+        stats = await _estimate_memory_stats(db)
+        if stats is not None:
+            return stats
+
+    # Aggregate per memory type
+    query = select(
+        Memory.memory_type,
+        func.count(),
+        func.coalesce(func.sum(_memory_size()), 0),
+        func.min(Memory.created_at),
+        func.max(Memory.created_at),
+    ).group_by(Memory.memory_type)
     if agent_id:
-        execution_query = execution_query.where(Memory.agent_id == agent_id)
-    
-    # Execute queries
-    permanent_result = await db.execute(permanent_query)
-    temporary_result = await db.execute(temporary_query)
-    execution_result = await db.execute(execution_query)
-    
-    # Count results
-    permanent_count = len(permanent_result.scalars().all())
-    temporary_count = len(temporary_result.scalars().all())
-    execution_count = len(execution_result.scalars().all())
-    
-    # Calculate total
-    total_count = permanent_count + temporary_count + execution_count
-    
-    return {
-        "total": total_count,
-        "permanent": permanent_count,
-        "temporary": temporary_count,
-        "execution": execution_count,
-        "agent_id": agent_id,
+        query = query.where(Memory.agent_id == agent_id)
+
+    result = await db.execute(query)
+    by_type = {
+        memory_type: {"count": count, "bytes": int(size), "oldest": oldest, "newest": newest}
+        for memory_type, count, size, oldest, newest in result.all()
     }
+    stats = _summarize_types(by_type, agent_id)
+    stats["estimated"] = False
+
+    if by_agent:
+        stats["agents"] = await _get_agent_breakdown(db, agent_id)
+
+    return stats
+
+
+async def _get_agent_breakdown(db: AsyncSession, agent_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Aggregate memory statistics per agent and memory type."""
+    query = select(
+        Memory.agent_id,
+        Memory.memory_type,
+        func.count(),
+        func.coalesce(func.sum(_memory_size()), 0),
+    ).group_by(Memory.agent_id, Memory.memory_type)
+    if agent_id:
+        query = query.where(Memory.agent_id == agent_id)
+
+    result = await db.execute(query)
+
+    agents: Dict[str, Dict[str, Any]] = {}
+    for row_agent_id, memory_type, count, size in result.all():
+        key = str(row_agent_id)
+        agent_stats = agents.setdefault(key, {"agent_id": key, "total": 0, "bytes": 0, "by_type": {}})
+        agent_stats["total"] += count
+        agent_stats["bytes"] += int(size)
+        agent_stats["by_type"][memory_type] = count
+
+    return sorted(agents.values(), key=lambda stats: stats["total"], reverse=True)
+
+
+async def _estimate_memory_stats(db: AsyncSession) -> Optional[Dict[str, Any]]:
+    """
+    Estimate memory statistics from the planner statistics of the memory table.
+
+    Returns None if the table hasn't been analyzed yet.
+    """
+    if await is_memory_partitioned(db):
+        return await _estimate_partitioned_memory_stats(db)
+
+    result = await db.execute(text(
+        """
+        SELECT reltuples::bigint, pg_total_relation_size(oid)
+        FROM pg_class
+        WHERE oid = to_regclass('memory')
+        """
+    ))
+    row = result.first()
+    if row is None or row[0] < 0:
+        return None
+    total, size = row
+
+    # Share of each memory type among the sampled rows
+    result = await db.execute(text(
+        """
+        SELECT most_common_vals::text::text[], most_common_freqs
+        FROM pg_stats
+        WHERE schemaname = current_schema() AND tablename = 'memory'
+            AND attname = 'memory_type' AND NOT inherited
+        """
+    ))
+    row = result.first()
+    frequencies = dict(zip(row[0], row[1])) if row and row[0] else {}
+
+    # Age range from the created_at histogram
+    result = await db.execute(text(
+        """
+        SELECT histogram_bounds::text::timestamp[]
+        FROM pg_stats
+        WHERE schemaname = current_schema() AND tablename = 'memory'
+            AND attname = 'created_at' AND NOT inherited
+        """
+    ))
+    row = result.first()
+    bounds = row[0] if row and row[0] else []
+
+    by_type = {}
+    for memory_type, frequency in frequencies.items():
+        by_type[memory_type] = {
+            "count": round(total * frequency),
+            "bytes": round(size * frequency),
+            "oldest": None,
+            "newest": None,
+        }
+
+    stats = _summarize_types(by_type, None)
+    stats.update({
+        "total": total,
+        "bytes": size,
+        "oldest": bounds[0] if bounds else None,
+        "newest": bounds[-1] if bounds else None,
+        "estimated": True,
+    })
+    return stats
+
+
+async def _estimate_partitioned_memory_stats(db: AsyncSession) -> Optional[Dict[str, Any]]:
+    """
+    Estimate memory statistics from the planner statistics of the memory partitions.
+
+    Autovacuum never analyzes a partitioned table itself, only its leaf
+    partitions. Each top-level partition holds one memory type, named by its
+    partition bound, so the counts and sizes of the leaves under it are that
+    type's. Rows in the default partition only count towards the totals.
+
+    Returns None if no partition has been analyzed yet.
+    """
+    result = await db.execute(text(
+        """
+        SELECT
+            pg_get_expr(branch_class.relpartbound, branch_class.oid),
+            leaf_class.relname,
+            leaf_class.reltuples,
+            pg_total_relation_size(leaf_class.oid)
+        FROM pg_partition_tree('memory') AS branch
+        JOIN pg_class AS branch_class ON branch_class.oid = branch.relid
+        CROSS JOIN LATERAL pg_partition_tree(branch.relid) AS leaf
+        JOIN pg_class AS leaf_class ON leaf_class.oid = leaf.relid
+        WHERE branch.level = 1 AND leaf.isleaf
+        """
+    ))
+    partitions = result.all()
+    if not any(reltuples >= 0 for _, _, reltuples, _ in partitions):
+        return None
+
+    # Age range of each leaf from its created_at histogram
+    result = await db.execute(
+        text(
+            """
+            SELECT tablename, histogram_bounds::text::timestamp[]
+            FROM pg_stats
+            WHERE schemaname = current_schema() AND tablename = ANY(:partitions)
+                AND attname = 'created_at' AND NOT inherited
+            """
+        ),
+        {"partitions": [name for _, name, _, _ in partitions]},
+    )
+    bounds = {name: histogram for name, histogram in result.all() if histogram}
+
+    by_type: Dict[str, Dict[str, Any]] = {}
+    total = size = 0
+    for partition_bound, name, reltuples, partition_size in partitions:
+        count = max(int(reltuples), 0)
+        total += count
+        size += partition_size
+
+        match = _PARTITION_TYPE_PATTERN.search(partition_bound)
+        if match is None:
+            continue
+        type_stats = by_type.setdefault(match.group(1), _empty_type_stats())
+        type_stats["count"] += count
+        type_stats["bytes"] += partition_size
+        if count and name in bounds:
+            oldest, newest = bounds[name][0], bounds[name][-1]
+            if type_stats["oldest"] is None or oldest < type_stats["oldest"]:
+                type_stats["oldest"] = oldest
+            if type_stats["newest"] is None or newest > type_stats["newest"]:
+                type_stats["newest"] = newest
+
+    stats = _summarize_types(by_type, None)
+    stats.update({"total": total, "bytes": size, "estimated": True})
+    return stats
@@ -0,0 +1,297 @@
+"""
+Memory retention.
+
+Expired temporary and execution memories are deleted in small keyset-paginated
+chunks with a pause between chunks, so retention never holds long locks or
+competes with live interactions for long. When a memory type is stored in
+time-range partitions (see app/db/partitions.py), whole expired partitions
+are dropped or detached instead.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.memory import Memory
+from app.db.partitions import ensure_memory_partitions, partition_parent
+from app.db.session import async_session
+from app.services.step_cache import purge_expired_step_results
+from app.utils.vector_scoring import embedding_cache
+
+logger = logging.getLogger(__name__)
+
+_UPPER_BOUND_PATTERN = re.compile(r"TO \('([^']+)'\)")
+
+
+async def get_time_partitions(db: AsyncSession, memory_type: str) -> List[Tuple[str, Optional[datetime]]]:
+    """
+    List the time partitions of a memory type.
+
+    Args:
+        db: Database session
+        memory_type: Memory type
+
+    Returns:
+        (partition name, exclusive upper bound) tuples, empty if the memory
+        type isn't partitioned by time. The bound is None for a default
+        partition.
+    """
+    result = await db.execute(
+        text(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:parent)
+            ORDER BY c.relname
+            """
+        ),
+        {"parent": partition_parent(memory_type)},
+    )
+
+    partitions = []
+    for name, bound in result.all():
+        match = _UPPER_BOUND_PATTERN.search(bound or "")
+        partitions.append((name, datetime.fromisoformat(match.group(1)) if match else None))
+    return partitions
+
+
+async def remove_expired_partitions(db: AsyncSession, memory_type: str, cutoff: datetime) -> int:
+    """
+    Remove time partitions of a memory type that only hold memories older than a cutoff.
+
+    Partitions are dropped, or only detached from the memory table when
+    RETENTION_PARTITION_ACTION is "detach" so they can be archived.
+
+    Args:
+        db: Database session
+        memory_type: Memory type
+        cutoff: Memories created before this time are expired
+
+    Returns:
+        Number of partitions removed
+    """
+    parent = partition_parent(memory_type)
+    detach = settings.RETENTION_PARTITION_ACTION == "detach"
+
+    removed = 0
+    for name, upper_bound in await get_time_partitions(db, memory_type):
+        if upper_bound is None or upper_bound > cutoff:
+            continue
+
+        if detach:
+            await db.execute(text(f'ALTER TABLE "{parent}" DETACH PARTITION "{name}"'))
+        else:
+            await db.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+        await db.commit()
+        removed += 1
+        logger.info(f"{'Detached' if detach else 'Dropped'} expired memory partition {name}")
+
+    if removed:
+        embedding_cache.invalidate()
+    return removed
+
+
+async def delete_expired_memories(
+    db: AsyncSession,
+    memory_type: str,
+    cutoff: datetime,
+    agent_id: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    batch_sleep: Optional[float] = None,
+) -> int:
+    """
+    Delete memories of a type created before a cutoff, in chunks.
+
+    Each chunk is deleted and committed in its own short transaction, walking
+    the rows in (created_at, id) order. Rows locked by other transactions are
+    skipped rather than waited for.
+
+    Args:
+        db: Database session
+        memory_type: Memory type
+        cutoff: Delete memories created before this time
+        agent_id: Agent ID (if None, delete for all agents)
+        batch_size: Rows per chunk, defaults to RETENTION_BATCH_SIZE
+        batch_sleep: Seconds to pause between chunks, defaults to RETENTION_BATCH_SLEEP
+
+    Returns:
+        Number of memories deleted
+    """
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    batch_sleep = settings.RETENTION_BATCH_SLEEP if batch_sleep is None else batch_sleep
+
+    deleted = 0
+    last_key = None
+    while True:
+        chunk = select(Memory.id).where(
+            Memory.memory_type == memory_type,
+            Memory.created_at < cutoff,
+        )
+        if agent_id:
+            chunk = chunk.where(Memory.agent_id == agent_id)
+        if last_key is not None:
+            chunk = chunk.where(tuple_(Memory.created_at, Memory.id) > last_key)
+        chunk = (
+            chunk.order_by(Memory.created_at, Memory.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+
+        result = await db.execute(
+            delete(Memory)
+            .where(Memory.id.in_(chunk.scalar_subquery()))
+            .returning(Memory.created_at, Memory.id, Memory.agent_id)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        await db.commit()
+
+        if not rows:
+            break
+
+        deleted += len(rows)
+        last_key = max((created_at, memory_id) for created_at, memory_id, _ in rows)
+        for agent in {row_agent_id for _, _, row_agent_id in rows}:
+            embedding_cache.invalidate(agent)
+
+        if len(rows) < batch_size:
+            break
+        await asyncio.sleep(batch_sleep)
+
+    return deleted
+
+
+async def apply_retention(
+    db: AsyncSession,
+    memory_type: str,
+    max_age: timedelta,
+    agent_id: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    Remove memories of a type that are older than their retention period.
+
+    Expired partitions are removed first when removing for all agents, the
+    remaining expired rows are deleted in chunks.
+
+    Args:
+        db: Database session
+        memory_type: Memory type
+        max_age: Retention period
+        agent_id: Agent ID (if None, remove for all agents)
+
+    Returns:
+        Dictionary with the number of rows deleted and partitions removed
+    """
+    cutoff = datetime.utcnow() - max_age
+
+    partitions_removed = 0
+    if agent_id is None:
+        partitions_removed = await remove_expired_partitions(db, memory_type, cutoff)
+
+    deleted = await delete_expired_memories(db, memory_type, cutoff, agent_id)
+
+    return {"deleted": deleted, "partitions_removed": partitions_removed}
+
+
+class RetentionWorker:
+    """
+    Background task that applies the retention policies periodically.
+
+    Policies map memory types to their retention period in seconds
+    (RETENTION_POLICIES).
+    """
+
+    def __init__(self, interval: float, policies: Dict[str, int]):
+        """Initialize the worker."""
+        self.interval = interval
+        self.policies = policies
+        self._task: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, Any] = {
+            "runs": 0,
+            "errors": 0,
+            "last_run_at": None,
+            "last_duration_ms": None,
+            "last_error": None,
+            "deleted": {memory_type: 0 for memory_type in policies},
+            "partitions_removed": {memory_type: 0 for memory_type in policies},
+            "step_results_removed": 0,
+        }
+
+    def start(self) -> None:
+        """Start the worker."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Started memory retention worker for {', '.join(self.policies)} memories")
+
+    async def run_once(self) -> Dict[str, Dict[str, int]]:
+        """
+        Apply every retention policy once.
+
+        Returns:
+            Results of each policy by memory type
+        """
+        start = time.perf_counter()
+        results = {}
+        try:
+            # Create upcoming partitions before rows need them
+            async with async_session() as db:
+                await ensure_memory_partitions(db)
+
+            for memory_type, max_age in self.policies.items():
+                async with async_session() as db:
+                    result = await apply_retention(db, memory_type, timedelta(seconds=max_age))
+                results[memory_type] = result
+                self.metrics["deleted"][memory_type] += result["deleted"]
+                self.metrics["partitions_removed"][memory_type] += result["partitions_removed"]
+                if result["deleted"] or result["partitions_removed"]:
+                    logger.info(
+                        f"Retention removed {result['deleted']} {memory_type} memories "
+                        f"and {result['partitions_removed']} partitions"
+                    )
+
+            # Expired workflow step results are never read again
+            async with async_session() as db:
+                purged = await purge_expired_step_results(db)
+            self.metrics["step_results_removed"] += purged
+        except Exception as e:
+            self.metrics["errors"] += 1
+            self.metrics["last_error"] = str(e)
+            raise
+        finally:
+            self.metrics["runs"] += 1
+            self.metrics["last_run_at"] = datetime.utcnow().isoformat()
+            self.metrics["last_duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+        return results
+
+    async def _run(self) -> None:
+        """Apply the retention policies until stopped."""
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error applying memory retention: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self) -> None:
+        """Stop the worker."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+retention_worker = RetentionWorker(settings.RETENTION_INTERVAL, settings.RETENTION_POLICIES)
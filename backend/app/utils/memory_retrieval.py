@@ -2,38 +2,54 @@
 Memory retrieval utilities.
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Tuple, Union
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
-import numpy as np
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from app.core.config import settings
 from app.db.models.agent import Agent
 from app.db.models.knowledge_base import KnowledgeBase, Preference, TaskTemplate
 from app.db.models.memory import Memory
+from app.db.session import async_session
+from app.db.vector import distance, supports_iterative_scan
+from app.services.metrics import metrics
+from app.utils.conversation_summary import SUMMARY_MEMORY_TYPE
+from app.utils.vector_scoring import build_matrix, cosine_scores, embedding_cache
 
 logger = logging.getLogger(__name__)
 
 
-def cosine_similarity(a: List[float], b: List[float]) -> float:
-    """
-    Calculate cosine similarity between two vectors.
+async def get_conversation_history(
+    db: AsyncSession,
+    agent_id: str,
+    limit: int,
+) -> List[Any]:
     """
-    if not a or not b:
-        return 0.0
+    Get the latest messages of an agent's conversation.
 
-    a_array = np.array(a)
-    b_array = np.array(b)
+    Only the columns needed to build a prompt are loaded, using the
+    (agent_id, created_at DESC) index.
 
-    dot_product = np.dot(a_array, b_array)
-    norm_a = np.linalg.norm(a_array)
-    norm_b = np.linalg.norm(b_array)
-
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
+    Args:
+        db: Database session
+        agent_id: Agent ID
+        limit: Maximum number of messages to load
 
-    return dot_product / (norm_a * norm_b)
+    Returns:
+        Rows with role, content and created_at, oldest first
+    """
+    result = await db.execute(
+        select(Memory.role, Memory.content, Memory.created_at)
+        .where(Memory.agent_id == agent_id, Memory.memory_type != SUMMARY_MEMORY_TYPE)
+        .order_by(Memory.created_at.desc())
+        .limit(limit)
+    )
+    return list(reversed(result.all()))
 
 
 async def retrieve_relevant_memories(
@@ -58,37 +74,66 @@ async def retrieve_relevant_memories(
     Returns:
         List of relevant memories
     """
-    # Get all memories for the agent
-    query = select(Memory).where(Memory.agent_id == agent_id)
+    # Build the query for the agent's memories, the rolling summary is
+    # included in prompts on its own
+    query = select(Memory).where(Memory.agent_id == agent_id, Memory.memory_type != SUMMARY_MEMORY_TYPE)
 
     # Filter by memory types if specified
     if memory_types:
-        # Assuming memory_type is stored in meta_data
-        # This is a simplification - in a real system, you'd need a more sophisticated query
-        pass
-
-    # Execute query
-    result = await db.execute(query)
-    memories = result.scalars().all()
+        query = query.where(Memory.memory_type.in_(memory_types))
 
     # If no embedding is provided, return the most recent memories
     if not embedding:
-        # Sort by created_at in descending order
-        memories.sort(key=lambda x: x.created_at, reverse=True)
-        return memories[:limit]
-
-    # Calculate similarity and sort
-    memories_with_scores = []
-    for memory in memories:
-        if memory.embedding:
-            similarity = cosine_similarity(embedding, memory.embedding)
-            memories_with_scores.append((memory, similarity))
-
-    # Sort by similarity score
-    memories_with_scores.sort(key=lambda x: x[1], reverse=True)
-
-    # Return top N memories
-    return [memory for memory, _ in memories_with_scores[:limit]]
+        query = query.options(defer(Memory.embedding))
+        query = query.order_by(Memory.created_at.desc()).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    # With pgvector, let the database find the nearest memories using the vector index
+    if settings.PGVECTOR_ENABLED:
+        ef_search = max(settings.VECTOR_HNSW_EF_SEARCH, limit)
+        await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+
+        # The index covers every agent, and the agent and type filters apply
+        # to the candidates it returns. Iterative scans keep reading the index
+        # until enough candidates pass the filters
+        iterative = await supports_iterative_scan(db)
+        if iterative:
+            await db.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+
+        query = query.options(defer(Memory.embedding))
+        query = query.where(Memory.embedding.isnot(None))
+        memory_distance = distance(Memory.embedding, embedding)
+        result = await db.execute(
+            query.add_columns(memory_distance.label("distance")).order_by(memory_distance).limit(limit)
+        )
+        rows = result.all()
+
+        # Without iterative scans (or past their scan limit), an agent with
+        # few of the table's rows can get fewer results than it has memories.
+        # Its rows are then scored exactly, ordering by an expression the
+        # index can't serve; a short page usually means the agent has few rows
+        if len(rows) < limit:
+            result = await db.execute(
+                query.add_columns(memory_distance.label("distance")).order_by(memory_distance + 0).limit(limit)
+            )
+            rows = result.all()
+
+        # Relaxed order scans can return rows slightly out of order
+        return [memory for memory, _ in sorted(rows, key=lambda row: row[1])]
+
+    # Without pgvector, score the agent's cached embedding matrix in one pass
+    agent_embeddings = await embedding_cache.get(db, agent_id)
+    memory_ids = agent_embeddings.search(embedding, limit, memory_types)
+    if not memory_ids:
+        return []
+
+    # Load the top N memories and keep them in score order
+    result = await db.execute(
+        select(Memory).where(Memory.id.in_(memory_ids)).options(defer(Memory.embedding))
+    )
+    memories_by_id = {memory.id: memory for memory in result.scalars().all()}
+    return [memories_by_id[memory_id] for memory_id in memory_ids if memory_id in memories_by_id]
 
 
 async def retrieve_relevant_knowledge(
@@ -130,13 +175,19 @@ async def retrieve_relevant_knowledge(
         knowledge_items.sort(key=lambda x: x.priority, reverse=True)
         return knowledge_items[:limit]
 
-    # Calculate similarity and sort
+    # Calculate similarity for all embedded items at once
+    embedded = [
+        knowledge for knowledge in knowledge_items
+        if knowledge.embedding is not None and len(knowledge.embedding) == len(embedding)
+    ]
+    similarities = cosine_scores(embedding, build_matrix([knowledge.embedding for knowledge in embedded]))
+    similarity_by_id = {knowledge.id: float(score) for knowledge, score in zip(embedded, similarities)}
+
     knowledge_with_scores = []
     for knowledge in knowledge_items:
-        if knowledge.embedding:
-            similarity = cosine_similarity(embedding, knowledge.embedding)
+        if knowledge.id in similarity_by_id:
             # Adjust score by priority
-            adjusted_score = similarity * (1 + 0.1 * knowledge.priority)
+            adjusted_score = similarity_by_id[knowledge.id] * (1 + 0.1 * knowledge.priority)
             knowledge_with_scores.append((knowledge, adjusted_score))
         else:
             # If no embedding, use priority as a fallback
@@ -222,6 +273,39 @@ async def get_agent_preferences(
     return preferences_dict
 
 
+def _elapsed_ms(start: float) -> float:
+    """Get the milliseconds since a perf_counter value."""
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+async def _get_agent(db: AsyncSession, agent_id: str) -> Optional[Agent]:
+    """Get an agent by ID."""
+    result = await db.execute(select(Agent).where(Agent.id == agent_id))
+    return result.scalars().first()
+
+
+async def _load_section(
+    db: Optional[AsyncSession],
+    name: str,
+    loader: Callable[..., Awaitable[Any]],
+    args: Tuple[Any, ...],
+    timings: Dict[str, float],
+) -> Any:
+    """
+    Load a section of the agent context and record how long it took.
+
+    Without a session, a short-lived one is opened for the section.
+    """
+    start = time.perf_counter()
+    try:
+        if db is not None:
+            return await loader(db, *args)
+        async with async_session() as section_db:
+            return await loader(section_db, *args)
+    finally:
+        timings[name] = _elapsed_ms(start)
+
+
 async def build_agent_context(
     db: AsyncSession,
     agent_id: str,
@@ -240,34 +324,37 @@ async def build_agent_context(
         embedding: Embedding of the current context
 
     Returns:
-        Dictionary containing all relevant context for the agent
+        Dictionary containing all relevant context for the agent, with the
+        time taken to load each section in milliseconds under "timings"
     """
-    # Get agent
-    agent = await db.execute(select(Agent).where(Agent.id == agent_id))
-    agent = agent.scalars().first()
+    timings: Dict[str, float] = {}
+    sections = [
+        ("agent", _get_agent, (agent_id,)),
+        ("memories", retrieve_relevant_memories, (agent_id, current_context, embedding, 10)),
+        ("knowledge", retrieve_relevant_knowledge, (agent_id, current_context, embedding, 5)),
+        ("task_template", retrieve_relevant_task_template, (agent_id, current_context, task_type)),
+        ("preferences", get_agent_preferences, (agent_id,)),
+    ]
+
+    start = time.perf_counter()
+    if settings.CONTEXT_CONCURRENT_LOADING:
+        # Each section runs on its own pooled connection so the queries
+        # overlap, on top of the request's own connection
+        results = await asyncio.gather(*[
+            _load_section(None, name, loader, args, timings) for name, loader, args in sections
+        ])
+    else:
+        results = [await _load_section(db, name, loader, args, timings) for name, loader, args in sections]
+    timings["total"] = _elapsed_ms(start)
+    metrics.observe_context(timings)
+
+    agent, memories, knowledge, task_template, preferences = results
+    logger.debug(f"Built context of agent {agent_id} in {timings}")
 
     if not agent:
         logger.error(f"Agent with ID {agent_id} not found")
         return {}
 
-    # Get relevant memories
-    memories = await retrieve_relevant_memories(
-        db, agent_id, current_context, embedding, limit=10
-    )
-
-    # Get relevant knowledge
-    knowledge = await retrieve_relevant_knowledge(
-        db, agent_id, current_context, embedding, limit=5
-    )
-
-    # Get relevant task template
-    task_template = await retrieve_relevant_task_template(
-        db, agent_id, current_context, task_type
-    )
-
-    # Get agent preferences
-    preferences = await get_agent_preferences(db, agent_id)
-
     # Build context
     context = {
         "agent": {
@@ -296,6 +383,7 @@ async def build_agent_context(
         ],
         "task_template": None,
         "preferences": preferences,
+        "timings": timings,
     }
 
     if task_template:
@@ -0,0 +1,121 @@
+"""
+Keyset pagination and field projection for list endpoints.
+
+List endpoints return their items ordered by (created_at, id). When a page
+is full, the cursor of its last item is returned in the X-Next-Cursor header;
+passing it back as ?cursor= returns the next page, which costs the same
+however deep it is. ?fields=id,name limits the items to the given fields,
+which are the only columns loaded. Without fields=, the columns in
+LIST_EXCLUDED_FIELDS (embeddings) are left out of the items.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import inspect
+
+from app.core.config import settings
+from app.crud.base import Cursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Encode a keyset cursor as an opaque string."""
+    created_at, id = cursor
+    payload = json.dumps([created_at.isoformat(), str(id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """
+    Decode a cursor returned by a list endpoint.
+
+    Args:
+        cursor: Encoded cursor, or None for the first page
+
+    Returns:
+        The keyset cursor, or None
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    if not cursor:
+        return None
+
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (datetime.fromisoformat(created_at), uuid.UUID(id))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def _split_fields(fields: str) -> List[str]:
+    """Split a fields= value into field names."""
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def parse_fields(model: Any, fields: Optional[str]) -> List[str]:
+    """
+    Get the columns to load for a list.
+
+    Args:
+        model: Database model of the items
+        fields: Comma-separated fields requested with fields=, or None
+
+    Returns:
+        The requested columns, or every column except LIST_EXCLUDED_FIELDS
+
+    Raises:
+        HTTPException: If a requested field isn't a column of the model
+    """
+    columns = [attr.key for attr in inspect(model).column_attrs]
+    if not fields:
+        return [column for column in columns if column not in settings.LIST_EXCLUDED_FIELDS]
+
+    requested = _split_fields(fields)
+    unknown = [field for field in requested if field not in columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+def page_response(
+    response: Response,
+    items: Sequence[Dict[str, Any]],
+    limit: int,
+    fields: Optional[str] = None,
+) -> Any:
+    """
+    Build the response of a list endpoint.
+
+    Args:
+        response: Response of the endpoint, for the next cursor header
+        items: Column values of the items, as loaded with parse_fields
+        limit: Page size the items were loaded with
+        fields: Fields requested with fields=, or None
+
+    Returns:
+        The items, or a JSON response holding only the requested fields,
+        which isn't validated against the endpoint's response model
+    """
+    headers = {}
+    if items and len(items) >= limit:
+        last = items[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor((last["created_at"], last["id"]))
+
+    if not fields:
+        response.headers.update(headers)
+        return items
+
+    requested = _split_fields(fields)
+    return JSONResponse(
+        jsonable_encoder([{key: item[key] for key in requested} for item in items]),
+        headers=headers,
+    )
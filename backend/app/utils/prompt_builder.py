@@ -0,0 +1,259 @@
+"""
+Token-budget-aware prompt assembly.
+"""
+
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Context window sizes by model name prefix, longest prefix wins
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4.1": 1000000,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "o1": 128000,
+    "o3": 200000,
+    "anthropic/claude-3": 200000,
+    "claude-3": 200000,
+    "llama3": 8192,
+    "mistral": 32768,
+}
+
+# Tokens added by the chat format for each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=32)
+def _get_encoding(model: str) -> Any:
+    """
+    Get the tiktoken encoding of a model.
+
+    Returns None when tiktoken isn't installed, in which case token counts are
+    estimated.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """
+    Count the tokens of a text.
+
+    Uses tiktoken when it is installed. Otherwise the count is estimated from
+    the number of words and characters, which slightly overestimates for
+    English text.
+
+    Args:
+        text: The text to count
+        model: The model the text is for
+
+    Returns:
+        Number of tokens
+    """
+    if not text:
+        return 0
+
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return max(len(_WORD_PATTERN.findall(text)), math.ceil(len(text) / 4))
+
+
+def get_context_window(model: str) -> int:
+    """
+    Get the context window size of a model.
+
+    Args:
+        model: The model name
+
+    Returns:
+        Context window in tokens
+    """
+    name = (model or "").lower()
+    for prefix in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if name.startswith(prefix):
+            return MODEL_CONTEXT_WINDOWS[prefix]
+    return settings.PROMPT_DEFAULT_CONTEXT_WINDOW
+
+
+def get_prompt_budget(model: str, max_tokens: Optional[int] = None) -> int:
+    """
+    Get the number of tokens available for the prompt.
+
+    The budget is the model's context window minus the tokens reserved for
+    the response, capped by PROMPT_TOKEN_BUDGET when set.
+
+    Args:
+        model: The model name
+        max_tokens: Maximum tokens of the response
+
+    Returns:
+        Prompt budget in tokens
+    """
+    budget = get_context_window(model) - (max_tokens or 0)
+    if settings.PROMPT_TOKEN_BUDGET:
+        budget = min(budget, settings.PROMPT_TOKEN_BUDGET)
+    return max(budget, 0)
+
+
+class PromptSection:
+    """
+    A section of the system prompt.
+
+    Items are added in order, skipping those that don't fit in the remaining
+    budget. The header is only added if at least one item fits.
+    """
+
+    def __init__(self, header: str, items: List[str], priority: int, atomic: bool = False):
+        """
+        Initialize the section.
+
+        Args:
+            header: Text placed before the items
+            items: Lines of the section, most important first
+            priority: Sections with a lower priority are packed first
+            atomic: Add either all items or none, for sections that are
+                meaningless when partial (e.g. numbered steps)
+        """
+        self.header = header
+        self.items = items
+        self.priority = priority
+        self.atomic = atomic
+
+
+class PromptBuilder:
+    """
+    Packs a system prompt, context sections and conversation history into a
+    token budget.
+
+    The base system prompt and the current message are always included. The
+    remaining budget is filled in this order: sections with a priority below
+    history_priority, the rolling summary of older messages, history from
+    newest to oldest, then the remaining sections.
+    """
+
+    def __init__(self, model: str, budget: int):
+        """Initialize the builder."""
+        self.model = model
+        self.budget = budget
+
+    def count(self, text: str) -> int:
+        """Count the tokens of a text for the model."""
+        return count_tokens(text, self.model)
+
+    def build(
+        self,
+        system_prompt: str,
+        message: str,
+        sections: Optional[List[PromptSection]] = None,
+        history: Optional[List[Dict[str, str]]] = None,
+        summary: Optional[str] = None,
+        history_priority: int = 0,
+    ) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        Build the prompt.
+
+        Args:
+            system_prompt: The base system prompt
+            message: The current user message
+            sections: Sections to add to the system prompt
+            history: Previous messages, oldest first
+            summary: Summary of messages older than the history
+            history_priority: Sections with a priority below this are packed
+                before the history, the rest after it
+
+        Returns:
+            A tuple of (system prompt, messages including the current message)
+        """
+        sections = sections or []
+        history = history or []
+
+        remaining = self.budget
+        remaining -= self.count(system_prompt) + MESSAGE_OVERHEAD_TOKENS
+        remaining -= self.count(message) + MESSAGE_OVERHEAD_TOKENS
+
+        # Pack sections ahead of the history, then the history, then the rest
+        packed: Dict[int, List[str]] = {}
+        ordered = sorted(range(len(sections)), key=lambda i: sections[i].priority)
+        for index in ordered:
+            if sections[index].priority < history_priority:
+                remaining = self._pack_section(sections[index], remaining, packed, index)
+
+        summary_text = ""
+        if summary:
+            text = f"\n\nSummary of the earlier conversation:\n{summary}"
+            tokens = self.count(text)
+            if tokens <= remaining:
+                summary_text = text
+                remaining -= tokens
+
+        included: List[Dict[str, str]] = []
+        for item in reversed(history):
+            tokens = self.count(item["content"]) + MESSAGE_OVERHEAD_TOKENS
+            if tokens > remaining:
+                break
+            included.append(item)
+            remaining -= tokens
+        included.reverse()
+
+        for index in ordered:
+            if sections[index].priority >= history_priority:
+                remaining = self._pack_section(sections[index], remaining, packed, index)
+
+        dropped = len(history) - len(included)
+        if dropped:
+            logger.debug(f"Dropped {dropped} history messages to fit a {self.budget} token prompt budget")
+
+        # Keep sections in their original order so prompts stay stable between turns
+        prompt = system_prompt + "".join(
+            "".join(packed[index]) for index in range(len(sections)) if index in packed
+        ) + summary_text
+
+        return prompt, included + [{"role": "user", "content": message}]
+
+    def _pack_section(
+        self,
+        section: PromptSection,
+        remaining: int,
+        packed: Dict[int, List[str]],
+        index: int,
+    ) -> int:
+        """Add as many items of a section as fit, returning the remaining budget."""
+        header_tokens = self.count(section.header)
+        if header_tokens >= remaining:
+            return remaining
+
+        parts = []
+        available = remaining - header_tokens
+        for item in section.items:
+            tokens = self.count(item)
+            if tokens > available:
+                if section.atomic:
+                    return remaining
+                continue
+            parts.append(item)
+            available -= tokens
+
+        if not parts:
+            return remaining
+
+        packed[index] = [section.header] + parts
+        return available
@@ -0,0 +1,69 @@
+"""
+Server-Sent Events streaming of agent responses.
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+# Stop proxies from buffering the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    Format a Server-Sent Event.
+
+    Args:
+        event: The event name
+        data: JSON-serializable event data
+
+    Returns:
+        The event, ready to be written to the stream
+    """
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+async def stream_response_events(
+    chunks: AsyncIterator[str],
+    on_complete: Callable[[str], Awaitable[Any]],
+) -> AsyncIterator[str]:
+    """
+    Forward response chunks as events, then finish the response.
+
+    Emits a "token" event per chunk. Once the response is complete,
+    on_complete is called with the assembled response and its result is sent
+    as a "done" event. If generation fails, an "error" event is sent instead
+    and on_complete isn't called.
+
+    Args:
+        chunks: Chunks of the response
+        on_complete: Called with the full response, e.g. to store it
+
+    Yields:
+        Server-Sent Events
+    """
+    parts = []
+    try:
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield sse_event("token", {"content": chunk})
+    except Exception as e:
+        logger.error(f"Error streaming response: {e}")
+        yield sse_event("error", {"detail": str(e)})
+        return
+
+    yield sse_event("done", await on_complete("".join(parts)))
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Create a streaming response for Server-Sent Events."""
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,197 @@
+"""
+Batched similarity scoring for deployments without pgvector.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.memory import Memory
+from app.utils.conversation_summary import SUMMARY_MEMORY_TYPE
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Scale each row of a matrix to unit length.
+
+    Rows of zeros are left as zeros.
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def build_matrix(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    Stack embeddings into one contiguous, row-normalized float32 matrix.
+    """
+    if not embeddings:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.ascontiguousarray(normalize_rows(np.asarray(embeddings, dtype=np.float32)))
+
+
+def cosine_scores(query: Sequence[float], matrix: np.ndarray) -> np.ndarray:
+    """
+    Calculate cosine similarity between a query and every row of a normalized matrix.
+
+    Args:
+        query: The query embedding
+        matrix: Matrix of row-normalized embeddings
+
+    Returns:
+        Array with one similarity score per row
+    """
+    query_array = np.asarray(query, dtype=np.float32)
+    norm = np.linalg.norm(query_array)
+    if norm == 0 or matrix.size == 0 or matrix.shape[1] != query_array.shape[0]:
+        return np.zeros(len(matrix), dtype=np.float32)
+    return matrix @ (query_array / norm)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Get the indices of the k highest scores, best first.
+    """
+    if k <= 0 or len(scores) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k >= len(scores):
+        return np.argsort(-scores)
+
+    indices = np.argpartition(-scores, k - 1)[:k]
+    return indices[np.argsort(-scores[indices])]
+
+
+class AgentEmbeddings:
+    """
+    Normalized embedding matrix of one agent's memories.
+    """
+
+    def __init__(self, ids: List[Any], memory_types: List[str], embeddings: List[Sequence[float]]):
+        """Initialize the matrix."""
+        self.ids = ids
+        self.memory_types = np.asarray(memory_types, dtype=object)
+        self.matrix = build_matrix(embeddings)
+        self.loaded_at = time.monotonic()
+
+    def search(
+        self,
+        embedding: Sequence[float],
+        limit: int,
+        memory_types: Optional[List[str]] = None,
+    ) -> List[Any]:
+        """
+        Find the memories most similar to an embedding.
+
+        Args:
+            embedding: The query embedding
+            limit: Maximum number of memories to return
+            memory_types: Only consider memories of these types
+
+        Returns:
+            IDs of the most similar memories, best first
+        """
+        scores = cosine_scores(embedding, self.matrix)
+        if memory_types:
+            scores = np.where(np.isin(self.memory_types, memory_types), scores, -np.inf)
+            limit = min(limit, int(np.isfinite(scores).sum()))
+
+        return [self.ids[i] for i in top_k(scores, limit)]
+
+
+class EmbeddingMatrixCache:
+    """
+    LRU cache of per-agent embedding matrices.
+
+    Matrices are dropped whenever one of the agent's memories is inserted,
+    updated or deleted in this process, and expire after a TTL so changes made
+    by other workers are picked up.
+    """
+
+    def __init__(self, max_agents: int, ttl: float):
+        """Initialize the cache."""
+        self.max_agents = max_agents
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, AgentEmbeddings]" = OrderedDict()
+
+    async def get(self, db: AsyncSession, agent_id: str) -> AgentEmbeddings:
+        """
+        Get the embedding matrix of an agent, loading it if needed.
+
+        Args:
+            db: Database session
+            agent_id: Agent ID
+
+        Returns:
+            The agent's embedding matrix
+        """
+        key = str(agent_id)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.loaded_at <= self.ttl:
+            self._entries.move_to_end(key)
+            return entry
+
+        entry = await self._load(db, agent_id)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_agents:
+            self._entries.popitem(last=False)
+        return entry
+
+    async def _load(self, db: AsyncSession, agent_id: str) -> AgentEmbeddings:
+        """Load an agent's embeddings from the database."""
+        result = await db.execute(
+            select(Memory.id, Memory.memory_type, Memory.embedding).where(
+                Memory.agent_id == agent_id,
+                Memory.memory_type != SUMMARY_MEMORY_TYPE,
+                Memory.embedding.isnot(None),
+            )
+        )
+
+        ids, memory_types, embeddings = [], [], []
+        skipped = 0
+        for memory_id, memory_type, embedding in result.all():
+            if len(embedding) != settings.EMBEDDING_DIMENSIONS:
+                skipped += 1
+                continue
+            ids.append(memory_id)
+            memory_types.append(memory_type)
+            embeddings.append(embedding)
+
+        if skipped:
+            logger.warning(
+                f"Skipped {skipped} memories of agent {agent_id} with embeddings "
+                f"that are not {settings.EMBEDDING_DIMENSIONS}-dimensional"
+            )
+
+        return AgentEmbeddings(ids, memory_types, embeddings)
+
+    def invalidate(self, agent_id: Optional[str] = None) -> None:
+        """
+        Drop cached matrices.
+
+        Args:
+            agent_id: The agent whose memories changed. If None, drop all agents.
+        """
+        if agent_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(str(agent_id), None)
+
+
+embedding_cache = EmbeddingMatrixCache(settings.VECTOR_CACHE_MAX_AGENTS, settings.VECTOR_CACHE_TTL)
+
+
+@event.listens_for(Memory, "after_insert")
+@event.listens_for(Memory, "after_update")
+@event.listens_for(Memory, "after_delete")
+def _invalidate_agent_embeddings(mapper, connection, target) -> None:
+    """Drop the cached matrix of an agent when one of its memories changes."""
+    embedding_cache.invalidate(target.agent_id)
@@ -0,0 +1,44 @@
+"""
+Standalone workflow worker.
+
+Runs workflow executions from the job queue without serving the API, so
+workflow throughput can be scaled separately from the API servers:
+
+    python -m app.worker
+"""
+
+import asyncio
+import logging
+import signal
+
+from app.services.code_runner import code_runner
+from app.services.http_client import http_clients
+from app.services.workflow_worker import workflow_worker
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    """Run the worker until SIGINT or SIGTERM."""
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await code_runner.start()
+    workflow_worker.start()
+    await stopping.wait()
+
+    logger.info("Shutting down workflow worker")
+    await workflow_worker.stop()
+    await code_runner.stop()
+    await http_clients.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark for concurrent agent responses.
+
+Runs N concurrent calls to generate_agent_response (the LLM call behind
+/agents/{agent_id}/interact) against a chat model that takes a fixed time to
+respond, and checks that they finish in about the time of a single call. It
+covers both models with an async API and models that only support blocking
+calls, which go through the bounded thread pool.
+
+Usage:
+    python benchmarks/llm_concurrency.py [--requests 8] [--latency 0.5]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Make the app package importable when run from the backend directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain.schema import AIMessage
+
+from app.core.config import settings
+from app.utils import agent as agent_utils
+
+
+class AsyncChatModel:
+    """Chat model with a native async API."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.latency)
+        return AIMessage(content="ok")
+
+
+class BlockingChatModel:
+    """Chat model that only supports a blocking call."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def predict_messages(self, messages):
+        time.sleep(self.latency)
+        return AIMessage(content="ok")
+
+
+async def run_concurrent(chat, requests: int) -> float:
+    """Run concurrent agent responses and return the wall time."""
+    agent_utils.create_chat_model = lambda **kwargs: chat
+    agent = SimpleNamespace(
+        integration_settings={},
+        model="benchmark",
+        temperature=0.0,
+        max_tokens=16,
+        system_prompt="You are a benchmark.",
+        personality=None,
+        bio=None,
+    )
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        agent_utils.generate_agent_response(agent=agent, message=f"request {i}")
+        for i in range(requests)
+    ])
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=8, help="Number of concurrent calls")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated LLM latency in seconds")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="Allowed multiple of a single call")
+    args = parser.parse_args()
+
+    # Blocking models can only overlap as far as the thread pool allows
+    blocking_requests = min(args.requests, settings.LLM_SYNC_MAX_WORKERS)
+
+    failed = False
+    for name, chat, requests in [
+        ("async", AsyncChatModel(args.latency), args.requests),
+        ("blocking", BlockingChatModel(args.latency), blocking_requests),
+    ]:
+        elapsed = asyncio.run(run_concurrent(chat, requests))
+        ratio = elapsed / args.latency
+        status = "ok" if ratio <= args.tolerance else "REGRESSION"
+        failed = failed or ratio > args.tolerance
+        print(f"{name:>8}: {requests} concurrent calls in {elapsed:.2f}s ({ratio:.2f}x one call) {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
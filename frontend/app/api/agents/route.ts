@@ -3,16 +3,55 @@ import { NextRequest, NextResponse } from 'next/server';
 // Use backend service name for client-side API routes
 const API_URL = 'http://backend:8000/api';
 
+// The backend returns agents a page at a time, with the cursor of the next
+// page in this header
+const NEXT_CURSOR_HEADER = 'X-Next-Cursor';
+const PAGE_SIZE = 1000;
+
 export async function GET(request: NextRequest) {
   try {
-    const response = await fetch(`${API_URL}/agents`, {
-      headers: {
-        'Content-Type': 'application/json',
-      },
-    });
+    const searchParams = request.nextUrl.searchParams;
 
-    const data = await response.json();
-    return NextResponse.json(data);
+    // A caller asking for a page gets that page and the next cursor
+    if (searchParams.has('limit') || searchParams.has('cursor')) {
+      const response = await fetch(`${API_URL}/agents?${searchParams.toString()}`, {
+        headers: {
+          'Content-Type': 'application/json',
+        },
+      });
+
+      const data = await response.json();
+      const nextCursor = response.headers.get(NEXT_CURSOR_HEADER);
+      return NextResponse.json(data, {
+        status: response.status,
+        headers: nextCursor ? { [NEXT_CURSOR_HEADER]: nextCursor } : undefined,
+      });
+    }
+
+    // Otherwise follow the cursor, so agent pickers get every agent
+    const agents: unknown[] = [];
+    let cursor: string | null = null;
+    do {
+      const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+      if (cursor) {
+        params.set('cursor', cursor);
+      }
+
+      const response = await fetch(`${API_URL}/agents?${params.toString()}`, {
+        headers: {
+          'Content-Type': 'application/json',
+        },
+      });
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({ error: 'Failed to fetch agents' }));
+        return NextResponse.json(errorData, { status: response.status });
+      }
+
+      agents.push(...(await response.json()));
+      cursor = response.headers.get(NEXT_CURSOR_HEADER);
+    } while (cursor);
+
+    return NextResponse.json(agents);
   } catch (error) {
     console.error('Error fetching agents:', error);
     return NextResponse.json({ error: 'Failed to fetch agents' }, { status: 500 });
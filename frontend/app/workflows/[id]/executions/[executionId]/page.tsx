@@ -284,7 +284,7 @@ export default function ExecutionDetailsPage({ params }: ExecutionDetailsPagePro
                         Input
                       </Typography>
                       <pre style={{ overflow: 'auto', maxHeight: '150px' }}>
-                        {JSON.stringify(step.input_data, null, 2)}
+                        {JSON.stringify(step.input_data ?? execution?.input_data, null, 2)}
                       </pre>
                     </Grid>
                     